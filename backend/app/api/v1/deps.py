@@ -1,8 +1,11 @@
 from functools import lru_cache
 
+from ...services.analysis_jobs import AnalysisJobs
 from ...services.analysis_service import AnalysisService
 from ...services.notion_service import NotionService
+from ...services.register_jobs import RegisterJobs
 from ...services.session_service import SessionService
+from ...services.tag_classifier import TagClassifier
 from ...services.youtube_service import YouTubeService
 
 
@@ -24,3 +27,18 @@ def get_notion_service() -> NotionService:
 @lru_cache(None)
 def get_session_service() -> SessionService:
     return SessionService()
+
+
+@lru_cache(None)
+def get_tag_classifier() -> TagClassifier:
+    return TagClassifier()
+
+
+@lru_cache(None)
+def get_analysis_jobs() -> AnalysisJobs:
+    return AnalysisJobs(get_analysis_service(), get_session_service())
+
+
+@lru_cache(None)
+def get_register_jobs() -> RegisterJobs:
+    return RegisterJobs(get_notion_service(), get_session_service(), get_tag_classifier())
@@ -1,41 +1,229 @@
+import asyncio
+import json
+
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 
 from app.models import schemas
 from app.api.v1 import deps
 from app.services.session_service import SessionService
+from app.services.analysis_jobs import AnalysisJobs
 from app.services.analysis_service import AnalysisService
+from app.services.usage_ledger import usage_scope
+from app.core.exceptions import APIException
 from app.core.logging import get_logger
+from app.core.metrics import metrics
 
 router = APIRouter(prefix="/api/v1", tags=["Video Processing"])
 logger = get_logger(__name__)
 
 
+async def _save_analysis(
+    session_service: SessionService,
+    session_info: schemas.SessionInfo,
+    analysis_result: schemas.AnalysisResult,
+    usage: list[schemas.UsageRecord],
+) -> schemas.AnalyzeResponseData:
+    """分析結果とGemini APIの利用量をセッションに保存し、レスポンスデータを作成"""
+    session_info.status = "analyzed"
+    session_info.analysis_result = analysis_result
+    session_info.usage.extend(usage)
+    await session_service.save_session(session_info)
+    logger.info(f"Updated session data saved for session_id: {session_info.session_id}")
+
+    return _to_response_data(analysis_result)
+
+
+def _to_response_data(analysis_result: schemas.AnalysisResult) -> schemas.AnalyzeResponseData:
+    """分析結果からレスポンスデータを作成"""
+    return schemas.AnalyzeResponseData(
+        summary=analysis_result.summary,
+        suggested_titles=analysis_result.suggested_titles,
+        categories=analysis_result.categories,
+        emotions=analysis_result.emotions,
+    )
+
+
+def _to_batch_item(session_id: str, task: asyncio.Task) -> schemas.BatchAnalyzeItem:
+    """完了した分析ジョブを一括分析のレスポンス項目に変換"""
+    error = task.exception()
+    if error is None:
+        return schemas.BatchAnalyzeItem(
+            session_id=session_id,
+            status="success",
+            data=_to_response_data(task.result().analysis_result),
+        )
+
+    if not isinstance(error, APIException):
+        error = APIException(status_code=500, message=str(error), error_code="E999")
+    return schemas.BatchAnalyzeItem(
+        session_id=session_id,
+        status="error",
+        error_code=error.error_code,
+        message=error.message,
+    )
+
+
+def _sse(event: str, data: dict) -> str:
+    """Server-Sent Events形式のメッセージを作成"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
 @router.post("/analyze", response_model=schemas.AnalyzeResponse)
 async def analyze_transcript(
     request: schemas.AnalyzeRequest,
     analysis_service: AnalysisService = Depends(deps.get_analysis_service),
     session_service: SessionService = Depends(deps.get_session_service),
+    analysis_jobs: AnalysisJobs = Depends(deps.get_analysis_jobs),
 ):
     """
     セッションIDを受け取り、動画の分析・要約を行うエンドポイント
     """
+    # 先行分析が実行中の場合は、その完了を待って結果を返す
+    task = analysis_jobs.get(request.session_id)
+    if task is not None and not request.bypass_cache:
+        try:
+            session_info = await asyncio.shield(task)
+            metrics.increment("analysis.speculative.attached")
+            logger.info(f"Attached to running analysis for session_id: {request.session_id}")
+            return schemas.AnalyzeResponse(
+                status="success", data=_to_response_data(session_info.analysis_result)
+            )
+        except Exception as e:
+            # 先行分析が失敗した場合は、改めて分析する（エラーは同期的な分析と同じ形式で返す）
+            message = e.message if isinstance(e, APIException) else str(e)
+            logger.warning(f"Running analysis failed, retrying: {message}")
+
     session_info = await session_service.load_session(request.session_id)
     logger.info(f"Session data loaded for session_id: {request.session_id}")
 
+    # 先行分析などで分析済みの場合は、キャッシュの有無によらず保存済みの結果を返す
+    if session_info.analysis_result is not None and not request.bypass_cache:
+        metrics.increment("analysis.reused")
+        logger.info(f"Returning saved analysis for session_id: {request.session_id}")
+        return schemas.AnalyzeResponse(
+            status="success", data=_to_response_data(session_info.analysis_result)
+        )
+
     # 動画字幕の分析・要約処理
-    analysis_result = await analysis_service.analyze_transcript(session_info.transcript)
+    with usage_scope() as usage:
+        analysis_result = await analysis_service.analyze_transcript(
+            session_info.transcript,
+            bypass_cache=request.bypass_cache,
+            tags=session_info.tag_prediction,
+        )
+
+    # セッション情報を更新して保存
+    response_data = await _save_analysis(
+        session_service, session_info, analysis_result, usage
+    )
+
+    return schemas.AnalyzeResponse(status="success", data=response_data)
+
+
+@router.post("/analyze/stream")
+async def analyze_transcript_stream(
+    request: schemas.AnalyzeRequest,
+    analysis_service: AnalysisService = Depends(deps.get_analysis_service),
+    session_service: SessionService = Depends(deps.get_session_service),
+):
+    """
+    セッションIDを受け取り、動画の分析・要約をServer-Sent Eventsで返すエンドポイント。
+    要約は生成途中から summary イベントで順次送信し、完了後に result イベントで
+    分析結果全体を送信する。失敗した場合は error イベントを送信する。
+    """
+    session_info = await session_service.load_session(request.session_id)
+    logger.info(f"Session data loaded for session_id: {request.session_id}")
+
+    # 処理できない長さの字幕は、ストリーム開始前にエラーとして返す
+    analysis_service.preflight(session_info.transcript)
+
+    async def stream():
+        # 分析開始を即座に通知し、接続が確立したことをクライアントに伝える
+        yield _sse("start", {"session_id": session_info.session_id})
+        try:
+            with usage_scope() as usage:
+                async for event in analysis_service.stream_analysis(
+                    session_info.transcript,
+                    bypass_cache=request.bypass_cache,
+                    tags=session_info.tag_prediction,
+                ):
+                    if event.result is not None:
+                        response_data = await _save_analysis(
+                            session_service, session_info, event.result, usage
+                        )
+                        yield _sse("result", response_data.model_dump())
+                    elif event.summary_delta:
+                        yield _sse("summary", {"delta": event.summary_delta})
+        except APIException as e:
+            yield _sse("error", {"error_code": e.error_code, "message": e.message})
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/analyze/regenerate", response_model=schemas.AnalyzeResponse)
+async def regenerate_field(
+    request: schemas.RegenerateRequest,
+    analysis_service: AnalysisService = Depends(deps.get_analysis_service),
+    session_service: SessionService = Depends(deps.get_session_service),
+):
+    """
+    セッションIDと項目名を受け取り、分析済みの要約からタイトル・分類タグ・感情タグの
+    いずれか1項目のみを再生成するエンドポイント
+    """
+    session_info = await session_service.load_session(request.session_id)
+    logger.info(f"Session data loaded for session_id: {request.session_id}")
+
+    if session_info.analysis_result is None:
+        raise APIException(
+            status_code=409,
+            message="Session has not been analyzed yet.",
+            error_code="E012",
+        )
+
+    with usage_scope() as usage:
+        analysis_result = await analysis_service.regenerate_field(
+            session_info.analysis_result, request.field
+        )
 
     # セッション情報を更新して保存
-    session_info.status = "analyzed"
     session_info.analysis_result = analysis_result
+    session_info.usage.extend(usage)
     await session_service.save_session(session_info)
     logger.info(f"Updated session data saved for session_id: {session_info.session_id}")
 
-    response_data = schemas.AnalyzeResponseData(
-        summary=analysis_result.summary,
-        suggested_titles=analysis_result.suggested_titles,
-        categories=analysis_result.categories,
-        emotions=analysis_result.emotions,
-    )
+    return schemas.AnalyzeResponse(status="success", data=_to_response_data(analysis_result))
 
-    return schemas.AnalyzeResponse(status="success", data=response_data)
+
+@router.post("/analyze/batch")
+async def analyze_transcript_batch(
+    request: schemas.BatchAnalyzeRequest,
+    analysis_jobs: AnalysisJobs = Depends(deps.get_analysis_jobs),
+):
+    """
+    複数のセッションIDを受け取り、動画の分析・要約を一括で行うエンドポイント。
+    セッションごとの結果を完了順にNDJSON形式でストリーミングする。
+    分析はリクエストから切り離して実行されるため、クライアントが切断しても継続し、
+    同じセッションIDで再度リクエストすると分析済み・分析中の結果を返す。
+    """
+    session_ids = list(dict.fromkeys(request.session_ids))
+    logger.info(f"Batch analyze started for {len(session_ids)} sessions")
+    tasks = {
+        analysis_jobs.submit(session_id, request.bypass_cache): session_id
+        for session_id in session_ids
+    }
+
+    async def stream():
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                item = _to_batch_item(tasks[task], task)
+                yield item.model_dump_json() + "\n"
+        logger.info(f"Batch analyze finished for {len(session_ids)} sessions")
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
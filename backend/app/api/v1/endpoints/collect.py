@@ -1,11 +1,16 @@
 from datetime import datetime, timedelta
+from typing import Optional
 
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 
 from app.models import schemas
 from app.api.v1 import deps
+from app.services.analysis_jobs import AnalysisJobs
 from app.services.session_service import SessionService
-from app.services.youtube_service import YouTubeService
+from app.services.tag_classifier import TagClassifier
+from app.services.youtube_service import VideoFetchResult, YouTubeService
+from app.core.exceptions import APIException
 from app.core.logging import get_logger
 from app.core.security import generate_secure_token
 
@@ -13,44 +18,183 @@ router = APIRouter(prefix="/api/v1", tags=["Video Processing"])
 logger = get_logger(__name__)
 
 
+async def _create_session(
+    session_service: SessionService,
+    video_metadata: schemas.VideoMetadata,
+    transcript: schemas.Transcript,
+    tag_classifier: Optional[TagClassifier] = None,
+) -> schemas.SessionInfo:
+    """セッション情報を作成して保存（過去の登録内容からタグを推定できる場合は併せて保存）"""
+    tag_prediction = None
+    if tag_classifier is not None:
+        tag_prediction = await tag_classifier.predict(transcript.text)
+
+    now = datetime.now()
+    session_info = schemas.SessionInfo(
+        session_id=generate_secure_token(),
+        timestamp=now,
+        expires_at=now + timedelta(days=1),
+        video_data=video_metadata,
+        transcript=transcript.text,
+        transcript_segments=transcript.segments,
+        transcript_language=transcript.language,
+        status="collected",
+        created_by="system",
+        tag_prediction=tag_prediction,
+    )
+
+    await session_service.save_session(session_info)
+    logger.info(f"Session data saved for session_id: {session_info.session_id}")
+    return session_info
+
+
 @router.post("/collect", response_model=schemas.CollectResponse)
 async def collect_video_data(
     request: schemas.CollectRequest,
     youtube_service: YouTubeService = Depends(deps.get_youtube_service),
     session_service: SessionService = Depends(deps.get_session_service),
+    analysis_jobs: AnalysisJobs = Depends(deps.get_analysis_jobs),
+    tag_classifier: TagClassifier = Depends(deps.get_tag_classifier),
 ):
     """
-    YouTube動画のURLを受け取り、字幕データ収集するエンドポイント
+    YouTube動画のURLを受け取り、字幕データ収集するエンドポイント。
+    channel_id または playlist_id が指定された場合は、動画を一括収集して進捗をストリーミングする。
+    speculative_analysis が指定された場合は、セッション保存後にバックグラウンドで分析を開始する。
     """
+    speculative_jobs = analysis_jobs if request.speculative_analysis else None
+    if request.channel_id or request.playlist_id:
+        return await _collect_playlist(
+            request, youtube_service, session_service, speculative_jobs, tag_classifier
+        )
+
     # 動画メタデータと字幕を取得
-    video_metadata, transcript_text = await youtube_service.fetch_video_data(
+    video_metadata, transcript = await youtube_service.fetch_video_data(
         str(request.url)
     )
 
     # セッション情報を作成して保存
-    session_id = generate_secure_token()
-    now = datetime.now()
-    session_info = schemas.SessionInfo(
-        session_id=session_id,
-        timestamp=now,
-        expires_at=now + timedelta(days=1),
-        video_data=video_metadata,
-        transcript=transcript_text,
-        transcript_language="ja",
-        status="collected",
-        created_by="system",
+    session_info = await _create_session(
+        session_service, video_metadata, transcript, tag_classifier
     )
-
-    await session_service.save_session(session_info)
-    logger.info(f"Session data saved for session_id: {session_info.session_id}")
+    if speculative_jobs is not None:
+        speculative_jobs.speculate(session_info.session_id)
 
     # レスポンスデータを作成
     response_data = schemas.CollectResponseData(
         video_id=video_metadata.video_id,
         title=video_metadata.title,
         channel_name=video_metadata.channel_name,
+        tag_prediction=session_info.tag_prediction,
     )
 
     return schemas.CollectResponse(
-        status="success", session_id=session_id, data=response_data
+        status="success", session_id=session_info.session_id, data=response_data
     )
+
+
+async def _to_batch_item(
+    session_service: SessionService,
+    result: VideoFetchResult,
+    speculative_jobs: Optional[AnalysisJobs] = None,
+    tag_classifier: Optional[TagClassifier] = None,
+) -> schemas.BatchCollectItem:
+    """取得結果からセッションを作成し、バッチのレスポンス項目に変換"""
+    error = result.error
+    if error is None:
+        try:
+            session_info = await _create_session(
+                session_service, result.metadata, result.transcript, tag_classifier
+            )
+            if speculative_jobs is not None:
+                speculative_jobs.speculate(session_info.session_id)
+            return schemas.BatchCollectItem(
+                index=result.index,
+                url=result.url,
+                status="success",
+                session_id=session_info.session_id,
+                data=schemas.CollectResponseData(
+                    video_id=result.metadata.video_id,
+                    title=result.metadata.title,
+                    channel_name=result.metadata.channel_name,
+                    tag_prediction=session_info.tag_prediction,
+                ),
+            )
+        except APIException as e:
+            error = e
+
+    logger.warning(f"Batch collect failed for {result.url}: {error.message}")
+    return schemas.BatchCollectItem(
+        index=result.index,
+        url=result.url,
+        status="error",
+        error_code=error.error_code,
+        message=error.message,
+    )
+
+
+@router.post("/collect/batch")
+async def collect_video_data_batch(
+    request: schemas.BatchCollectRequest,
+    youtube_service: YouTubeService = Depends(deps.get_youtube_service),
+    session_service: SessionService = Depends(deps.get_session_service),
+    tag_classifier: TagClassifier = Depends(deps.get_tag_classifier),
+):
+    """
+    複数のYouTube動画URLを受け取り、字幕データを一括収集するエンドポイント。
+    URLごとの結果を完了順にNDJSON形式でストリーミングする。
+    """
+    urls = [str(url) for url in request.urls]
+    logger.info(f"Batch collect started for {len(urls)} URLs")
+
+    async def stream():
+        async for result in youtube_service.iter_video_data(urls):
+            item = await _to_batch_item(
+                session_service, result, tag_classifier=tag_classifier
+            )
+            yield item.model_dump_json() + "\n"
+        logger.info(f"Batch collect finished for {len(urls)} URLs")
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+async def _collect_playlist(
+    request: schemas.CollectRequest,
+    youtube_service: YouTubeService,
+    session_service: SessionService,
+    speculative_jobs: Optional[AnalysisJobs],
+    tag_classifier: Optional[TagClassifier] = None,
+) -> StreamingResponse:
+    """チャンネル・プレイリストの動画を一括収集し、NDJSON形式で進捗を返す"""
+    playlist_id = request.playlist_id
+    if not playlist_id:
+        playlist_id = await youtube_service.resolve_uploads_playlist(request.channel_id)
+    logger.info(f"Playlist collect started for playlist_id: {playlist_id}")
+
+    async def stream():
+        processed = 0
+        try:
+            async for result in youtube_service.iter_playlist_video_data(playlist_id):
+                item = await _to_batch_item(
+                    session_service, result, speculative_jobs, tag_classifier
+                )
+                processed += 1
+                yield schemas.PlaylistCollectItem(
+                    **item.model_dump(), processed=processed, total=result.total
+                ).model_dump_json() + "\n"
+        except APIException as e:
+            # ページ取得に失敗した場合は、それまでの結果を残してストリームを終了する
+            logger.error(f"Playlist collect aborted for {playlist_id}: {e.message}")
+            yield schemas.PlaylistCollectItem(
+                index=processed,
+                url=f"https://www.youtube.com/playlist?list={playlist_id}",
+                status="error",
+                error_code=e.error_code,
+                message=e.message,
+                processed=processed,
+            ).model_dump_json() + "\n"
+            return
+        logger.info(
+            f"Playlist collect finished for playlist_id: {playlist_id} ({processed} videos)"
+        )
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+
+from app.models import schemas
+from app.core.metrics import metrics
+
+router = APIRouter(prefix="/api/v1", tags=["Monitoring"])
+
+
+@router.get("/metrics", response_model=schemas.MetricsResponse)
+def get_metrics():
+    """
+    プロセス内メトリクス（キャッシュ・外部API呼び出しなど）を取得するエンドポイント。
+    """
+    return schemas.MetricsResponse(status="success", data=metrics.snapshot())
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends
+
+from app.models import schemas
+from app.api.v1 import deps
+from app.services.youtube_service import YouTubeService
+
+router = APIRouter(prefix="/api/v1", tags=["Monitoring"])
+
+
+@router.get("/quota", response_model=schemas.QuotaResponse)
+def get_quota(youtube_service: YouTubeService = Depends(deps.get_youtube_service)):
+    """
+    YouTube Data APIの本日のクォータ消費状況を取得するエンドポイント。
+    """
+    return schemas.QuotaResponse(status="success", data=youtube_service.quota.snapshot())
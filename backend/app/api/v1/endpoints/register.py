@@ -1,9 +1,12 @@
+import asyncio
+
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 
 from app.models import schemas
 from app.api.v1 import deps
-from app.services.session_service import SessionService
-from app.services.notion_service import NotionService
+from app.services.register_jobs import RegisterJobs
+from app.core.exceptions import APIException
 from app.core.logging import get_logger
 
 router = APIRouter(prefix="/api/v1", tags=["Video Processing"])
@@ -13,28 +16,76 @@ logger = get_logger(__name__)
 @router.post("/register", response_model=schemas.RegisterResponse)
 async def register_to_notion(
     request: schemas.RegisterRequest,
-    notion_service: NotionService = Depends(deps.get_notion_service),
-    session_service: SessionService = Depends(deps.get_session_service),
+    register_jobs: RegisterJobs = Depends(deps.get_register_jobs),
 ):
     """
     最終的な内容を受け取り、Notionに登録するエンドポイント。
+    一括登録と同じ登録ジョブを使い、登録済み・登録中のセッションはページを重複して作成しない。
+    クライアントが切断しても、共有している登録ジョブはキャンセルしない。
     """
-    session_info = await session_service.load_session(request.session_id)
-    logger.info(f"Session data loaded for session_id: {request.session_id}")
-
-    # Notionに登録
-    notion_url = await notion_service.register_page(
-        request.modifications, session_info.video_data
-    )
-
-    # セッション情報を更新して保存
-    session_info.status = "registered"
-    await session_service.save_session(session_info)
-    logger.info(
-        f"Session status updated to 'registered' for session_id: {session_info.session_id}"
+    session_info = await asyncio.shield(
+        register_jobs.submit(request.session_id, request.modifications)
     )
 
     return schemas.RegisterResponse(
         status="success",
-        data=schemas.RegisterResponseData(notion_url=notion_url),
+        data=schemas.RegisterResponseData(notion_url=session_info.notion_url),
+    )
+
+
+def _to_batch_item(session_id: str, task: asyncio.Task) -> schemas.BatchRegisterItem:
+    """完了した登録ジョブを一括登録のレスポンス項目に変換"""
+    if task.cancelled():
+        error = APIException(
+            status_code=500, message="Register job was cancelled.", error_code="E999"
+        )
+    else:
+        error = task.exception()
+    if error is None:
+        return schemas.BatchRegisterItem(
+            session_id=session_id,
+            status="success",
+            notion_url=task.result().notion_url,
+        )
+
+    if not isinstance(error, APIException):
+        error = APIException(status_code=500, message=str(error), error_code="E999")
+    return schemas.BatchRegisterItem(
+        session_id=session_id,
+        status="error",
+        error_code=error.error_code,
+        message=error.message,
     )
+
+
+@router.post("/register/batch")
+async def register_to_notion_batch(
+    request: schemas.BatchRegisterRequest,
+    register_jobs: RegisterJobs = Depends(deps.get_register_jobs),
+):
+    """
+    複数のセッションIDと修正内容を受け取り、Notionに一括登録するエンドポイント。
+    セッションごとのページURLまたはエラーを完了順にNDJSON形式でストリーミングする。
+    登録済みのセッションは再登録せず、中断後に同じリクエストを再送しても
+    Notionのページが重複して作成されることはない。
+    """
+    # 同じセッションIDが複数ある場合は最初の修正内容を使う
+    items: dict[str, schemas.RegisterModifications] = {}
+    for item in request.items:
+        items.setdefault(item.session_id, item.modifications)
+    logger.info(f"Batch register started for {len(items)} sessions")
+    tasks = {
+        register_jobs.submit(session_id, modifications): session_id
+        for session_id, modifications in items.items()
+    }
+
+    async def stream():
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                item = _to_batch_item(tasks[task], task)
+                yield item.model_dump_json() + "\n"
+        logger.info(f"Batch register finished for {len(items)} sessions")
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
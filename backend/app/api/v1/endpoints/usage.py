@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.models import schemas
+from app.api.v1 import deps
+from app.services.analysis_service import AnalysisService
+
+router = APIRouter(prefix="/api/v1", tags=["Monitoring"])
+
+
+@router.get("/usage", response_model=schemas.UsageResponse)
+async def get_usage(
+    days: int = Query(7, ge=1, le=366),
+    analysis_service: AnalysisService = Depends(deps.get_analysis_service),
+):
+    """
+    Gemini APIの本日の利用額と、直近の日付・モデルごとの利用量を取得するエンドポイント。
+    """
+    return schemas.UsageResponse(
+        status="success", data=await analysis_service.usage.snapshot(days)
+    )
@@ -0,0 +1,160 @@
+import hashlib
+import os
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class LRUCache:
+    """件数上限付きLRUキャッシュ"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """値を取得し、最近使用したものとして扱う"""
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """値を保存し、上限を超えた場合は最も古いものから削除する"""
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        """値を削除する"""
+        return self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskStore:
+    """ファイルベースの永続キャッシュクラス
+    キーのハッシュ値をファイル名とし、1エントリ1ファイルで保存する。
+    書き込みは一時ファイルからの置き換えで行い、合計サイズが上限を超えた場合は
+    最終アクセスが古いものから削除する。
+    """
+
+    def __init__(self, directory: str, max_bytes: int, compress: bool = False):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+
+    def _get_path(self, key: str) -> str:
+        """キーに対応するファイルパスを取得"""
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """エントリを読み込む（存在しない場合はNone）"""
+        path = self._get_path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # 最終アクセス日時を更新し、削除対象の判定に使う
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Failed to read cache entry {path}: {e}")
+            return None
+
+        if self.compress:
+            try:
+                data = zlib.decompress(data)
+            except zlib.error as e:
+                logger.warning(f"Corrupted cache entry removed: {path}: {e}")
+                self.delete(key)
+                return None
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """エントリをアトミックに書き込む"""
+        if self.compress:
+            data = zlib.compress(data)
+        path = self._get_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with self._lock:
+            self._ensure_size()
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            self._size += len(data) - previous
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def delete(self, key: str) -> None:
+        """エントリを削除する"""
+        path = self._get_path(key)
+        with self._lock:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except FileNotFoundError:
+                return
+            if self._size is not None:
+                self._size -= size
+
+    def size(self) -> int:
+        """保存済みエントリの合計バイト数"""
+        with self._lock:
+            self._ensure_size()
+            return self._size
+
+    def _iter_entries(self):
+        """(パス, サイズ, 最終アクセス日時) を列挙する"""
+        if not os.path.isdir(self.directory):
+            return
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    def _ensure_size(self) -> None:
+        """合計サイズを初回のみディレクトリから集計する"""
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._iter_entries())
+
+    def _evict(self) -> None:
+        """上限の9割を下回るまで、最終アクセスが古いエントリから削除する"""
+        target = int(self.max_bytes * 0.9)
+        entries = sorted(self._iter_entries(), key=lambda entry: entry[2])
+        for path, size, _ in entries:
+            if self._size <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            self._size -= size
+        logger.info(f"Cache evicted in {self.directory}: {self._size} bytes remain")
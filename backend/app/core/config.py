@@ -8,8 +8,80 @@ NOTION_API_KEY = os.getenv("NOTION_API_KEY")
 NOTION_DATABASE_ID = os.getenv("NOTION_DATABASE_ID")
 
 MODEL = os.getenv("MODEL", "gemini-2.5-flash")
+
+
+def _parse_model_tiers(value: str) -> list[tuple[str, int, float]]:
+    """ "モデル名:入力トークン数の上限[:temperature]" のカンマ区切りを上限の小さい順に変換"""
+    tiers = []
+    for entry in value.split(","):
+        name, max_input_tokens, *rest = entry.strip().split(":")
+        tiers.append((name, int(max_input_tokens), float(rest[0]) if rest else 0.8))
+    return sorted(tiers, key=lambda tier: tier[1])
+
+
+# 分析モデルの階層（入力トークン数が上限以下となる最初のモデルを使用する）
+MODEL_TIERS = _parse_model_tiers(
+    os.getenv("MODEL_TIERS", f"gemini-2.5-flash-lite:20000,{MODEL}:1000000")
+)
 RATE_LIMIT = os.getenv("RATE_LIMIT", "20/minute")
 
+# Gemini API呼び出し設定
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))  # 同時実行数の上限
+GEMINI_MAX_QUEUE = int(os.getenv("GEMINI_MAX_QUEUE", "100"))  # 待機できるリクエスト数
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "4"))  # 再試行回数
+GEMINI_BACKOFF_BASE = float(os.getenv("GEMINI_BACKOFF_BASE", "1"))  # 再試行間隔の初期値（秒）
+GEMINI_BACKOFF_MAX = float(os.getenv("GEMINI_BACKOFF_MAX", "30"))  # 再試行間隔の上限（秒）
+GEMINI_API_ENDPOINT = os.getenv(
+    "GEMINI_API_ENDPOINT", ""
+)  # 接続先（"host:port"、負荷試験用の代替サーバーなど。空の場合はGemini API）
+
+# Notion API呼び出し設定（インテグレーションの上限は平均3リクエスト/秒）
+NOTION_RATE_LIMIT = float(os.getenv("NOTION_RATE_LIMIT", "3"))  # リクエスト/秒
+NOTION_BURST = int(os.getenv("NOTION_BURST", "3"))  # 連続して送信できるリクエスト数
+NOTION_MAX_QUEUE = int(os.getenv("NOTION_MAX_QUEUE", "500"))  # 待機できるリクエスト数
+NOTION_MAX_RETRIES = int(os.getenv("NOTION_MAX_RETRIES", "4"))  # レート制限時の再試行回数
+NOTION_BACKOFF_BASE = float(os.getenv("NOTION_BACKOFF_BASE", "1"))  # 再試行間隔の初期値（秒）
+NOTION_BACKOFF_MAX = float(os.getenv("NOTION_BACKOFF_MAX", "30"))  # 再試行間隔の上限（秒）
+NOTION_API_VERSION = os.getenv(
+    "NOTION_API_VERSION", "2022-06-28"
+)  # データベースを直接検索・登録できるバージョン
+NOTION_SESSION_PROPERTY = os.getenv(
+    "NOTION_SESSION_PROPERTY", ""
+)  # セッションIDを記録するテキストプロパティ名（中断した登録の再開時の検索に使う。未設定の場合は動画URLで検索する）
+REGISTER_BATCH_WORKERS = int(
+    os.getenv("REGISTER_BATCH_WORKERS", "4")
+)  # 一括登録の同時登録セッション数
+
+# 長時間動画の分割分析設定
+ANALYSIS_CHUNK_THRESHOLD = int(
+    os.getenv("ANALYSIS_CHUNK_THRESHOLD", "0")
+)  # 分割分析に切り替える字幕のトークン数（0の場合は最大のモデル階層の上限を超える場合のみ）
+ANALYSIS_CHUNK_TOKENS = int(os.getenv("ANALYSIS_CHUNK_TOKENS", "8000"))  # 1チャンクのトークン数
+ANALYSIS_MAP_CONCURRENCY = int(os.getenv("ANALYSIS_MAP_CONCURRENCY", "4"))  # チャンク要約の同時実行数
+ANALYSIS_BATCH_WORKERS = int(os.getenv("ANALYSIS_BATCH_WORKERS", "4"))  # 一括分析の同時分析セッション数
+SPECULATIVE_ANALYSIS_MAX = int(
+    os.getenv("SPECULATIVE_ANALYSIS_MAX", "2")
+)  # 収集直後に先行して分析するセッション数の上限
+
+# 分析前の字幕圧縮設定
+TRANSCRIPT_COMPRESSION_ENABLED = (
+    os.getenv("TRANSCRIPT_COMPRESSION_ENABLED", "true").lower() == "true"
+)
+TRANSCRIPT_COMPRESSION_RATIO = float(
+    os.getenv("TRANSCRIPT_COMPRESSION_RATIO", "1.0")
+)  # 残すトークン数の比率（1.0未満の場合は重要な文を抽出する）
+
+# YouTube Data APIクライアント設定
+YOUTUBE_MAX_WORKERS = int(os.getenv("YOUTUBE_MAX_WORKERS", "8"))  # 同時接続数の上限
+YOUTUBE_HTTP_TIMEOUT = float(os.getenv("YOUTUBE_HTTP_TIMEOUT", "10"))  # 秒
+TRANSCRIPT_CONCURRENCY = int(os.getenv("TRANSCRIPT_CONCURRENCY", "4"))  # 一括取得時の字幕同時取得数
+COLLECT_TIMEOUT = float(os.getenv("COLLECT_TIMEOUT", "30"))  # 1リクエストあたりの取得期限（秒）
+YOUTUBE_DAILY_QUOTA = int(os.getenv("YOUTUBE_DAILY_QUOTA", "10000"))  # 1日のクォータ予算
+YOUTUBE_QUOTA_RESERVE = int(
+    os.getenv("YOUTUBE_QUOTA_RESERVE", "1000")
+)  # 対話的リクエスト用に確保する量
+YOUTUBE_QUOTA_BURST = int(os.getenv("YOUTUBE_QUOTA_BURST", "500"))  # 一括処理で連続消費できる量
+
 # APIキーが設定されていない場合のガード処理
 _required = {"YOUTUBE_API_KEY": YOUTUBE_API_KEY, "GEMINI_API_KEY": GEMINI_API_KEY}
 _missing = [k for k, v in _required.items() if not v]
@@ -17,6 +89,74 @@ if _missing:
     raise RuntimeError(f"必須環境変数が設定されていません: {', '.join(_missing)}")
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+CACHE_DIR = os.getenv(
+    "CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "cache")
+)
+YOUTUBE_QUOTA_PATH = os.getenv(
+    "YOUTUBE_QUOTA_PATH", os.path.join(DATA_DIR, "youtube_quota.json")
+)  # 本日のクォータ消費量の保存先（再起動後も消費量を引き継ぐ）
+
+# 動画メタデータキャッシュ設定
+METADATA_CACHE_MAX_ENTRIES = int(os.getenv("METADATA_CACHE_MAX_ENTRIES", "1024"))
+METADATA_CACHE_TTL = float(os.getenv("METADATA_CACHE_TTL", "604800"))  # タイトル等（秒）
+METADATA_CACHE_VOLATILE_TTL = float(
+    os.getenv("METADATA_CACHE_VOLATILE_TTL", "3600")
+)  # 再生回数（秒）
+METADATA_CACHE_PERSIST = os.getenv("METADATA_CACHE_PERSIST", "false").lower() == "true"
+METADATA_CACHE_MAX_BYTES = int(os.getenv("METADATA_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+# 字幕設定
+TRANSCRIPT_LANGUAGES = [
+    lang.strip() for lang in os.getenv("TRANSCRIPT_LANGUAGES", "ja,en").split(",")
+]  # 優先順
+TRANSCRIPT_LISTING_TTL = float(os.getenv("TRANSCRIPT_LISTING_TTL", "3600"))  # 字幕一覧（秒）
+TRANSCRIPT_CACHE_ENABLED = os.getenv("TRANSCRIPT_CACHE_ENABLED", "true").lower() == "true"
+TRANSCRIPT_CACHE_MAX_BYTES = int(
+    os.getenv("TRANSCRIPT_CACHE_MAX_BYTES", str(500 * 1024 * 1024))
+)
+
+# 分析結果キャッシュ設定
+ANALYSIS_CACHE_ENABLED = os.getenv("ANALYSIS_CACHE_ENABLED", "true").lower() == "true"
+ANALYSIS_CACHE_TTL = float(os.getenv("ANALYSIS_CACHE_TTL", "2592000"))  # 秒
+ANALYSIS_CACHE_MAX_BYTES = int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+
+# カテゴリ・感情タグの推定設定（登録済みセッションから学習する）
+TAG_CLASSIFIER_ENABLED = os.getenv("TAG_CLASSIFIER_ENABLED", "true").lower() == "true"
+TAG_CLASSIFIER_MIN_SAMPLES = int(
+    os.getenv("TAG_CLASSIFIER_MIN_SAMPLES", "30")
+)  # 推定を始める登録済みセッション数
+TAG_CLASSIFIER_MIN_CONFIDENCE = float(
+    os.getenv("TAG_CLASSIFIER_MIN_CONFIDENCE", "0.6")
+)  # AIによるタグ生成を省略する信頼度
+
+
+def _parse_model_prices(value: str) -> dict[str, tuple[float, float]]:
+    """ "モデル名:入力単価:出力単価" のカンマ区切りを変換（単価は100万トークンあたりのUSD）"""
+    prices = {}
+    for entry in value.split(","):
+        name, input_price, output_price = entry.strip().split(":")
+        prices[name] = (float(input_price), float(output_price))
+    return prices
+
+
+# Gemini APIの利用量記録・予算設定
+USAGE_LEDGER_PATH = os.getenv("USAGE_LEDGER_PATH", os.path.join(DATA_DIR, "usage.jsonl"))
+GEMINI_PRICES = _parse_model_prices(
+    os.getenv(
+        "GEMINI_PRICES",
+        "gemini-2.5-flash-lite:0.1:0.4,gemini-2.5-flash:0.3:2.5,gemini-2.5-pro:1.25:10",
+    )
+)
+GEMINI_CACHED_PRICE_RATIO = float(
+    os.getenv("GEMINI_CACHED_PRICE_RATIO", "0.25")
+)  # キャッシュ済み入力トークンの単価（入力単価に対する比率）
+GEMINI_DAILY_SOFT_BUDGET = float(
+    os.getenv("GEMINI_DAILY_SOFT_BUDGET", "0")
+)  # 一括処理を拒否する1日の利用額（USD、0で無効）
+GEMINI_DAILY_HARD_BUDGET = float(
+    os.getenv("GEMINI_DAILY_HARD_BUDGET", "0")
+)  # すべての分析を拒否する1日の利用額（USD、0で無効）
 
 
 def parse_duration(duration: str) -> int:
@@ -0,0 +1,65 @@
+import threading
+from collections import defaultdict
+from typing import Any, Callable
+
+
+class Metrics:
+    """プロセス内メトリクス管理クラス（カウンター・計測値・ゲージ）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = defaultdict(float)
+        self._observations: dict[str, dict[str, float]] = {}
+        self._gauges: dict[str, Callable[[], Any]] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """カウンターを加算する"""
+        with self._lock:
+            self._counters[name] += value
+
+    def observe(self, name: str, value: float) -> None:
+        """計測値（レイテンシ・トークン数など）を記録する"""
+        with self._lock:
+            stats = self._observations.setdefault(
+                name, {"count": 0, "sum": 0.0, "max": 0.0}
+            )
+            stats["count"] += 1
+            stats["sum"] += value
+            stats["max"] = max(stats["max"], value)
+
+    def register_gauge(self, name: str, func: Callable[[], Any]) -> None:
+        """スナップショット取得時に評価されるゲージを登録する"""
+        with self._lock:
+            self._gauges[name] = func
+
+    def get_counter(self, name: str) -> float:
+        """カウンターの現在値を取得する"""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> dict[str, Any]:
+        """全メトリクスの現在値を取得する"""
+        with self._lock:
+            counters = dict(self._counters)
+            observations = {
+                name: {
+                    **stats,
+                    "avg": stats["sum"] / stats["count"] if stats["count"] else 0.0,
+                }
+                for name, stats in self._observations.items()
+            }
+            gauges = dict(self._gauges)
+        return {
+            "counters": counters,
+            "observations": observations,
+            "gauges": {name: func() for name, func in gauges.items()},
+        }
+
+    def reset(self) -> None:
+        """カウンターと計測値を初期化する（ゲージは保持）"""
+        with self._lock:
+            self._counters.clear()
+            self._observations.clear()
+
+
+metrics = Metrics()
@@ -0,0 +1,57 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+from .metrics import metrics
+
+
+class SingleFlight:
+    """同一キーの同時実行を1回の処理にまとめるクラス
+    実行中の処理がある場合、後続の呼び出しはその結果を共有する。
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self._waiters: dict[Hashable, int] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """キーごとに処理を1回だけ実行し、その結果を返す
+        Args:
+            key: まとめる単位となるキー
+            func: 実行する処理
+        Returns:
+            処理結果（例外も全呼び出し元に伝播する）
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            metrics.increment(f"{self.name}.upstream")
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda done: self._on_done(key, done))
+        else:
+            metrics.increment(f"{self.name}.coalesced")
+
+        self._waiters[key] += 1
+        try:
+            # 呼び出し元の1つが取り消されても、共有している処理は継続させる
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # 待機している呼び出し元がいなくなった場合は処理自体を取り消す
+            if self._inflight.get(key) is task and self._waiters[key] == 1:
+                task.cancel()
+            raise
+        finally:
+            if key in self._waiters and self._inflight.get(key) is task:
+                self._waiters[key] -= 1
+
+    def _on_done(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            del self._waiters[key]
+        # 全呼び出し元が取り消された場合に未取得の例外として警告されないようにする
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._inflight)
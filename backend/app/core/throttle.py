@@ -0,0 +1,68 @@
+import asyncio
+import time
+from typing import Literal
+
+# リクエストの優先度（bulk は一括処理・先行処理で、予算が逼迫した場合に先に制限される）
+Priority = Literal["interactive", "bulk"]
+
+
+class TokenBucket:
+    """トークンバケット方式のレート制御クラス
+    rate（トークン/秒）で補充され、capacityまで蓄積できる。
+    取得待ちは到着順に処理される。
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.waiting = 0  # 取得待ちの数
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def tokens(self) -> float:
+        """現在のトークン数"""
+        self._refill()
+        return self._tokens
+
+    def pause(self, seconds: float) -> None:
+        """seconds 秒間、トークンを取得できないようにする（レート制限を受けた場合など）"""
+        self._refill()
+        self._tokens = min(self._tokens, -seconds * self.rate)
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """待たずに取得できる場合のみトークンを消費する"""
+        if self.waiting:
+            return False
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    async def acquire(self, tokens: float = 1) -> float:
+        """トークンが補充されるまで待って消費する
+        Args:
+            tokens (float): 消費するトークン数（capacityを上限とする）
+        Returns:
+            float: 待機した秒数
+        """
+        tokens = min(tokens, self.capacity)
+        start = time.monotonic()
+        self.waiting += 1
+        try:
+            async with self._lock:
+                while True:
+                    self._refill()
+                    if self._tokens >= tokens:
+                        self._tokens -= tokens
+                        return time.monotonic() - start
+                    await asyncio.sleep((tokens - self._tokens) / self.rate)
+        finally:
+            self.waiting -= 1
@@ -3,7 +3,7 @@ from fastapi import FastAPI, HTTPException
 from .core.logging import setup_logging
 from .core.exceptions import APIException, http_exception_handler, api_exception_handler
 from .core.middleware import setup_cors_middleware, log_requests, setup_rate_limiter
-from .api.v1.endpoints import health, collect, analyze, register, session
+from .api.v1.endpoints import health, collect, analyze, register, session, metrics, quota, usage
 
 
 # ロギング設定の初期化
@@ -31,3 +31,6 @@ app.include_router(collect.router)
 app.include_router(analyze.router)
 app.include_router(register.router)
 app.include_router(session.router)
+app.include_router(metrics.router)
+app.include_router(quota.router)
+app.include_router(usage.router)
@@ -1,6 +1,14 @@
+import base64
 from datetime import date, datetime
-from typing import List, Literal, Optional
-from pydantic import BaseModel, HttpUrl
+from typing import Annotated, Any, Dict, List, Literal, Optional
+from pydantic import (
+    BaseModel,
+    BeforeValidator,
+    Field,
+    HttpUrl,
+    PlainSerializer,
+    model_validator,
+)
 
 
 # ヘルスチェック用
@@ -8,16 +16,88 @@ class HealthCheckResponse(BaseModel):
     status: str  # サーバーの状態
 
 
+# メトリクス用
+class MetricsResponse(BaseModel):
+    status: str  # 状態
+    data: Dict[str, Any]  # カウンター・計測値・ゲージ
+
+
+# YouTubeクォータ確認用
+class QuotaStatus(BaseModel):
+    daily_budget: int  # 1日の予算
+    used: int  # 本日の消費量
+    remaining: int  # 残量
+    reserve: int  # 対話的リクエスト用の確保量
+    used_by_method: Dict[str, int]  # メソッドごとの消費量
+    resets_at: datetime  # 次回リセット日時
+
+
+class QuotaResponse(BaseModel):
+    status: str  # 状態
+    data: QuotaStatus  # クォータ状況
+
+
+# Gemini利用量確認用
+class UsageRecord(BaseModel):
+    timestamp: datetime  # 記録日時
+    model: str  # モデル名
+    operation: str  # 処理（analyze / map / regenerate）
+    prompt_tokens: int = 0  # 入力トークン数（キャッシュ済みを含む）
+    cached_tokens: int = 0  # キャッシュ済み入力トークン数
+    output_tokens: int = 0  # 出力トークン数
+    latency_seconds: float  # 所要時間（秒）
+    cost_usd: float  # 利用額（USD）
+
+
+class UsageRollup(BaseModel):
+    day: date  # 日付（UTC）
+    model: str  # モデル名
+    requests: int  # リクエスト数
+    prompt_tokens: int  # 入力トークン数
+    cached_tokens: int  # キャッシュ済み入力トークン数
+    output_tokens: int  # 出力トークン数
+    latency_seconds: float  # 所要時間の合計（秒）
+    cost_usd: float  # 利用額（USD）
+
+
+class UsageStatus(BaseModel):
+    today_cost_usd: float  # 本日の利用額
+    soft_budget_usd: Optional[float] = None  # 一括処理を拒否する利用額
+    hard_budget_usd: Optional[float] = None  # すべての分析を拒否する利用額
+    rollups: List[UsageRollup]  # 日付・モデルごとの集計
+
+
+class UsageResponse(BaseModel):
+    status: str  # 状態
+    data: UsageStatus  # 利用状況
+
+
 # データ収集用
 class CollectRequest(BaseModel):
-    url: HttpUrl  # URL形式フィールド
-    channel_id: Optional[str] = None  # チャンネルID
+    url: Optional[HttpUrl] = None  # URL形式フィールド
+    channel_id: Optional[str] = None  # チャンネルID（指定時はアップロード動画を一括収集）
+    playlist_id: Optional[str] = None  # プレイリストID（指定時はプレイリストを一括収集）
+    speculative_analysis: bool = False  # 収集直後にバックグラウンドで分析を開始するか
+
+    @model_validator(mode="after")
+    def check_target(self):
+        if not (self.url or self.channel_id or self.playlist_id):
+            raise ValueError("url, channel_id or playlist_id is required.")
+        return self
+
+
+class TagPrediction(BaseModel):
+    categories: List[str]  # 推定したカテゴリ一覧
+    emotions: str  # 推定した感情
+    confidence: float  # 信頼度（0-1）
+    confident: bool  # 信頼度が高く、分析時にAIによるタグ生成を省略できるか
 
 
 class CollectResponseData(BaseModel):
     video_id: str  # 動画ID
     title: str  # 動画タイトル
     channel_name: str  # チャンネル名
+    tag_prediction: Optional[TagPrediction] = None  # 過去の登録内容から推定したタグ
 
 
 class CollectResponse(BaseModel):
@@ -26,9 +106,29 @@ class CollectResponse(BaseModel):
     data: CollectResponseData  # 動画情報
 
 
+class BatchCollectRequest(BaseModel):
+    urls: List[HttpUrl] = Field(..., min_length=1, max_length=500)  # URL一覧
+
+
+class BatchCollectItem(BaseModel):
+    index: int  # リクエスト内の位置
+    url: str  # 対象URL
+    status: Literal["success", "error"]  # 状態
+    session_id: Optional[str] = None  # セッションID
+    data: Optional[CollectResponseData] = None  # 動画情報
+    error_code: Optional[str] = None  # エラーコード
+    message: Optional[str] = None  # エラーメッセージ
+
+
+class PlaylistCollectItem(BatchCollectItem):
+    processed: int  # 処理済み件数
+    total: Optional[int] = None  # プレイリストの総件数
+
+
 # 分析用
 class AnalyzeRequest(BaseModel):
     session_id: str  # セッションID
+    bypass_cache: bool = False  # キャッシュを使わずに再分析するか
 
 
 class AnalyzeResponseData(BaseModel):
@@ -38,6 +138,24 @@ class AnalyzeResponseData(BaseModel):
     emotions: str  # 感情
 
 
+class BatchAnalyzeRequest(BaseModel):
+    session_ids: List[str] = Field(..., min_length=1, max_length=500)  # セッションID一覧
+    bypass_cache: bool = False  # キャッシュ・分析済みの結果を使わずに再分析するか
+
+
+class BatchAnalyzeItem(BaseModel):
+    session_id: str  # セッションID
+    status: Literal["success", "error"]  # 状態
+    data: Optional[AnalyzeResponseData] = None  # 分析結果
+    error_code: Optional[str] = None  # エラーコード
+    message: Optional[str] = None  # エラーメッセージ
+
+
+class RegenerateRequest(BaseModel):
+    session_id: str  # セッションID
+    field: Literal["suggested_titles", "categories", "emotions"]  # 再生成する項目
+
+
 class AnalyzeResponse(BaseModel):
     status: str  # 状態
     data: AnalyzeResponseData  # 分析結果
@@ -72,6 +190,18 @@ class RegisterResponse(BaseModel):
     data: RegisterResponseData  # データ
 
 
+class BatchRegisterRequest(BaseModel):
+    items: List[RegisterRequest] = Field(..., min_length=1, max_length=500)  # 登録内容一覧
+
+
+class BatchRegisterItem(BaseModel):
+    session_id: str  # セッションID
+    status: Literal["success", "error"]  # 状態
+    notion_url: Optional[HttpUrl] = None  # NotionページのURL
+    error_code: Optional[str] = None  # エラーコード
+    message: Optional[str] = None  # エラーメッセージ
+
+
 # セッション確認用
 class VideoMetadata(BaseModel):
     video_id: str  # 動画ID
@@ -85,16 +215,42 @@ class VideoMetadata(BaseModel):
     thumbnail_url: Optional[HttpUrl] = None  # サムネイルURL
 
 
+# JSONではBase64文字列として保存する数値配列
+PackedArray = Annotated[
+    bytes,
+    BeforeValidator(lambda v: base64.b64decode(v) if isinstance(v, str) else v),
+    PlainSerializer(lambda v: base64.b64encode(v).decode("ascii"), when_used="json"),
+]
+
+
+class TranscriptSegments(BaseModel):
+    starts_ms: PackedArray  # 各セグメントの開始時刻（ミリ秒, uint32 LE配列）
+    durations_ms: PackedArray  # 各セグメントの長さ（ミリ秒, uint32 LE配列）
+    offsets: PackedArray  # 字幕テキスト内の各セグメント開始位置（uint32 LE配列）
+
+
+class Transcript(BaseModel):
+    text: str  # 字幕テキスト（セグメントを半角スペースで連結）
+    language: str  # 字幕言語
+    is_generated: bool = False  # 自動生成字幕かどうか
+    segments: Optional[TranscriptSegments] = None  # セグメント情報
+
+
 class SessionInfo(BaseModel):
     session_id: str  # セッションID
     timestamp: datetime  # セッション作成日時
     expires_at: datetime  # セッション有効期限
     video_data: VideoMetadata  # 動画メタデータ
     transcript: str  # 字幕テキスト
+    transcript_segments: Optional[TranscriptSegments] = None  # 字幕セグメント情報
     transcript_language: str  # 字幕言語
     status: Literal["collected", "analyzed", "registered", "error"]  # 処理状態
     created_by: str  # 作成者情報
+    tag_prediction: Optional[TagPrediction] = None  # 収集時に推定したタグ
     analysis_result: Optional[AnalysisResult] = None  # 分析結果
+    modifications: Optional[RegisterModifications] = None  # Notionに登録した内容
+    notion_url: Optional[str] = None  # 登録したNotionページのURL
+    usage: List[UsageRecord] = Field(default_factory=list)  # Gemini APIの利用量
 
 
 class SessionResponse(BaseModel):
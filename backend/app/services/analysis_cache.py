@@ -0,0 +1,79 @@
+import asyncio
+import json
+import os
+import time
+from typing import Optional
+
+from ..core.cache import DiskStore
+from ..core.config import (
+    ANALYSIS_CACHE_ENABLED,
+    ANALYSIS_CACHE_MAX_BYTES,
+    ANALYSIS_CACHE_TTL,
+    CACHE_DIR,
+)
+from ..core.logging import get_logger
+from ..core.metrics import metrics
+from ..models import schemas
+
+logger = get_logger(__name__)
+
+
+class AnalysisCache:
+    """分析結果キャッシュクラス
+    字幕・モデル・生成設定・プロンプトが同じ場合は同じ分析結果を再利用する。
+    キーの作成は呼び出し側で行い、有効期限切れのエントリは読み出し時に削除する。
+    """
+
+    def __init__(
+        self,
+        enabled: bool = ANALYSIS_CACHE_ENABLED,
+        ttl: float = ANALYSIS_CACHE_TTL,
+        max_bytes: int = ANALYSIS_CACHE_MAX_BYTES,
+    ):
+        self.ttl = ttl
+        self._store = (
+            DiskStore(os.path.join(CACHE_DIR, "analysis"), max_bytes)
+            if enabled
+            else None
+        )
+
+    async def get(self, key: str) -> Optional[schemas.AnalysisResult]:
+        """分析結果を取得する（存在しない・期限切れの場合はNone）"""
+        if self._store is None:
+            return None
+
+        data = await asyncio.to_thread(self._store.get, key)
+        if data is None:
+            metrics.increment("analysis.cache.miss")
+            return None
+        try:
+            payload = json.loads(data)
+            created_at = payload["created_at"]
+            result = schemas.AnalysisResult.model_validate(payload["result"])
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Invalid analysis cache entry removed: {e}")
+            await asyncio.to_thread(self._store.delete, key)
+            metrics.increment("analysis.cache.miss")
+            return None
+
+        if time.time() - created_at > self.ttl:
+            await asyncio.to_thread(self._store.delete, key)
+            metrics.increment("analysis.cache.expired")
+            return None
+
+        metrics.increment("analysis.cache.hit")
+        return result
+
+    async def put(self, key: str, result: schemas.AnalysisResult) -> None:
+        """分析結果を保存する"""
+        if self._store is None:
+            return
+
+        payload = json.dumps(
+            {"created_at": time.time(), "result": result.model_dump(mode="json")},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        try:
+            await asyncio.to_thread(self._store.put, key, payload)
+        except OSError as e:
+            logger.warning(f"Failed to persist analysis cache: {e}")
@@ -0,0 +1,110 @@
+import asyncio
+from typing import Optional
+
+from ..core.config import ANALYSIS_BATCH_WORKERS, SPECULATIVE_ANALYSIS_MAX
+from ..core.logging import get_logger
+from ..core.metrics import metrics
+from ..models import schemas
+from .analysis_service import AnalysisService
+from .session_service import SessionService
+from .usage_ledger import usage_scope
+
+logger = get_logger(__name__)
+
+
+class AnalysisJobs:
+    """セッション単位の分析ジョブ管理クラス
+    分析はリクエストから切り離したタスクで実行し、クライアントが切断しても完了まで続け、
+    結果をセッションに保存する。同じセッションの分析が実行中の場合は同じタスクを返し、
+    分析済みのセッションは再分析しない。
+    """
+
+    def __init__(
+        self,
+        analysis_service: AnalysisService,
+        session_service: SessionService,
+        max_workers: int = ANALYSIS_BATCH_WORKERS,
+        max_speculative: int = SPECULATIVE_ANALYSIS_MAX,
+    ):
+        self.analysis_service = analysis_service
+        self.session_service = session_service
+        self.max_speculative = max_speculative
+        self._semaphore = asyncio.Semaphore(max_workers)
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._speculative: set[asyncio.Task] = set()
+        metrics.register_gauge("analysis.jobs.running", lambda: len(self._tasks))
+        metrics.register_gauge("analysis.jobs.speculative", lambda: len(self._speculative))
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def submit(
+        self, session_id: str, bypass_cache: bool = False
+    ) -> "asyncio.Task[schemas.SessionInfo]":
+        """セッションの分析を開始する（実行中の場合はそのタスクを返す）
+        Args:
+            session_id (str): セッションID
+            bypass_cache (bool): キャッシュ・分析済みの結果を使わずに再分析するか
+        Returns:
+            asyncio.Task: 分析結果を保存したセッション情報を返すタスク
+        """
+        task = self._tasks.get(session_id)
+        if task is not None:
+            metrics.increment("analysis.jobs.attached")
+            return task
+
+        task = asyncio.create_task(self._run(session_id, bypass_cache))
+        self._tasks[session_id] = task
+        task.add_done_callback(lambda done: self._on_done(session_id, done))
+        return task
+
+    def get(self, session_id: str) -> Optional[asyncio.Task]:
+        """実行中の分析タスクを取得する（実行中でない場合はNone）"""
+        return self._tasks.get(session_id)
+
+    def speculate(self, session_id: str) -> bool:
+        """収集直後のセッションの分析を先行して開始する
+        先行分析の実行数が上限に達している場合は開始しない。
+        Returns:
+            bool: 分析を開始した（または実行中だった）かどうか
+        """
+        if session_id not in self._tasks and len(self._speculative) >= self.max_speculative:
+            metrics.increment("analysis.speculative.skipped")
+            return False
+
+        task = self.submit(session_id)
+        if task not in self._speculative:
+            metrics.increment("analysis.speculative.started")
+            self._speculative.add(task)
+            task.add_done_callback(self._speculative.discard)
+        return True
+
+    def _on_done(self, session_id: str, task: asyncio.Task) -> None:
+        if self._tasks.get(session_id) is task:
+            del self._tasks[session_id]
+        # 待機しているリクエストがない場合も、例外を取得済みとして扱う
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Analysis job failed for session_id {session_id}: {task.exception()}")
+
+    async def _run(self, session_id: str, bypass_cache: bool) -> schemas.SessionInfo:
+        session_info = await self.session_service.load_session(session_id)
+        if session_info.analysis_result is not None and not bypass_cache:
+            metrics.increment("analysis.jobs.skipped")
+            return session_info
+
+        # 一括分析・先行分析は、予算が逼迫した場合に対話的な分析より先に制限する
+        with usage_scope() as usage:
+            async with self._semaphore:
+                analysis_result = await self.analysis_service.analyze_transcript(
+                    session_info.transcript,
+                    bypass_cache=bypass_cache,
+                    priority="bulk",
+                    tags=session_info.tag_prediction,
+                )
+
+        session_info.status = "analyzed"
+        session_info.analysis_result = analysis_result
+        session_info.usage.extend(usage)
+        await self.session_service.save_session(session_info)
+        logger.info(f"Updated session data saved for session_id: {session_id}")
+        return session_info
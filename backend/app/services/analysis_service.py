@@ -1,13 +1,106 @@
+import asyncio
+import dataclasses
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
 import google.generativeai as genai
 from google.generativeai.types import GenerationConfig
+from pydantic import create_model
 
-from ..core.config import GEMINI_API_KEY, MODEL
+from ..core.config import (
+    ANALYSIS_CHUNK_THRESHOLD,
+    ANALYSIS_CHUNK_TOKENS,
+    ANALYSIS_MAP_CONCURRENCY,
+    GEMINI_API_KEY,
+    MODEL_TIERS,
+    TRANSCRIPT_COMPRESSION_ENABLED,
+    TRANSCRIPT_COMPRESSION_RATIO,
+)
 from ..core.exceptions import APIException
 from ..core.logging import get_logger
+from ..core.metrics import metrics
+from ..core.throttle import Priority
 from ..models import schemas
+from .analysis_cache import AnalysisCache
+from .gemini_client import GeminiClient, configure_gemini
+from .summary_extractor import SummaryExtractor
+from .transcript_chunker import estimate_tokens, split_transcript
+from .transcript_compressor import compress_transcript
+from .usage_ledger import USAGE_FIELDS, UsageLedger
 
 logger = get_logger(__name__)
 
+# プロンプトを変更した場合は更新し、以前の分析結果キャッシュを無効にする
+PROMPT_VERSION = "2"
+
+CATEGORY_TAGS = ["音楽", "動物", "スポーツ", "旅行", "ゲーム", "コメディ", "エンターテインメント", "教育", "科学", "映画", "アニメ", "クラシック", "ドキュメンタリー", "ドラマ", "ショートムービー", "その他"]
+EMOTION_TAGS = ["感動", "愉快", "驚愕", "啓発", "考察", "癒着", "その他"]
+
+# 全リクエストで共通の指示（リクエストごとのプロンプトには字幕のみを含める）
+SYSTEM_INSTRUCTION = f"""
+あなたはYouTube動画の字幕テキストを分析し、内容を要約するアシスタントです。
+入力は「字幕テキスト」、または長い動画の字幕を先頭から順に分割してそれぞれ要約した「分割要約」です。
+分割要約の場合は、動画全体の内容として統合してください。
+
+制約：
+- summary: 要約は400-1000文字、Markdown形式
+- suggested_titles: タイトルは30文字以内
+- categories: 分類タグは最大3つ、次の選択肢から選ぶ {json.dumps(CATEGORY_TAGS, ensure_ascii=False)}
+- emotions: 感情タグは1つのみ、次の選択肢から選ぶ {json.dumps(EMOTION_TAGS, ensure_ascii=False)}
+"""
+
+# チャンクごとの要約（400文字以内）のトークン数の見積もり
+MAP_SUMMARY_TOKENS = 500
+
+# 要約から個別に再生成できる項目（項目名、制約）
+REGENERATE_FIELDS = {
+    "suggested_titles": ("タイトル", "30文字以内"),
+    "categories": (
+        "分類タグ",
+        f"最大3つ、次の選択肢から選ぶ {json.dumps(CATEGORY_TAGS, ensure_ascii=False)}",
+    ),
+    "emotions": (
+        "感情タグ",
+        f"1つのみ、次の選択肢から選ぶ {json.dumps(EMOTION_TAGS, ensure_ascii=False)}",
+    ),
+}
+# タグを推定済みの場合のレスポンススキーマ（要約とタイトルのみを生成する）
+SUMMARY_SCHEMA = create_model(
+    "SummaryResult",
+    summary=(str, ...),
+    suggested_titles=(str, ...),
+)
+# 再生成する項目のみを含むレスポンススキーマ
+REGENERATE_SCHEMAS = {
+    field: create_model(
+        f"Regenerated_{field}",
+        **{field: (schemas.AnalysisResult.model_fields[field].annotation, ...)},
+    )
+    for field in REGENERATE_FIELDS
+}
+
+
+@dataclass
+class ModelTier:
+    """分析モデルの階層（入力トークン数が上限以下のリクエストを担当する）"""
+
+    name: str
+    max_input_tokens: int
+    model: genai.GenerativeModel  # 分析用（システム指示付き）
+    map_model: genai.GenerativeModel  # チャンク要約用
+    generation_config: GenerationConfig
+
+
+@dataclass
+class AnalysisStreamEvent:
+    """ストリーミング分析の途中経過（要約の差分、または最終的な分析結果）"""
+
+    summary_delta: str = ""
+    result: Optional[schemas.AnalysisResult] = None
+
 
 class AnalysisService:
     """動画字幕分析クラス"""
@@ -20,62 +113,292 @@ class AnalysisService:
                 message="Gemini API key is not configured.",
                 error_code="E010",
             )
-        genai.configure(api_key=GEMINI_API_KEY)
-        self.model = genai.GenerativeModel(MODEL)
-        self.generation_config = GenerationConfig(
-            temperature=0.8,
-            response_mime_type="application/json",
-        )
+        configure_gemini(GEMINI_API_KEY)
+        self.tiers = [
+            ModelTier(
+                name=name,
+                max_input_tokens=max_input_tokens,
+                model=genai.GenerativeModel(name, system_instruction=SYSTEM_INSTRUCTION),
+                map_model=genai.GenerativeModel(name),
+                generation_config=GenerationConfig(
+                    temperature=temperature,
+                    response_mime_type="application/json",
+                    response_schema=schemas.AnalysisResult,
+                ),
+            )
+            for name, max_input_tokens, temperature in MODEL_TIERS
+        ]
+        self.map_generation_config = GenerationConfig(temperature=0.4)
+        self.cache = AnalysisCache()
+        self.client = GeminiClient()
+        self.usage = UsageLedger()
+        if 0 < ANALYSIS_CHUNK_THRESHOLD < self.tiers[-1].max_input_tokens:
+            logger.info(
+                f"Transcripts over {ANALYSIS_CHUNK_THRESHOLD} tokens are chunked "
+                f"before reaching the {self.tiers[-1].name} input limit."
+            )
         logger.info(f"AnalysisService initialized successfully.")
 
-    def _create_prompt(self, transcript: str) -> str:
-        """プロンプトを作成"""
+    def _create_prompt(self, transcript: str, chunked: bool = False) -> str:
+        """プロンプトを作成（制約・選択肢・回答形式はシステム指示とレスポンススキーマで指定する）
+        Args:
+            transcript (str): 字幕テキスト（分割分析の場合はチャンクごとの要約）
+            chunked (bool): 分割分析の統合用プロンプトかどうか
+        """
+        if chunked:
+            return f"分割要約:\n{transcript}"
+        return f"字幕テキスト:\n{transcript}"
+
+    def _create_map_prompt(self, chunk: str, index: int, total: int) -> str:
+        """分割した字幕テキストの要約用プロンプトを作成"""
 
         prompt = f"""
-        以下のYouTube動画の字幕テキストを分析し、内容を要約してJSON形式で回答してください：
+        以下はYouTube動画の字幕テキストを{total}分割したうちの{index + 1}番目です。
+        後で動画全体の要約に統合するため、この部分の内容を漏れなく簡潔に要約してください。
 
         制約：
-        - 要約は400-1000文字、Markdown形式
-        - タイトルは30文字以内
-        - 分類タグは最大3つ
-        - 感情タグは1つのみ
-
-        分類タグ選択肢: ["音楽", "動物", "スポーツ", "旅行", "ゲーム", "コメディ", "エンターテインメント", "教育", "科学", "映画", "アニメ", "クラシック", "ドキュメンタリー", "ドラマ", "ショートムービー", "その他"]
-        感情タグ選択肢: ["感動", "愉快", "驚愕", "啓発", "考察", "癒着", "その他"]
+        - 要約は箇条書き、400文字以内
+        - 話題・固有名詞・結論を優先して残す
 
         字幕テキスト:
-        {transcript}
-
-        回答は必ずJSON形式で、以下のキーを持つオブジェクトとしてください:
-        {{
-        "summary": "Markdown形式の要約",
-        "suggested_titles": "提案タイトル",
-        "categories": ["タグ1", "タグ2"],
-        "emotions": "感情タグ"
-        }}
+        {chunk}
+        """
+        return prompt
+
+    async def _summarize_chunks(self, transcript: str) -> str:
+        """字幕テキストを分割し、チャンクごとの要約を並行して取得する
+        Args:
+            transcript (str): 字幕テキスト
+        Returns:
+            str: 順序どおりに連結したチャンクごとの要約
+        """
+        chunks = split_transcript(transcript, ANALYSIS_CHUNK_TOKENS)
+        logger.info(f"Summarizing transcript in {len(chunks)} chunks.")
+        metrics.increment("analysis.chunked")
+        metrics.observe("analysis.chunks", len(chunks))
+
+        semaphore = asyncio.Semaphore(ANALYSIS_MAP_CONCURRENCY)
+
+        async def summarize(index: int, chunk: str) -> str:
+            async with semaphore:
+                prompt = self._create_map_prompt(chunk, index, len(chunks))
+                tier = self._select_tier(estimate_tokens(prompt))
+                start = time.monotonic()
+                response = await self.client.generate(
+                    tier.map_model, prompt, self.map_generation_config
+                )
+                await self._record_tier(
+                    tier, prompt, time.monotonic() - start, response, operation="map"
+                )
+                return response.text
+
+        start = time.monotonic()
+        tasks = [
+            asyncio.create_task(summarize(index, chunk))
+            for index, chunk in enumerate(chunks)
+        ]
+        try:
+            summaries = await asyncio.gather(*tasks)
+        finally:
+            # 1件でも失敗した場合、残りの要約は不要なので取り消す
+            for task in tasks:
+                task.cancel()
+        metrics.observe("analysis.map_seconds", time.monotonic() - start)
+
+        return "\n\n".join(
+            f"[{index + 1}/{len(chunks)}]\n{summary}"
+            for index, summary in enumerate(summaries)
+        )
+
+    def _create_regenerate_prompt(
+        self, analysis_result: schemas.AnalysisResult, field: str
+    ) -> str:
+        """要約から1項目のみを再生成するプロンプトを作成"""
+        label, constraint = REGENERATE_FIELDS[field]
+        current = getattr(analysis_result, field)
+        if isinstance(current, list):
+            current = "、".join(current)
+
+        prompt = f"""
+        以下はYouTube動画の要約です。要約の内容に合う{label}を作成し直してください。
+        現在の{label}とは異なる案にしてください。
+
+        制約：
+        - {field}: {constraint}
+
+        現在の{label}: {current}
+
+        要約:
+        {analysis_result.summary}
         """
         return prompt
 
-    async def analyze_transcript(self, transcript: str) -> schemas.AnalysisResult:
+    def _get_cache_key(
+        self, transcript: str, tags: Optional[schemas.TagPrediction] = None
+    ) -> str:
+        """字幕・モデル・生成設定・プロンプトのバージョン・推定済みのタグから分析結果キャッシュのキーを作成"""
+        params = {
+            "tiers": [
+                [
+                    tier.name,
+                    tier.max_input_tokens,
+                    dataclasses.asdict(tier.generation_config),
+                ]
+                for tier in self.tiers
+            ],
+            "prompt_version": PROMPT_VERSION,
+            "map_generation_config": dataclasses.asdict(self.map_generation_config),
+            "chunk_threshold": self._chunk_threshold(),
+            "chunk_tokens": ANALYSIS_CHUNK_TOKENS,
+            "compression": [TRANSCRIPT_COMPRESSION_ENABLED, TRANSCRIPT_COMPRESSION_RATIO],
+        }
+        if tags is not None:
+            params["tags"] = [tags.categories, tags.emotions]
+        params = json.dumps(params, sort_keys=True, default=str)
+        transcript_hash = hashlib.sha256(transcript.encode("utf-8")).hexdigest()
+        params_hash = hashlib.sha256(params.encode("utf-8")).hexdigest()
+        return f"{transcript_hash}:{params_hash}"
+
+    def _select_tier(self, tokens: int) -> ModelTier:
+        """入力トークン数を処理できる最も小さいモデルを選択する"""
+        for tier in self.tiers:
+            if tokens <= tier.max_input_tokens:
+                return tier
+        metrics.increment("analysis.rejected_too_large")
+        logger.warning(f"Analysis input too large: {tokens} tokens")
+        raise APIException(
+            status_code=413,
+            message=f"Transcript is too long to analyze ({tokens} tokens).",
+            error_code="E011",
+        )
+
+    async def _record_tier(
+        self,
+        tier: ModelTier,
+        prompt: str,
+        elapsed: float,
+        response=None,
+        operation: str = "analyze",
+    ) -> None:
+        """モデルの階層ごとのリクエスト数・トークン数・所要時間を記録する
+        レスポンスにトークン数（usage_metadata）が含まれる場合は、実際の入力・キャッシュ済み・
+        出力トークン数も記録する。利用量は利用量台帳にも記録する。
+        """
+        prefix = f"analysis.tier.{tier.name}"
+        metrics.increment(f"{prefix}.requests")
+        metrics.observe(f"{prefix}.input_tokens", estimate_tokens(prompt))
+        metrics.observe(f"{prefix}.latency_seconds", elapsed)
+
+        usage = getattr(response, "usage_metadata", None)
+        for field, name in USAGE_FIELDS:
+            value = getattr(usage, field, None)
+            if isinstance(value, int):
+                metrics.observe(f"{prefix}.{name}", value)
+
+        await self.usage.record(tier.name, operation, response, elapsed)
+
+    @staticmethod
+    def _generation_config(
+        tier: ModelTier, tags: Optional[schemas.TagPrediction]
+    ) -> GenerationConfig:
+        """生成設定を取得する（タグを推定済みの場合は要約とタイトルのみを生成する）"""
+        if tags is None:
+            return tier.generation_config
+        return dataclasses.replace(tier.generation_config, response_schema=SUMMARY_SCHEMA)
+
+    @staticmethod
+    def _parse_result(
+        text: str, tags: Optional[schemas.TagPrediction]
+    ) -> schemas.AnalysisResult:
+        """レスポンスを分析結果に変換する（タグを推定済みの場合は推定結果を使う）"""
+        if tags is None:
+            return schemas.AnalysisResult.model_validate_json(text)
+        summary = SUMMARY_SCHEMA.model_validate_json(text)
+        return schemas.AnalysisResult(
+            summary=summary.summary,
+            suggested_titles=summary.suggested_titles,
+            categories=tags.categories,
+            emotions=tags.emotions,
+        )
+
+    def _prompt_overhead(self) -> int:
+        """字幕以外のシステム指示・プロンプトのトークン数"""
+        return estimate_tokens(SYSTEM_INSTRUCTION + self._create_prompt("", chunked=True))
+
+    def _chunk_threshold(self) -> int:
+        """分割分析に切り替える字幕のトークン数
+        未設定（0）の場合は、最大のモデルでも一度に処理できない場合のみ分割する。
+        """
+        if ANALYSIS_CHUNK_THRESHOLD > 0:
+            return ANALYSIS_CHUNK_THRESHOLD
+        return self.tiers[-1].max_input_tokens - self._prompt_overhead()
+
+    def preflight(self, transcript: str) -> None:
+        """送信前にトークン数を見積もり、どのモデルでも処理できない場合は拒否する
+        分割分析の場合は、チャンクの要約と、要約を統合するプロンプトの両方を確認する。
+        """
+        overhead = self._prompt_overhead()
+        tokens = estimate_tokens(transcript)
+        if tokens <= self._chunk_threshold():
+            self._select_tier(tokens + overhead)
+            return
+
+        chunks = -(-tokens // ANALYSIS_CHUNK_TOKENS)
+        self._select_tier(ANALYSIS_CHUNK_TOKENS + overhead)
+        self._select_tier(chunks * MAP_SUMMARY_TOKENS + overhead)
+
+    async def _create_analysis_prompt(self, transcript: str) -> str:
+        """分析用プロンプトを作成（字幕を圧縮し、長い字幕は分割して要約した上で統合する）"""
+        if TRANSCRIPT_COMPRESSION_ENABLED:
+            transcript = (await asyncio.to_thread(compress_transcript, transcript)).text
+        self.preflight(transcript)
+        if estimate_tokens(transcript) > self._chunk_threshold():
+            return self._create_prompt(
+                await self._summarize_chunks(transcript), chunked=True
+            )
+        return self._create_prompt(transcript)
+
+    async def analyze_transcript(
+        self,
+        transcript: str,
+        bypass_cache: bool = False,
+        priority: Priority = "interactive",
+        tags: Optional[schemas.TagPrediction] = None,
+    ) -> schemas.AnalysisResult:
         """字幕テキストの分析結果を取得
         Args:
             transcript (str): 字幕テキスト
+            bypass_cache (bool): キャッシュを使わずに再分析するか（結果はキャッシュに保存する）
+            priority (str): interactive（通常のリクエスト）または bulk（一括処理・先行分析）
+            tags (schemas.TagPrediction): 収集時に推定したタグ（信頼度が高い場合はAIによる生成を省略する）
         Returns:
             schemas.AnalysisResult: 分析結果
         """
-        prompt = self._create_prompt(transcript)
+        tags = tags if tags is not None and tags.confident else None
+        cache_key = self._get_cache_key(transcript, tags)
+        if not bypass_cache:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                logger.info("Analysis result served from cache.")
+                return cached
 
+        self.usage.check(priority)
         try:
-            logger.info("Sending analysis request to Gemini API.")
-            response = await self.model.generate_content_async(
-                prompt,
-                generation_config=self.generation_config,
+            prompt = await self._create_analysis_prompt(transcript)
+            tier = self._select_tier(estimate_tokens(SYSTEM_INSTRUCTION + prompt))
+
+            logger.info(f"Sending analysis request to Gemini API ({tier.name}).")
+            start = time.monotonic()
+            response = await self.client.generate(
+                tier.model, prompt, self._generation_config(tier, tags)
             )
+            await self._record_tier(tier, prompt, time.monotonic() - start, response)
 
-            analysis_result = schemas.AnalysisResult.model_validate_json(response.text)
+            analysis_result = self._parse_result(response.text, tags)
             logger.info("Analysis completed successfully.")
-            return analysis_result
 
+        except APIException:
+            raise
         except Exception as e:
             logger.error(f"Analysis failed: {e}")
             raise APIException(
@@ -83,3 +406,114 @@ class AnalysisService:
                 message=f"An error occurred while communicating with the analysis service: {e}",
                 error_code="E008",
             )
+
+        await self.cache.put(cache_key, analysis_result)
+        return analysis_result
+
+    async def stream_analysis(
+        self,
+        transcript: str,
+        bypass_cache: bool = False,
+        tags: Optional[schemas.TagPrediction] = None,
+    ) -> AsyncIterator[AnalysisStreamEvent]:
+        """字幕テキストを分析し、要約を生成途中から順に返す
+        Args:
+            transcript (str): 字幕テキスト
+            bypass_cache (bool): キャッシュを使わずに再分析するか（結果はキャッシュに保存する）
+            tags (schemas.TagPrediction): 収集時に推定したタグ（信頼度が高い場合はAIによる生成を省略する）
+        Yields:
+            AnalysisStreamEvent: 要約の差分。最後に検証済みの分析結果を返す
+        """
+        tags = tags if tags is not None and tags.confident else None
+        cache_key = self._get_cache_key(transcript, tags)
+        if not bypass_cache:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                logger.info("Analysis result served from cache.")
+                yield AnalysisStreamEvent(summary_delta=cached.summary)
+                yield AnalysisStreamEvent(result=cached)
+                return
+
+        self.usage.check()
+        extractor = SummaryExtractor()
+        texts = []
+        try:
+            prompt = await self._create_analysis_prompt(transcript)
+            tier = self._select_tier(estimate_tokens(SYSTEM_INSTRUCTION + prompt))
+
+            logger.info(f"Sending streaming analysis request to Gemini API ({tier.name}).")
+            start = time.monotonic()
+            chunk = None
+            async for chunk in self.client.stream(
+                tier.model, prompt, self._generation_config(tier, tags)
+            ):
+                if not texts:
+                    metrics.observe(
+                        "analysis.stream.first_chunk_seconds", time.monotonic() - start
+                    )
+                texts.append(chunk.text)
+                delta = extractor.feed(chunk.text)
+                if delta:
+                    yield AnalysisStreamEvent(summary_delta=delta)
+
+            # トークン数は最後のチャンクに含まれる
+            await self._record_tier(tier, prompt, time.monotonic() - start, chunk)
+
+            analysis_result = self._parse_result("".join(texts), tags)
+            logger.info("Streaming analysis completed successfully.")
+
+        except APIException:
+            raise
+        except Exception as e:
+            logger.error(f"Analysis failed: {e}")
+            raise APIException(
+                status_code=502,
+                message=f"An error occurred while communicating with the analysis service: {e}",
+                error_code="E008",
+            )
+
+        await self.cache.put(cache_key, analysis_result)
+        yield AnalysisStreamEvent(result=analysis_result)
+
+    async def regenerate_field(
+        self, analysis_result: schemas.AnalysisResult, field: str
+    ) -> schemas.AnalysisResult:
+        """分析結果の要約から1項目（タイトル・分類タグ・感情タグ）のみを再生成する
+        字幕全体を送らず、要約と対象の項目のみを生成するため、全体の再分析より高速に完了する。
+        Args:
+            analysis_result (schemas.AnalysisResult): 既存の分析結果
+            field (str): 再生成する項目（suggested_titles / categories / emotions）
+        Returns:
+            schemas.AnalysisResult: 指定した項目のみを置き換えた分析結果
+        """
+        self.usage.check()
+        try:
+            prompt = self._create_regenerate_prompt(analysis_result, field)
+            tier = self._select_tier(estimate_tokens(prompt))
+            generation_config = GenerationConfig(
+                temperature=tier.generation_config.temperature,
+                response_mime_type="application/json",
+                response_schema=REGENERATE_SCHEMAS[field],
+            )
+
+            logger.info(f"Sending regenerate request for {field} to Gemini API ({tier.name}).")
+            start = time.monotonic()
+            response = await self.client.generate(tier.map_model, prompt, generation_config)
+            await self._record_tier(
+                tier, prompt, time.monotonic() - start, response, operation="regenerate"
+            )
+            metrics.increment(f"analysis.regenerate.{field}")
+
+            regenerated = REGENERATE_SCHEMAS[field].model_validate_json(response.text)
+
+        except APIException:
+            raise
+        except Exception as e:
+            logger.error(f"Regeneration of {field} failed: {e}")
+            raise APIException(
+                status_code=502,
+                message=f"An error occurred while communicating with the analysis service: {e}",
+                error_code="E008",
+            )
+
+        return analysis_result.model_copy(update={field: getattr(regenerated, field)})
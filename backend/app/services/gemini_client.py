@@ -0,0 +1,178 @@
+import asyncio
+import random
+import re
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional
+
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+
+from ..core.config import (
+    GEMINI_API_ENDPOINT,
+    GEMINI_BACKOFF_BASE,
+    GEMINI_BACKOFF_MAX,
+    GEMINI_MAX_CONCURRENCY,
+    GEMINI_MAX_QUEUE,
+    GEMINI_MAX_RETRIES,
+)
+from ..core.exceptions import APIException
+from ..core.logging import get_logger
+from ..core.metrics import metrics
+
+logger = get_logger(__name__)
+
+# 再試行で回復が見込めるエラー（レート制限・一時的な障害）
+RETRYABLE_ERRORS = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.InternalServerError,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+)
+_RETRY_IN = re.compile(r"retry in ([\d.]+)\s*s", re.IGNORECASE)
+
+
+def configure_gemini(api_key: str, endpoint: str = GEMINI_API_ENDPOINT) -> None:
+    """Gemini APIの接続先を設定する
+    endpoint を指定した場合は、非同期のgRPC（TLS）でその接続先に送信する（負荷試験用の
+    代替サーバー向け）。自己署名証明書の場合は GRPC_DEFAULT_SSL_ROOTS_FILE_PATH で信頼する。
+    """
+    if not endpoint:
+        genai.configure(api_key=api_key)
+        return
+
+    genai.configure(
+        api_key=api_key,
+        transport="grpc_asyncio",
+        client_options={"api_endpoint": endpoint},
+    )
+    logger.warning(f"Gemini API requests are sent to {endpoint}")
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """エラーに含まれる再試行までの待機時間（秒）を取得する"""
+    for detail in getattr(error, "details", None) or ():
+        delay = getattr(detail, "retry_delay", None)
+        if delay is not None:
+            return delay.seconds + delay.nanos / 1e9
+
+    response = getattr(error, "response", None)
+    header = getattr(response, "headers", {}).get("Retry-After") if response else None
+    if header:
+        try:
+            return float(header)
+        except ValueError:
+            pass
+
+    match = _RETRY_IN.search(str(error))
+    return float(match.group(1)) if match else None
+
+
+class GeminiClient:
+    """Gemini API呼び出しの同時実行数制御クラス
+    同時実行数を上限までに抑え、超過分は到着順に待機させる。待機数が上限を超えた場合は
+    即座に拒否する。レート制限・一時的な障害は指数バックオフ（ジッター付き）で再試行し、
+    APIから再試行までの待機時間が指定された場合はそれ以上待機する。
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = GEMINI_MAX_CONCURRENCY,
+        max_queue: int = GEMINI_MAX_QUEUE,
+        max_retries: int = GEMINI_MAX_RETRIES,
+        backoff_base: float = GEMINI_BACKOFF_BASE,
+        backoff_max: float = GEMINI_BACKOFF_MAX,
+    ):
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.queued = 0
+        metrics.register_gauge("gemini.in_flight", lambda: self.in_flight)
+        metrics.register_gauge("gemini.queued", lambda: self.queued)
+
+    @asynccontextmanager
+    async def _slot(self):
+        """実行枠を確保する（待機数が上限を超えている場合は拒否する）"""
+        if self.queued >= self.max_queue:
+            metrics.increment("gemini.rejected")
+            raise APIException(
+                status_code=429,
+                message="Too many analysis requests are waiting. Please retry later.",
+                error_code="E004",
+            )
+
+        start = time.monotonic()
+        self.queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+        metrics.observe("gemini.queue_wait_seconds", time.monotonic() - start)
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    async def _backoff(self, attempt: int, error: Exception) -> None:
+        """再試行まで待機する（再試行できない場合はエラーを送出する）"""
+        if not isinstance(error, RETRYABLE_ERRORS) or attempt >= self.max_retries:
+            if isinstance(error, google_exceptions.TooManyRequests):
+                metrics.increment("gemini.rate_limited")
+                raise APIException(
+                    status_code=429,
+                    message="Gemini API rate limit exceeded. Please retry later.",
+                    error_code="E004",
+                ) from error
+            raise error
+
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+        hint = _retry_after(error)
+        if hint is not None:
+            delay = max(delay, min(hint, self.backoff_max))
+        metrics.increment("gemini.retries")
+        logger.warning(
+            f"Gemini API call failed ({type(error).__name__}), retrying in {delay:.1f}s "
+            f"(attempt {attempt + 1}/{self.max_retries})"
+        )
+        await asyncio.sleep(delay)
+
+    async def generate(self, model, prompt: str, generation_config) -> Any:
+        """generate_content_async を同時実行数の制御・再試行付きで呼び出す"""
+        attempt = 0
+        while True:
+            try:
+                async with self._slot():
+                    return await model.generate_content_async(
+                        prompt, generation_config=generation_config
+                    )
+            except RETRYABLE_ERRORS as e:
+                await self._backoff(attempt, e)
+                attempt += 1
+
+    async def stream(self, model, prompt: str, generation_config) -> AsyncIterator[Any]:
+        """ストリーミング生成を同時実行数の制御・再試行付きで呼び出す
+        再試行はレスポンスを1件も受信していない場合のみ行う。
+        """
+        attempt = 0
+        while True:
+            received = False
+            try:
+                async with self._slot():
+                    response = await model.generate_content_async(
+                        prompt, generation_config=generation_config, stream=True
+                    )
+                    async for chunk in response:
+                        received = True
+                        yield chunk
+                return
+            except RETRYABLE_ERRORS as e:
+                if received:
+                    raise
+                await self._backoff(attempt, e)
+                attempt += 1
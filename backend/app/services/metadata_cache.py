@@ -0,0 +1,139 @@
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from ..core.cache import DiskStore, LRUCache
+from ..core.config import (
+    CACHE_DIR,
+    METADATA_CACHE_MAX_BYTES,
+    METADATA_CACHE_MAX_ENTRIES,
+    METADATA_CACHE_PERSIST,
+    METADATA_CACHE_TTL,
+    METADATA_CACHE_VOLATILE_TTL,
+)
+from ..core.logging import get_logger
+from ..core.metrics import metrics
+from ..models import schemas
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class _CacheEntry:
+    metadata: schemas.VideoMetadata
+    fetched_at: float  # タイトル・チャンネル名などの取得日時
+    refreshed_at: float  # 再生回数などの変動する項目の取得日時
+
+
+class MetadataCache:
+    """動画メタデータキャッシュクラス
+    変動しない項目（タイトル・チャンネル名・長さなど）と変動する項目（再生回数）で
+    有効期限を分けて管理する。
+    """
+
+    def __init__(
+        self,
+        max_entries: int = METADATA_CACHE_MAX_ENTRIES,
+        ttl: float = METADATA_CACHE_TTL,
+        volatile_ttl: float = METADATA_CACHE_VOLATILE_TTL,
+        persist: bool = METADATA_CACHE_PERSIST,
+    ):
+        self.ttl = ttl
+        self.volatile_ttl = volatile_ttl
+        self._memory = LRUCache(max_entries)
+        self._store = (
+            DiskStore(os.path.join(CACHE_DIR, "metadata"), METADATA_CACHE_MAX_BYTES)
+            if persist
+            else None
+        )
+        metrics.register_gauge(
+            "youtube.metadata_cache.entries", lambda: len(self._memory)
+        )
+
+    async def lookup(
+        self, video_ids: list[str]
+    ) -> tuple[dict[str, schemas.VideoMetadata], dict[str, schemas.VideoMetadata], list[str]]:
+        """キャッシュを検索する
+        Args:
+            video_ids (list[str]): 動画ID
+        Returns:
+            dict: 有効なメタデータ
+            dict: 再生回数のみ期限切れのメタデータ
+            list[str]: キャッシュにない（または期限切れの）動画ID
+        """
+        now = time.time()
+        fresh, stale, missing = {}, {}, []
+        for video_id in video_ids:
+            entry = await self._get_entry(video_id)
+            if entry is None or now - entry.fetched_at > self.ttl:
+                metrics.increment("youtube.metadata_cache.miss")
+                missing.append(video_id)
+            elif now - entry.refreshed_at > self.volatile_ttl:
+                metrics.increment("youtube.metadata_cache.stale")
+                stale[video_id] = entry.metadata
+            else:
+                metrics.increment("youtube.metadata_cache.hit")
+                fresh[video_id] = entry.metadata
+        return fresh, stale, missing
+
+    async def put(self, metadata: schemas.VideoMetadata) -> None:
+        """メタデータを保存する"""
+        now = time.time()
+        await self._set_entry(_CacheEntry(metadata, fetched_at=now, refreshed_at=now))
+
+    async def refresh(
+        self, video_id: str, view_count: Optional[int]
+    ) -> Optional[schemas.VideoMetadata]:
+        """再生回数を更新したメタデータを保存する"""
+        entry = await self._get_entry(video_id)
+        if entry is None:
+            return None
+        metadata = entry.metadata.model_copy(update={"view_count": view_count})
+        await self._set_entry(_CacheEntry(metadata, entry.fetched_at, time.time()))
+        return metadata
+
+    async def _get_entry(self, video_id: str) -> Optional[_CacheEntry]:
+        """メモリ、ディスクの順にエントリを取得する"""
+        entry = self._memory.get(video_id)
+        if entry is not None or self._store is None:
+            return entry
+
+        data = await asyncio.to_thread(self._store.get, video_id)
+        if data is None:
+            return None
+        try:
+            payload = json.loads(data)
+            entry = _CacheEntry(
+                metadata=schemas.VideoMetadata.model_validate(payload["metadata"]),
+                fetched_at=payload["fetched_at"],
+                refreshed_at=payload["refreshed_at"],
+            )
+        except Exception as e:
+            logger.warning(f"Invalid metadata cache entry for {video_id}: {e}")
+            return None
+
+        metrics.increment("youtube.metadata_cache.disk_hit")
+        self._memory.set(video_id, entry)
+        return entry
+
+    async def _set_entry(self, entry: _CacheEntry) -> None:
+        """メモリとディスクにエントリを保存する"""
+        video_id = entry.metadata.video_id
+        self._memory.set(video_id, entry)
+        if self._store is None:
+            return
+
+        payload = json.dumps(
+            {
+                "metadata": entry.metadata.model_dump(mode="json"),
+                "fetched_at": entry.fetched_at,
+                "refreshed_at": entry.refreshed_at,
+            }
+        ).encode("utf-8")
+        try:
+            await asyncio.to_thread(self._store.put, video_id, payload)
+        except OSError as e:
+            logger.warning(f"Failed to persist metadata cache for {video_id}: {e}")
@@ -0,0 +1,116 @@
+import random
+from typing import Any, Awaitable, Callable, Optional
+
+from ..core.config import (
+    NOTION_BACKOFF_BASE,
+    NOTION_BACKOFF_MAX,
+    NOTION_BURST,
+    NOTION_MAX_QUEUE,
+    NOTION_MAX_RETRIES,
+    NOTION_RATE_LIMIT,
+)
+from ..core.exceptions import APIException
+from ..core.logging import get_logger
+from ..core.metrics import metrics
+from ..core.throttle import TokenBucket
+
+logger = get_logger(__name__)
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    return getattr(error, "status", None) == 429
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """レスポンスの Retry-After ヘッダー（秒）を取得する"""
+    headers = getattr(error, "headers", None)
+    value = headers.get("retry-after") if headers is not None else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class NotionPacer:
+    """Notion API呼び出しのペース制御クラス
+    すべての呼び出しをトークンバケットで rate リクエスト/秒に抑え、超過分は到着順に
+    待機させる。待機数が上限を超えた場合は即座に拒否する。レート制限（429）を受けた
+    場合は Retry-After（なければ指数バックオフ）の間バケット全体を停止してから再試行する。
+    """
+
+    def __init__(
+        self,
+        rate: float = NOTION_RATE_LIMIT,
+        burst: int = NOTION_BURST,
+        max_queue: int = NOTION_MAX_QUEUE,
+        max_retries: int = NOTION_MAX_RETRIES,
+        backoff_base: float = NOTION_BACKOFF_BASE,
+        backoff_max: float = NOTION_BACKOFF_MAX,
+    ):
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._bucket = TokenBucket(rate=rate, capacity=burst)
+        self.in_flight = 0
+        metrics.register_gauge("notion.in_flight", lambda: self.in_flight)
+        metrics.register_gauge("notion.queued", lambda: self.queued)
+
+    @property
+    def queued(self) -> int:
+        """送信待ちのリクエスト数"""
+        return self._bucket.waiting
+
+    async def _acquire(self) -> None:
+        """送信枠を確保する（待機数が上限を超えている場合は拒否する）"""
+        if self.queued >= self.max_queue:
+            metrics.increment("notion.rejected")
+            raise APIException(
+                status_code=429,
+                message="Too many Notion requests are waiting. Please retry later.",
+                error_code="E004",
+            )
+        waited = await self._bucket.acquire()
+        metrics.observe("notion.queue_wait_seconds", waited)
+
+    def _backoff(self, attempt: int, error: Exception) -> None:
+        """レート制限が解除されるまで送信を止める（再試行できない場合はエラーを送出する）"""
+        if attempt >= self.max_retries:
+            metrics.increment("notion.rate_limited")
+            raise APIException(
+                status_code=429,
+                message="Notion API rate limit exceeded. Please retry later.",
+                error_code="E004",
+            ) from error
+
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+        hint = _retry_after(error)
+        if hint is not None:
+            delay = max(delay, min(hint, self.backoff_max))
+        # 他の待機中のリクエストも同じ期間だけ止め、制限中に送信しないようにする
+        self._bucket.pause(delay)
+        metrics.increment("notion.retries")
+        logger.warning(
+            f"Notion API rate limited, retrying in {delay:.1f}s "
+            f"(attempt {attempt + 1}/{self.max_retries})"
+        )
+
+    async def call(self, func: Callable[..., Awaitable[Any]], **kwargs) -> Any:
+        """Notion APIのメソッドをペース制御・再試行付きで呼び出す
+        Args:
+            func: 呼び出すメソッド（例: notion.pages.create）
+            **kwargs: メソッドの引数
+        """
+        attempt = 0
+        while True:
+            await self._acquire()
+            self.in_flight += 1
+            try:
+                return await func(**kwargs)
+            except Exception as e:
+                if not _is_rate_limited(e):
+                    raise
+                self._backoff(attempt, e)
+                attempt += 1
+            finally:
+                self.in_flight -= 1
@@ -1,15 +1,25 @@
+from typing import Optional
+
 from notion_client import AsyncClient
 
-from ..core.config import NOTION_API_KEY, NOTION_DATABASE_ID
+from ..core.config import (
+    NOTION_API_KEY,
+    NOTION_API_VERSION,
+    NOTION_DATABASE_ID,
+    NOTION_SESSION_PROPERTY,
+)
 from ..core.exceptions import APIException
 from ..core.logging import get_logger
 from ..models import schemas
+from .notion_pacer import NotionPacer
 
 logger = get_logger(__name__)
 
 
 class NotionService:
-    """要約内容登録クラス"""
+    """要約内容登録クラス
+    Notion APIの呼び出しはすべて NotionPacer を経由し、レート制限内に抑える。
+    """
 
     def __init__(self):
         if not NOTION_API_KEY or not NOTION_DATABASE_ID:
@@ -19,42 +29,51 @@ class NotionService:
                 message="Notion API key or Database ID is not configured.",
                 error_code="E010",
             )
-        self.notion = AsyncClient(auth=NOTION_API_KEY)
+        self.notion = AsyncClient(auth=NOTION_API_KEY, notion_version=NOTION_API_VERSION)
         self.database_id = NOTION_DATABASE_ID
+        self.session_property = NOTION_SESSION_PROPERTY
+        self.pacer = NotionPacer()
         logger.info("NotionService initialized successfully.")
 
     async def register_page(
         self,
         modifications: schemas.RegisterModifications,
         video_data: schemas.VideoMetadata,
+        session_id: Optional[str] = None,
     ) -> str:
         """
         Notionにページを登録
         Args:
             modifications: ユーザーによる修正内容
             video_data: 動画メタデータ
+            session_id: セッションID（NOTION_SESSION_PROPERTY が設定されている場合に記録する）
         Returns:
             str: 作成されたページのURL
         """
+        properties = {
+            "Name": {"title": [{"text": {"content": modifications.title}}]},
+            "分類": {
+                "multi_select": [{"name": name} for name in modifications.categories]
+            },
+            "感情": {"select": {"name": modifications.emotions}},
+            "動画URL": {"url": str(video_data.url)},
+            "チャンネル名": {
+                "rich_text": [{"text": {"content": video_data.channel_name}}]
+            },
+            "公開日": {"date": {"start": video_data.published_at.isoformat()}},
+            "動画時間": {"number": video_data.duration_seconds},
+            "視聴回数": {"number": video_data.view_count},
+        }
+        if self.session_property and session_id:
+            properties[self.session_property] = {
+                "rich_text": [{"text": {"content": session_id}}]
+            }
+
         try:
-            new_page = await self.notion.pages.create(
+            new_page = await self.pacer.call(
+                self.notion.pages.create,
                 parent={"database_id": self.database_id},
-                properties={
-                    "Name": {"title": [{"text": {"content": modifications.title}}]},
-                    "分類": {
-                        "multi_select": [
-                            {"name": name} for name in modifications.categories
-                        ]
-                    },
-                    "感情": {"select": {"name": modifications.emotions}},
-                    "動画URL": {"url": str(video_data.url)},
-                    "チャンネル名": {
-                        "rich_text": [{"text": {"content": video_data.channel_name}}]
-                    },
-                    "公開日": {"date": {"start": video_data.published_at.isoformat()}},
-                    "動画時間": {"number": video_data.duration_seconds},
-                    "視聴回数": {"number": video_data.view_count},
-                },
+                properties=properties,
                 children=[
                     {
                         "object": "block",
@@ -90,6 +109,45 @@ class NotionService:
             logger.info(f"Successfully created Notion page: {new_page['url']}")
             return new_page["url"]
 
+        except APIException:
+            raise
+        except Exception as e:
+            logger.error(f"Notion API error: {e}")
+            raise APIException(
+                status_code=502,
+                message=f"An error occurred while communicating with the notion service: {e}",
+                error_code="E008",
+            )
+
+    async def find_page(self, session_id: str, video_url: str) -> Optional[str]:
+        """
+        中断された登録で作成済みのページを検索
+        NOTION_SESSION_PROPERTY が設定されている場合はセッションIDで、未設定の場合は
+        動画URLで検索する。
+        Args:
+            session_id: セッションID
+            video_url: 動画URL
+        Returns:
+            str: 見つかったページのURL（存在しない場合はNone）
+        """
+        if self.session_property:
+            query_filter = {
+                "property": self.session_property,
+                "rich_text": {"equals": session_id},
+            }
+        else:
+            query_filter = {"property": "動画URL", "url": {"equals": video_url}}
+
+        try:
+            # クライアントのバージョンによらず使えるよう、エンドポイントを直接呼び出す
+            response = await self.pacer.call(
+                self.notion.request,
+                path=f"databases/{self.database_id}/query",
+                method="POST",
+                body={"filter": query_filter, "page_size": 1},
+            )
+        except APIException:
+            raise
         except Exception as e:
             logger.error(f"Notion API error: {e}")
             raise APIException(
@@ -97,3 +155,6 @@ class NotionService:
                 message=f"An error occurred while communicating with the notion service: {e}",
                 error_code="E008",
             )
+
+        results = response.get("results", [])
+        return results[0]["url"] if results else None
@@ -0,0 +1,112 @@
+import asyncio
+
+from ..core.config import REGISTER_BATCH_WORKERS
+from ..core.logging import get_logger
+from ..core.metrics import metrics
+from ..models import schemas
+from .notion_service import NotionService
+from .session_service import SessionService
+from .tag_classifier import TagClassifier
+
+logger = get_logger(__name__)
+
+
+class RegisterJobs:
+    """セッション単位のNotion登録ジョブ管理クラス
+    登録はリクエストから切り離したタスクで実行し、同時に登録するセッション数を
+    max_workers までに抑える。Notionへの送信ペースは NotionService の NotionPacer が制御する。
+    同じセッションの登録が実行中の場合は同じタスクを返し、ページを作成済みのセッションは
+    再登録しない。ページのURLは作成直後にセッションに保存する。登録内容を記録したまま
+    中断されたセッションは、セッションID（NOTION_SESSION_PROPERTY が未設定の場合は動画URL）で
+    作成済みのページを検索する。
+    """
+
+    def __init__(
+        self,
+        notion_service: NotionService,
+        session_service: SessionService,
+        tag_classifier: TagClassifier,
+        max_workers: int = REGISTER_BATCH_WORKERS,
+    ):
+        self.notion_service = notion_service
+        self.session_service = session_service
+        self.tag_classifier = tag_classifier
+        self._semaphore = asyncio.Semaphore(max_workers)
+        self._tasks: dict[str, asyncio.Task] = {}
+        metrics.register_gauge("register.jobs.running", lambda: len(self._tasks))
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def submit(
+        self, session_id: str, modifications: schemas.RegisterModifications
+    ) -> "asyncio.Task[schemas.SessionInfo]":
+        """セッションの登録を開始する（実行中の場合はそのタスクを返す）
+        Args:
+            session_id (str): セッションID
+            modifications (schemas.RegisterModifications): ユーザーによる修正内容
+        Returns:
+            asyncio.Task: 登録結果を保存したセッション情報を返すタスク
+        """
+        task = self._tasks.get(session_id)
+        if task is not None:
+            metrics.increment("register.jobs.attached")
+            return task
+
+        task = asyncio.create_task(self._run(session_id, modifications))
+        self._tasks[session_id] = task
+        task.add_done_callback(lambda done: self._on_done(session_id, done))
+        return task
+
+    def _on_done(self, session_id: str, task: asyncio.Task) -> None:
+        if self._tasks.get(session_id) is task:
+            del self._tasks[session_id]
+        # 待機しているリクエストがない場合も、例外を取得済みとして扱う
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Register job failed for session_id {session_id}: {task.exception()}")
+
+    async def _run(
+        self, session_id: str, modifications: schemas.RegisterModifications
+    ) -> schemas.SessionInfo:
+        session_info = await self.session_service.load_session(session_id)
+        if session_info.status == "registered" and session_info.notion_url is not None:
+            metrics.increment("register.jobs.skipped")
+            return session_info
+
+        if session_info.notion_url is None:
+            async with self._semaphore:
+                notion_url = None
+                # 登録内容の記録があるのに未登録の場合は、前回の登録が中断された可能性がある
+                if session_info.modifications is not None:
+                    notion_url = await self.notion_service.find_page(
+                        session_id, str(session_info.video_data.url)
+                    )
+                    if notion_url is not None:
+                        metrics.increment("register.jobs.recovered")
+                        logger.info(f"Found existing Notion page for session_id: {session_id}")
+
+                if notion_url is None:
+                    session_info.modifications = modifications
+                    await self.session_service.save_session(session_info)
+                    notion_url = await self.notion_service.register_page(
+                        modifications, session_info.video_data, session_id
+                    )
+
+            # 以降の処理が中断されてもページを再作成しないよう、URLを先に保存する
+            session_info.notion_url = str(notion_url)
+            await self.session_service.save_session(session_info)
+        else:
+            # ページ作成後、登録完了の保存前に中断されたセッション
+            metrics.increment("register.jobs.recovered")
+
+        await self.tag_classifier.learn(
+            session_info.transcript, modifications, session_info.tag_prediction
+        )
+
+        session_info.status = "registered"
+        session_info.modifications = modifications
+        await self.session_service.save_session(session_info)
+        logger.info(
+            f"Session status updated to 'registered' for session_id: {session_id}"
+        )
+        return session_info
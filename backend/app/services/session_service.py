@@ -1,4 +1,6 @@
 import os
+import uuid
+
 import aiofiles
 from fastapi import status
 
@@ -15,15 +17,21 @@ class SessionService:
         return os.path.join(DATA_DIR, f"{session_id}.json")
 
     async def save_session(self, session_info: SessionInfo):
-        """セッション情報をファイルに保存"""
+        """セッション情報をファイルに保存
+        書き込み途中で中断してもファイルが壊れないよう、一時ファイルに書き込んでから置き換える。
+        """
         session_file_path = self._get_session_file_path(session_info.session_id)
+        tmp_path = f"{session_file_path}.{uuid.uuid4().hex}.tmp"
         try:
             # ディレクトリが存在しない場合は作成
             os.makedirs(DATA_DIR, exist_ok=True)
-            async with aiofiles.open(session_file_path, "w", encoding="utf-8") as f:
+            async with aiofiles.open(tmp_path, "w", encoding="utf-8") as f:
                 await f.write(session_info.model_dump_json(indent=4))
+            os.replace(tmp_path, session_file_path)
 
         except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
             raise APIException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 message=f"Failed to save session data: {e}",
@@ -0,0 +1,64 @@
+import json
+import re
+from typing import Optional
+
+_SUMMARY_START = re.compile(r'"summary"\s*:\s*"')
+
+
+class SummaryExtractor:
+    """ストリーミング中のJSONから summary の値を逐次取り出すクラス
+    受信したテキストを順に渡すと、summary の文字列のうち新たに確定した部分を返す。
+    エスケープシーケンスがチャンクの境界で分割されている場合は、次のチャンクを待って復号する。
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._position = -1  # summary の値の未処理位置（開始前は-1）
+        self.done = False
+
+    def feed(self, text: str) -> str:
+        """受信したテキストを追加し、新たに確定した summary の文字列を返す"""
+        self._buffer += text
+        if self.done:
+            return ""
+        if self._position < 0:
+            match = _SUMMARY_START.search(self._buffer)
+            if match is None:
+                return ""
+            self._position = match.end()
+
+        output = []
+        buffer, position = self._buffer, self._position
+        while position < len(buffer):
+            char = buffer[position]
+            if char == '"':
+                self.done = True
+                position += 1
+                break
+            if char != "\\":
+                output.append(char)
+                position += 1
+                continue
+
+            length = self._escape_length(buffer, position)
+            if length is None:
+                break  # エスケープシーケンスの続きを待つ
+            output.append(json.loads(f'"{buffer[position:position + length]}"'))
+            position += length
+
+        self._position = position
+        return "".join(output)
+
+    @staticmethod
+    def _escape_length(buffer: str, position: int) -> Optional[int]:
+        """エスケープシーケンスの長さ（未受信の場合はNone）"""
+        if position + 1 >= len(buffer):
+            return None
+        if buffer[position + 1] != "u":
+            return 2
+        if position + 6 > len(buffer):
+            return None
+        # サロゲートペアは2つ揃ってから復号する
+        if 0xD800 <= int(buffer[position + 2 : position + 6], 16) <= 0xDBFF:
+            return 12 if position + 12 <= len(buffer) else None
+        return 6
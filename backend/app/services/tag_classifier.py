@@ -0,0 +1,199 @@
+import asyncio
+import glob
+import os
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+from ..core.config import (
+    DATA_DIR,
+    TAG_CLASSIFIER_ENABLED,
+    TAG_CLASSIFIER_MIN_CONFIDENCE,
+    TAG_CLASSIFIER_MIN_SAMPLES,
+)
+from ..core.logging import get_logger
+from ..core.metrics import metrics
+from ..models import schemas
+from .text_features import term_frequencies
+
+logger = get_logger(__name__)
+
+# TF-IDFの特徴量の次元数（文字bigramをハッシュして割り当てる）
+_FEATURES = 4096
+# 類似度を確率に変換する際の鋭さ（大きいほど類似度の差を強調する）
+_SHARPNESS = 20.0
+# 最も確率の高いカテゴリに対して、この比率以上のカテゴリも採用する
+_CATEGORY_RATIO = 0.5
+_MAX_CATEGORIES = 3
+
+
+def _softmax(scores: np.ndarray) -> np.ndarray:
+    exp = np.exp(_SHARPNESS * (scores - scores.max()))
+    return exp / exp.sum()
+
+
+class _LabelCentroids:
+    """ラベルごとの文書ベクトルの合計（重心の計算用）"""
+
+    def __init__(self):
+        self.sums: dict[str, np.ndarray] = {}
+
+    def add(self, label: str, vector: np.ndarray) -> None:
+        if label not in self.sums:
+            self.sums[label] = np.zeros(_FEATURES, dtype=np.float32)
+        self.sums[label] += vector
+
+    def scores(self, vector: np.ndarray, idf: np.ndarray) -> tuple[list[str], np.ndarray]:
+        """IDFで重み付けした重心とのコサイン類似度を求める"""
+        labels = list(self.sums)
+        centroids = np.stack([self.sums[label] for label in labels]) * idf
+        norms = np.linalg.norm(centroids, axis=1)
+        return labels, centroids @ vector / np.where(norms == 0, 1, norms)
+
+
+class TagClassifier:
+    """カテゴリ・感情タグの推定クラス
+    登録済みセッションの字幕と、ユーザーが最終的に選んだタグから学習し、
+    字幕の文字bigramのTF-IDFとタグごとの重心との類似度でタグを推定する。
+    登録のたびに重心を更新するため、再学習は不要。
+    """
+
+    def __init__(
+        self,
+        enabled: bool = TAG_CLASSIFIER_ENABLED,
+        min_samples: int = TAG_CLASSIFIER_MIN_SAMPLES,
+        min_confidence: float = TAG_CLASSIFIER_MIN_CONFIDENCE,
+    ):
+        self.enabled = enabled
+        self.min_samples = min_samples
+        self.min_confidence = min_confidence
+        self.documents = 0
+        self._df = np.zeros(_FEATURES, dtype=np.float32)
+        self._categories = _LabelCentroids()
+        self._emotions = _LabelCentroids()
+        self._lock = threading.Lock()
+        self._load_lock = asyncio.Lock()
+        self._loaded = False
+        metrics.register_gauge("tag_classifier.documents", lambda: self.documents)
+
+    @staticmethod
+    def _vectorize(text: str) -> np.ndarray:
+        """字幕を対数スケールのTF（L2正規化）に変換する"""
+        tf = np.log1p(term_frequencies([text], _FEATURES)[0])
+        norm = np.linalg.norm(tf)
+        return tf / norm if norm else tf
+
+    def _idf(self) -> np.ndarray:
+        return (np.log((1 + self.documents) / (1 + self._df)) + 1).astype(np.float32)
+
+    def add(self, text: str, categories: list[str], emotions: str) -> None:
+        """登録内容を学習する"""
+        vector = self._vectorize(text)
+        with self._lock:
+            self.documents += 1
+            self._df += vector > 0
+            for category in categories:
+                self._categories.add(category, vector)
+            self._emotions.add(emotions, vector)
+
+    def classify(self, text: str) -> Optional[schemas.TagPrediction]:
+        """字幕からタグを推定する（学習データが不足している場合はNone）"""
+        if self.documents < self.min_samples or not self._categories.sums:
+            return None
+
+        with self._lock:
+            idf = self._idf()
+            vector = self._vectorize(text) * idf
+            norm = np.linalg.norm(vector)
+            if norm == 0:
+                return None
+            vector /= norm
+            category_labels, category_scores = self._categories.scores(vector, idf)
+            emotion_labels, emotion_scores = self._emotions.scores(vector, idf)
+
+        category_probs = _softmax(category_scores)
+        emotion_probs = _softmax(emotion_scores)
+        order = np.argsort(-category_probs, kind="stable")[:_MAX_CATEGORIES]
+        categories = [
+            category_labels[index]
+            for index in order
+            if category_probs[index] >= category_probs[order[0]] * _CATEGORY_RATIO
+        ]
+        confidence = float(min(category_probs[order[0]], emotion_probs.max()))
+        return schemas.TagPrediction(
+            categories=categories,
+            emotions=emotion_labels[int(emotion_probs.argmax())],
+            confidence=confidence,
+            confident=confidence >= self.min_confidence,
+        )
+
+    def _load(self) -> None:
+        """保存済みのセッションから登録済みのものを学習する"""
+        for path in glob.glob(os.path.join(DATA_DIR, "*.json")):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    session_info = schemas.SessionInfo.model_validate_json(f.read())
+            except Exception as e:
+                logger.warning(f"Skipped session file for tag classifier {path}: {e}")
+                continue
+            modifications = session_info.modifications
+            if session_info.status == "registered" and modifications is not None:
+                self.add(session_info.transcript, modifications.categories, modifications.emotions)
+
+    async def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            start = time.monotonic()
+            await asyncio.to_thread(self._load)
+            self._loaded = True
+            logger.info(
+                f"Tag classifier trained on {self.documents} registered sessions "
+                f"in {time.monotonic() - start:.2f}s"
+            )
+
+    async def predict(self, text: str) -> Optional[schemas.TagPrediction]:
+        """字幕からカテゴリ・感情タグを推定する
+        Args:
+            text (str): 字幕テキスト
+        Returns:
+            schemas.TagPrediction: 推定結果（無効・学習データ不足の場合はNone）
+        """
+        if not self.enabled:
+            return None
+        await self._ensure_loaded()
+        prediction = await asyncio.to_thread(self.classify, text)
+        if prediction is not None:
+            metrics.increment(
+                "tag_classifier.confident" if prediction.confident else "tag_classifier.uncertain"
+            )
+        return prediction
+
+    async def learn(
+        self,
+        text: str,
+        modifications: schemas.RegisterModifications,
+        prediction: Optional[schemas.TagPrediction] = None,
+    ) -> None:
+        """登録内容を学習する
+        Args:
+            text (str): 字幕テキスト
+            modifications (schemas.RegisterModifications): ユーザーが最終的に登録した内容
+            prediction (schemas.TagPrediction): 収集時の推定結果（一致率の記録用）
+        """
+        if not self.enabled:
+            return
+        await self._ensure_loaded()
+        if prediction is not None:
+            metrics.increment(
+                "tag_classifier.emotion_match"
+                if prediction.emotions == modifications.emotions
+                else "tag_classifier.emotion_mismatch"
+            )
+        await asyncio.to_thread(
+            self.add, text, modifications.categories, modifications.emotions
+        )
@@ -0,0 +1,22 @@
+import zlib
+
+import numpy as np
+
+
+def term_frequencies(texts: list[str], features: int) -> np.ndarray:
+    """文字bigramをハッシュして features 次元に割り当てた出現回数の行列を作成する
+    Args:
+        texts (list[str]): テキスト
+        features (int): 特徴量の次元数
+    Returns:
+        np.ndarray: (テキスト数, features) の出現回数
+    """
+    rows, columns = [], []
+    for row, text in enumerate(texts):
+        for i in range(len(text) - 1):
+            rows.append(row)
+            columns.append(zlib.crc32(text[i : i + 2].encode("utf-8")) % features)
+
+    tf = np.zeros((len(texts), features), dtype=np.float32)
+    np.add.at(tf, (np.array(rows, dtype=np.intp), np.array(columns, dtype=np.intp)), 1)
+    return tf
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import os
+from typing import Optional
+
+from ..core.cache import DiskStore
+from ..core.config import (
+    CACHE_DIR,
+    TRANSCRIPT_CACHE_ENABLED,
+    TRANSCRIPT_CACHE_MAX_BYTES,
+)
+from ..core.logging import get_logger
+from ..core.metrics import metrics
+from ..models import schemas
+
+logger = get_logger(__name__)
+
+
+class TranscriptCache:
+    """字幕キャッシュクラス
+    字幕は (動画ID, 言語) ごとに不変のため、圧縮してディスクに永続化する。
+    1エントリ1ファイルのため、他のエントリを展開せずに読み出せる。
+    """
+
+    def __init__(
+        self,
+        enabled: bool = TRANSCRIPT_CACHE_ENABLED,
+        max_bytes: int = TRANSCRIPT_CACHE_MAX_BYTES,
+    ):
+        self._store = (
+            DiskStore(os.path.join(CACHE_DIR, "transcripts"), max_bytes, compress=True)
+            if enabled
+            else None
+        )
+        if self._store is not None:
+            metrics.register_gauge("youtube.transcript_cache.bytes", self._store.size)
+
+    @staticmethod
+    def _get_key(video_id: str, language: str) -> str:
+        return f"{video_id}:{language}"
+
+    async def get(
+        self, video_id: str, languages: list[str]
+    ) -> Optional[tuple[str, schemas.Transcript]]:
+        """優先順に言語を検索し、最初に見つかった字幕を返す
+        Args:
+            video_id (str): 動画ID
+            languages (list[str]): 優先順の言語コード
+        Returns:
+            tuple[str, schemas.Transcript]: 言語コードと字幕（見つからない場合はNone）
+        """
+        if self._store is None:
+            return None
+
+        for language in languages:
+            data = await asyncio.to_thread(
+                self._store.get, self._get_key(video_id, language)
+            )
+            if data is None:
+                continue
+            try:
+                payload = json.loads(data)
+                transcript = schemas.Transcript.model_validate(payload["transcript"])
+            except (ValueError, KeyError) as e:
+                logger.warning(f"Invalid transcript cache entry for {video_id}: {e}")
+                continue
+            metrics.increment("youtube.transcript_cache.hit")
+            return payload["language"], transcript
+
+        metrics.increment("youtube.transcript_cache.miss")
+        return None
+
+    async def put(self, video_id: str, transcript: schemas.Transcript) -> None:
+        """字幕を保存する"""
+        if self._store is None:
+            return
+
+        payload = json.dumps(
+            {
+                "video_id": video_id,
+                "language": transcript.language,
+                "transcript": transcript.model_dump(mode="json"),
+            },
+            ensure_ascii=False,
+        ).encode("utf-8")
+        try:
+            await asyncio.to_thread(
+                self._store.put, self._get_key(video_id, transcript.language), payload
+            )
+        except OSError as e:
+            logger.warning(f"Failed to persist transcript cache for {video_id}: {e}")
@@ -0,0 +1,42 @@
+# Geminiのトークン数の概算に使う、ASCII文字1トークンあたりの文字数
+_ASCII_CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """テキストのトークン数を概算する
+    ASCII文字は4文字で1トークン、それ以外（日本語など）は1文字1トークンとして数える。
+    """
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    non_ascii_chars = len(text) - ascii_chars
+    return non_ascii_chars + -(-ascii_chars // _ASCII_CHARS_PER_TOKEN)
+
+
+def split_transcript(text: str, max_tokens: int) -> list[str]:
+    """字幕テキストをトークン数の上限ごとに分割する
+    字幕スニペットの区切り（空白）で分割し、1スニペットが上限を超える場合のみ文字数で分割する。
+    Args:
+        text (str): 字幕テキスト
+        max_tokens (int): 1チャンクあたりのトークン数の上限
+    Returns:
+        list[str]: 分割したテキスト（元の順序を保持）
+    """
+    chunks: list[str] = []
+    current: list[str] = []
+    current_tokens = 0
+    for piece in text.split():
+        # 1文字は最大1トークンのため、上限と同じ文字数で分割すれば収まる
+        parts = (
+            [piece[i : i + max_tokens] for i in range(0, len(piece), max_tokens)]
+            if len(piece) > max_tokens
+            else [piece]
+        )
+        for part in parts:
+            tokens = estimate_tokens(part) + 1
+            if current and current_tokens + tokens > max_tokens:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(part)
+            current_tokens += tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
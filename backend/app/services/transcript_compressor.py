@@ -0,0 +1,179 @@
+import re
+import time
+import unicodedata
+from dataclasses import dataclass
+
+import numpy as np
+
+from ..core.config import TRANSCRIPT_COMPRESSION_RATIO
+from ..core.logging import get_logger
+from ..core.metrics import metrics
+from .text_features import term_frequencies
+from .transcript_chunker import estimate_tokens
+
+logger = get_logger(__name__)
+
+# 字幕に含まれる効果音・注記（[音楽]、(拍手) など）。(iPhone 15) のような補足は残す
+_ANNOTATION = re.compile(
+    r"[\[(【]\s*(?:音楽|拍手|笑い?|爆笑|歓声|効果音|BGM|music|applause|laughter|laughs?)\s*[\])】]",
+    re.IGNORECASE,
+)
+# 意味を持たないフィラー（「あの」「まあ」などは指示語・副詞と区別できないため伸ばした形のみ）
+_FILLER = re.compile(
+    r"(?:えー+と?|ええ+と|えっと|あのー+|そのー+|まぁ+|うー+ん|んー+|あー+)[、,]?"
+    r"|\b(?:u+h+|u+m+|e+r+m*)\b,?",
+    re.IGNORECASE,
+)
+# 3回以上連続する同じフレーズ（「すごいすごいすごい」など）。数値を変えないよう数字・区切りは含めない
+_REPETITION = re.compile(r"([^\d,.]{2,20}?)\1{2,}")
+_SENTENCE_END = re.compile(r"(?<=[。！？!?])\s*")
+_SEPARATOR_ONLY = re.compile(r"[\s、。,.!?！？]*")
+
+# 句読点のない自動生成字幕を区切る目安の文字数
+_SEGMENT_CHARS = 80
+# 直前の何セグメントと重複を比較するか
+_DEDUPE_WINDOW = 5
+_DEDUPE_THRESHOLD = 0.8
+# TF-IDFの特徴量の次元数（文字bigramをハッシュして割り当てる）
+_FEATURES = 2048
+_DAMPING = 0.85
+_ITERATIONS = 30
+
+
+@dataclass
+class CompressionResult:
+    """字幕圧縮の結果"""
+
+    text: str
+    original_tokens: int
+    compressed_tokens: int
+    elapsed: float  # 処理時間（秒）
+
+
+def _normalize(text: str) -> str:
+    """表記ゆれ・注記・フィラー・連続する繰り返しを取り除く"""
+    text = unicodedata.normalize("NFKC", text)
+    text = _ANNOTATION.sub(" ", text)
+    text = _FILLER.sub("", text)
+    text = _REPETITION.sub(r"\1", text)
+    return " ".join(text.split())
+
+
+def _segment(text: str) -> list[str]:
+    """文末の句読点で分割し、句読点のない長い部分は空白区切りでまとめ直す"""
+    segments = []
+    for sentence in _SENTENCE_END.split(text):
+        if len(sentence) <= _SEGMENT_CHARS * 2:
+            segments.append(sentence)
+            continue
+        current = []
+        length = 0
+        for piece in sentence.split():
+            current.append(piece)
+            length += len(piece) + 1
+            if length >= _SEGMENT_CHARS:
+                segments.append(" ".join(current))
+                current, length = [], 0
+        if current:
+            segments.append(" ".join(current))
+    return [segment for segment in segments if not _SEPARATOR_ONLY.fullmatch(segment)]
+
+
+def _shingles(segment: str) -> set[str]:
+    key = re.sub(r"[\s、。,.!?！？]", "", segment.lower())
+    return {key[i : i + 3] for i in range(max(len(key) - 2, 1))}
+
+
+def _deduplicate(segments: list[str]) -> list[str]:
+    """完全一致、または直前のセグメントとほぼ同じセグメントを取り除く"""
+    seen = set()
+    kept: list[tuple[str, set[str]]] = []
+    for segment in segments:
+        shingles = _shingles(segment)
+        key = frozenset(shingles)
+        if key in seen:
+            continue
+        if any(
+            len(shingles & previous) / len(shingles | previous) >= _DEDUPE_THRESHOLD
+            for _, previous in kept[-_DEDUPE_WINDOW:]
+        ):
+            continue
+        seen.add(key)
+        kept.append((segment, shingles))
+    return [segment for segment, _ in kept]
+
+
+def _score(segments: list[str]) -> np.ndarray:
+    """TF-IDFの類似度グラフにTextRankを適用し、セグメントの重要度を求める"""
+    n = len(segments)
+    tf = term_frequencies(segments, _FEATURES)
+    df = np.count_nonzero(tf, axis=0)
+    tfidf = tf * (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+    norms = np.linalg.norm(tfidf, axis=1, keepdims=True)
+    tfidf /= np.where(norms == 0, 1, norms)
+
+    similarity = tfidf @ tfidf.T
+    np.fill_diagonal(similarity, 0)
+    totals = similarity.sum(axis=1, keepdims=True)
+    transition = np.where(totals == 0, 1 / n, similarity / np.where(totals == 0, 1, totals))
+
+    scores = np.full(n, 1 / n, dtype=np.float32)
+    for _ in range(_ITERATIONS):
+        scores = (1 - _DAMPING) / n + _DAMPING * (transition.T @ scores)
+    return scores
+
+
+def _select(segments: list[str], budget: int) -> list[str]:
+    """重要度の高いセグメントをトークン数の予算内で選び、元の順序で返す"""
+    scores = _score(segments)
+    selected = []
+    used = 0
+    for index in np.argsort(-scores, kind="stable"):
+        tokens = estimate_tokens(segments[index]) + 1
+        if used + tokens > budget:
+            continue
+        selected.append(index)
+        used += tokens
+    return [segments[index] for index in sorted(selected)]
+
+
+def compress_transcript(
+    text: str, ratio: float = TRANSCRIPT_COMPRESSION_RATIO
+) -> CompressionResult:
+    """分析前に字幕テキストを圧縮する
+    フィラー・注記・重複を取り除き、ratio が1未満の場合は重要なセグメントを
+    元のトークン数の ratio 倍以内になるよう抽出する。
+    Args:
+        text (str): 字幕テキスト
+        ratio (float): 残すトークン数の目標比率（1.0の場合は抽出しない）
+    Returns:
+        CompressionResult: 圧縮後のテキストとトークン数
+    """
+    start = time.monotonic()
+    original_tokens = estimate_tokens(text)
+
+    segments = _deduplicate(_segment(_normalize(text)))
+    if ratio < 1.0 and len(segments) > 1:
+        segments = _select(segments, int(original_tokens * ratio))
+    compressed = " ".join(segments)
+
+    result = CompressionResult(
+        text=compressed,
+        original_tokens=original_tokens,
+        compressed_tokens=estimate_tokens(compressed),
+        elapsed=time.monotonic() - start,
+    )
+    metrics.observe(
+        "analysis.compression.tokens_saved",
+        result.original_tokens - result.compressed_tokens,
+    )
+    metrics.observe(
+        "analysis.compression.ratio",
+        result.compressed_tokens / result.original_tokens if result.original_tokens else 1.0,
+    )
+    metrics.observe("analysis.compression.seconds", result.elapsed)
+    logger.info(
+        f"Transcript compressed: {result.original_tokens} -> {result.compressed_tokens} tokens "
+        f"in {result.elapsed:.3f}s"
+    )
+    return result
@@ -0,0 +1,51 @@
+import sys
+from array import array
+from typing import Iterable
+
+from ..models import schemas
+
+# 各配列は32bit符号なし整数（リトルエンディアン）で保持する
+_TYPECODE = "I"
+assert array(_TYPECODE).itemsize == 4
+
+
+def _pack(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(_TYPECODE, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def build_transcript(
+    snippets: Iterable, language: str, is_generated: bool = False
+) -> schemas.Transcript:
+    """字幕スニペットから本文とセグメント情報を作成する
+    本文は各スニペットを半角スペースで連結したもので、セグメント情報は
+    開始時刻・長さ（ミリ秒）と本文内の開始位置を並列の配列で保持する。
+    Args:
+        snippets: text / start / duration を持つ字幕スニペット
+        language (str): 字幕言語
+        is_generated (bool): 自動生成字幕かどうか
+    Returns:
+        schemas.Transcript: 字幕
+    """
+    texts = []
+    starts, durations, offsets = array(_TYPECODE), array(_TYPECODE), array(_TYPECODE)
+    position = 0
+    for snippet in snippets:
+        offsets.append(position)
+        starts.append(round(snippet.start * 1000))
+        durations.append(round(snippet.duration * 1000))
+        texts.append(snippet.text)
+        position += len(snippet.text) + 1
+
+    return schemas.Transcript(
+        text=" ".join(texts),
+        language=language,
+        is_generated=is_generated,
+        segments=schemas.TranscriptSegments(
+            starts_ms=_pack(starts),
+            durations_ms=_pack(durations),
+            offsets=_pack(offsets),
+        ),
+    )
@@ -0,0 +1,230 @@
+import asyncio
+import os
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterator, Optional
+
+from ..core.config import (
+    GEMINI_CACHED_PRICE_RATIO,
+    GEMINI_DAILY_HARD_BUDGET,
+    GEMINI_DAILY_SOFT_BUDGET,
+    GEMINI_PRICES,
+    USAGE_LEDGER_PATH,
+)
+from ..core.exceptions import APIException
+from ..core.logging import get_logger
+from ..core.metrics import metrics
+from ..core.throttle import Priority
+from ..models import schemas
+
+logger = get_logger(__name__)
+
+# usage_scope() の中で記録された利用量（セッションへの記録用）
+_scope: ContextVar[Optional[list[schemas.UsageRecord]]] = ContextVar(
+    "usage_scope", default=None
+)
+
+# usage_metadata の項目名と、記録する項目名
+USAGE_FIELDS = (
+    ("prompt_token_count", "prompt_tokens"),
+    ("cached_content_token_count", "cached_tokens"),
+    ("candidates_token_count", "output_tokens"),
+)
+
+
+@contextmanager
+def usage_scope() -> Iterator[list[schemas.UsageRecord]]:
+    """スコープ内のGemini API呼び出しの利用量を収集する
+    スコープ内で作成したタスクの呼び出しも含む。
+    """
+    records: list[schemas.UsageRecord] = []
+    token = _scope.set(records)
+    try:
+        yield records
+    finally:
+        _scope.reset(token)
+
+
+def _empty_total() -> dict:
+    """日付・モデルごとの集計の初期値"""
+    return {
+        "requests": 0,
+        "prompt_tokens": 0,
+        "cached_tokens": 0,
+        "output_tokens": 0,
+        "latency_seconds": 0.0,
+        "cost_usd": 0.0,
+    }
+
+
+class UsageLedger:
+    """Gemini APIの利用量記録クラス
+    呼び出しごとのトークン数・所要時間・利用額を追記専用のJSONLファイルに記録し、
+    日付・モデルごとに集計する。ファイルは起動時にのみ読み込み、集計はメモリ上で更新する。
+    1日の利用額がソフト予算を超えると一括処理を、ハード予算を超えるとすべての分析を拒否する。
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        soft_budget: float = GEMINI_DAILY_SOFT_BUDGET,
+        hard_budget: float = GEMINI_DAILY_HARD_BUDGET,
+        prices: dict[str, tuple[float, float]] = GEMINI_PRICES,
+        cached_price_ratio: float = GEMINI_CACHED_PRICE_RATIO,
+    ):
+        self.path = path or USAGE_LEDGER_PATH
+        self.soft_budget = soft_budget
+        self.hard_budget = hard_budget
+        self.prices = prices
+        self.cached_price_ratio = cached_price_ratio
+        self._lock = asyncio.Lock()
+        self._day = self._today()
+        # 日付・モデルごとの集計（起動時に一度だけ台帳から読み込み、記録のたびに更新する）
+        self._totals: dict[tuple[date, str], dict] = defaultdict(_empty_total)
+        for record in self._read():
+            self._add(record)
+        self._today_cost = sum(
+            total["cost_usd"]
+            for (day, _), total in self._totals.items()
+            if day == self._day
+        )
+        metrics.register_gauge("gemini.usage.today_cost_usd", lambda: self.today_cost)
+
+    def _add(self, record: schemas.UsageRecord) -> None:
+        """記録を日付・モデルごとの集計に加える"""
+        day = record.timestamp.astimezone(timezone.utc).date()
+        total = self._totals[(day, record.model)]
+        total["requests"] += 1
+        for name in total:
+            if name != "requests":
+                total[name] += getattr(record, name)
+
+    @staticmethod
+    def _today() -> date:
+        return datetime.now(timezone.utc).date()
+
+    def _roll_day(self) -> None:
+        """日付が変わっていれば本日の利用額をリセットする"""
+        today = self._today()
+        if today != self._day:
+            logger.info(f"Gemini usage reset (cost ${self._today_cost:.4f} on {self._day})")
+            self._day = today
+            self._today_cost = 0.0
+
+    @property
+    def today_cost(self) -> float:
+        """本日（UTC）の利用額"""
+        self._roll_day()
+        return self._today_cost
+
+    def cost(self, model: str, prompt_tokens: int, cached_tokens: int, output_tokens: int) -> float:
+        """トークン数から利用額（USD）を計算する（単価が不明なモデルは0とする）"""
+        input_price, output_price = self.prices.get(model, (0.0, 0.0))
+        uncached_tokens = max(prompt_tokens - cached_tokens, 0)
+        return (
+            uncached_tokens * input_price
+            + cached_tokens * input_price * self.cached_price_ratio
+            + output_tokens * output_price
+        ) / 1_000_000
+
+    def check(self, priority: Priority = "interactive") -> None:
+        """分析前に予算を確認する
+        Args:
+            priority (str): interactive（通常のリクエスト）または bulk（一括処理・先行分析）
+        """
+        cost = self.today_cost
+        if self.hard_budget > 0 and cost >= self.hard_budget:
+            budget = "hard"
+        elif priority == "bulk" and self.soft_budget > 0 and cost >= self.soft_budget:
+            budget = "soft"
+        else:
+            return
+
+        metrics.increment(f"gemini.usage.rejected.{budget}")
+        logger.warning(f"Gemini {budget} budget exceeded: ${cost:.4f} used today")
+        raise APIException(
+            status_code=429,
+            message=f"Gemini API daily {budget} budget has been exceeded.",
+            error_code="E013",
+        )
+
+    async def record(
+        self, model: str, operation: str, response, latency_seconds: float
+    ) -> schemas.UsageRecord:
+        """レスポンスの usage_metadata から利用量を記録する
+        Args:
+            model (str): モデル名
+            operation (str): 処理（analyze / map / regenerate）
+            response: Gemini APIのレスポンス（ストリーミングの場合は最後のチャンク）
+            latency_seconds (float): 所要時間（秒）
+        """
+        usage = getattr(response, "usage_metadata", None)
+        tokens = {}
+        for field, name in USAGE_FIELDS:
+            value = getattr(usage, field, None)
+            tokens[name] = value if isinstance(value, int) else 0
+
+        record = schemas.UsageRecord(
+            timestamp=datetime.now(timezone.utc),
+            model=model,
+            operation=operation,
+            latency_seconds=latency_seconds,
+            cost_usd=self.cost(model, **tokens),
+            **tokens,
+        )
+        self._roll_day()
+        self._today_cost += record.cost_usd
+        self._add(record)
+        metrics.observe("gemini.usage.cost_usd", record.cost_usd)
+
+        scope = _scope.get()
+        if scope is not None:
+            scope.append(record)
+
+        async with self._lock:
+            try:
+                await asyncio.to_thread(self._append, record.model_dump_json() + "\n")
+            except OSError as e:
+                logger.warning(f"Failed to write Gemini usage ledger: {e}")
+        return record
+
+    def _append(self, line: str) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+    def _read(self) -> list[schemas.UsageRecord]:
+        """記録をすべて読み込む（不正な行は読み飛ばす）"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return []
+
+        records = []
+        for line in lines:
+            try:
+                records.append(schemas.UsageRecord.model_validate_json(line))
+            except ValueError:
+                logger.warning(f"Invalid Gemini usage ledger line skipped: {line[:100]}")
+        return records
+
+    async def rollup(self, days: int = 7) -> list[schemas.UsageRollup]:
+        """直近 days 日分の利用量を日付・モデルごとに集計する"""
+        since = self._today() - timedelta(days=days - 1)
+        return [
+            schemas.UsageRollup(day=day, model=model, **total)
+            for (day, model), total in sorted(self._totals.items())
+            if day >= since
+        ]
+
+    async def snapshot(self, days: int = 7) -> schemas.UsageStatus:
+        """本日の利用額と直近の集計を取得する"""
+        return schemas.UsageStatus(
+            today_cost_usd=self.today_cost,
+            soft_budget_usd=self.soft_budget or None,
+            hard_budget_usd=self.hard_budget or None,
+            rollups=await self.rollup(days),
+        )
@@ -0,0 +1,179 @@
+import asyncio
+import json
+import os
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from ..core.config import (
+    YOUTUBE_DAILY_QUOTA,
+    YOUTUBE_QUOTA_BURST,
+    YOUTUBE_QUOTA_PATH,
+    YOUTUBE_QUOTA_RESERVE,
+)
+from ..core.exceptions import APIException
+from ..core.logging import get_logger
+from ..core.metrics import metrics
+from ..core.throttle import Priority, TokenBucket
+from ..models import schemas
+
+logger = get_logger(__name__)
+
+# メソッドごとのクォータ消費量（https://developers.google.com/youtube/v3/determine_quota_cost）
+QUOTA_COSTS = {
+    "videos.list": 1,
+    "channels.list": 1,
+    "playlistItems.list": 1,
+    "search.list": 100,
+}
+
+# クォータは太平洋時間の0時にリセットされる
+try:
+    _QUOTA_TZ = ZoneInfo("America/Los_Angeles")
+except ZoneInfoNotFoundError:
+    _QUOTA_TZ = timezone(timedelta(hours=-8))
+
+
+class QuotaLedger:
+    """YouTube Data APIのクォータ管理クラス
+    メソッドごとの消費量を記録し、一括処理はトークンバケットで1日の予算内に収まるよう
+    ペースを調整する。一括処理は常に reserve を残し、対話的なリクエスト用に確保する。
+    本日の消費量はファイルに保存し、再起動後も引き継ぐ。
+    """
+
+    def __init__(
+        self,
+        daily_budget: int = YOUTUBE_DAILY_QUOTA,
+        reserve: int = YOUTUBE_QUOTA_RESERVE,
+        burst: int = YOUTUBE_QUOTA_BURST,
+        path: Optional[str] = None,
+    ):
+        self.daily_budget = daily_budget
+        self.reserve = min(reserve, daily_budget)
+        self.path = path or YOUTUBE_QUOTA_PATH
+        self._day = self._today()
+        self._used = 0
+        self._used_by_method: dict[str, int] = defaultdict(int)
+        self._lock = asyncio.Lock()
+        self._load()
+        self._bucket = TokenBucket(
+            rate=max(daily_budget - self.reserve, 1) / 86400, capacity=burst
+        )
+        metrics.register_gauge("youtube.quota.remaining", lambda: self.remaining)
+        metrics.register_gauge("youtube.quota.bulk_waiting", lambda: self._bucket.waiting)
+
+    @staticmethod
+    def _today() -> date:
+        return datetime.now(_QUOTA_TZ).date()
+
+    def _load(self) -> None:
+        """保存された本日の消費量を読み込む（前日以前の記録は使わない）"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if date.fromisoformat(state["day"]) != self._day:
+                return
+            self._used = int(state["used"])
+            self._used_by_method.update(state.get("used_by_method", {}))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Failed to load YouTube quota usage: {e}")
+            return
+        logger.info(f"YouTube quota usage restored: {self._used} used on {self._day}")
+
+    def _state(self) -> str:
+        return json.dumps(
+            {
+                "day": self._day.isoformat(),
+                "used": self._used,
+                "used_by_method": dict(self._used_by_method),
+            }
+        )
+
+    def _write(self, state: str) -> None:
+        """一時ファイルに書き込んでから置き換える（書き込み途中で中断しても壊れない）"""
+        tmp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(state)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            logger.warning(f"Failed to save YouTube quota usage: {e}")
+
+    async def _save(self) -> None:
+        """現在の消費量を保存する（保存順が前後しないよう、ロック内で状態を取得する）"""
+        async with self._lock:
+            await asyncio.to_thread(self._write, self._state())
+
+    def _roll_day(self) -> None:
+        """日付が変わっていれば消費量をリセットする"""
+        today = self._today()
+        if today != self._day:
+            logger.info(f"YouTube quota reset (used {self._used} on {self._day})")
+            self._day = today
+            self._used = 0
+            self._used_by_method.clear()
+
+    @property
+    def remaining(self) -> int:
+        """本日の残りクォータ"""
+        self._roll_day()
+        return max(self.daily_budget - self._used, 0)
+
+    async def acquire(self, method: str, priority: Priority = "interactive") -> None:
+        """API呼び出し前にクォータを確保する
+        Args:
+            method (str): APIメソッド名（例: videos.list）
+            priority (str): interactive（通常のリクエスト）または bulk（一括処理）
+        """
+        cost = QUOTA_COSTS.get(method, 1)
+        headroom = self.reserve if priority == "bulk" else 0
+        self._check(cost, headroom)
+        if priority == "bulk":
+            waited = await self._bucket.acquire(cost)
+            metrics.observe("youtube.quota.bulk_wait_seconds", waited)
+            self._check(cost, headroom)
+
+        self._used += cost
+        self._used_by_method[method] += cost
+        metrics.increment(f"youtube.quota.used.{method}", cost)
+        await self._save()
+
+    def _check(self, cost: int, headroom: int) -> None:
+        if self.remaining - cost < headroom:
+            metrics.increment("youtube.quota.rejected")
+            logger.warning(
+                f"YouTube quota exhausted: remaining {self.remaining}, headroom {headroom}"
+            )
+            raise APIException(
+                status_code=429,
+                message="YouTube Data API daily quota has been exhausted.",
+                error_code="E003",
+            )
+
+    def mark_exhausted(self) -> None:
+        """YouTube側でクォータ超過と判定された場合、本日の残りを0とする"""
+        self._roll_day()
+        self._used = max(self._used, self.daily_budget)
+        self._write(self._state())
+
+    def snapshot(self) -> schemas.QuotaStatus:
+        """現在のクォータ状況を取得する"""
+        self._roll_day()
+        resets_at = datetime.combine(
+            self._day + timedelta(days=1), datetime.min.time(), tzinfo=_QUOTA_TZ
+        )
+        return schemas.QuotaStatus(
+            daily_budget=self.daily_budget,
+            used=self._used,
+            remaining=self.remaining,
+            reserve=self.reserve,
+            used_by_method=dict(self._used_by_method),
+            resets_at=resets_at,
+        )
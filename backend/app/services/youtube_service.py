@@ -1,18 +1,61 @@
+import asyncio
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Any, AsyncIterator, Optional
 
+import httplib2
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from youtube_transcript_api import YouTubeTranscriptApi
+from youtube_transcript_api import (
+    NoTranscriptFound,
+    Transcript as TranscriptTrack,
+    TranscriptList,
+    YouTubeTranscriptApi,
+)
 
-from ..core.config import YOUTUBE_API_KEY, parse_duration
+from ..core.config import (
+    COLLECT_TIMEOUT,
+    TRANSCRIPT_CONCURRENCY,
+    TRANSCRIPT_LANGUAGES,
+    TRANSCRIPT_LISTING_TTL,
+    YOUTUBE_API_KEY,
+    YOUTUBE_HTTP_TIMEOUT,
+    YOUTUBE_MAX_WORKERS,
+    parse_duration,
+)
 from ..core.exceptions import APIException
+from ..core.cache import LRUCache
 from ..core.logging import getLogger
+from ..core.metrics import metrics
+from ..core.singleflight import SingleFlight
 from ..models import schemas
+from .metadata_cache import MetadataCache
+from .transcript_cache import TranscriptCache
+from .transcript_segments import build_transcript
+from .youtube_quota import Priority, QuotaLedger
 
 logger = getLogger(__name__)
 
+# videos.listで一度に指定できる動画IDの上限
+YOUTUBE_MAX_IDS_PER_REQUEST = 50
+
+
+@dataclass
+class VideoFetchResult:
+    """一括取得におけるURLごとの取得結果"""
+
+    index: int  # リクエスト内の位置
+    url: str
+    video_id: Optional[str] = None
+    metadata: Optional[schemas.VideoMetadata] = None
+    transcript: Optional[schemas.Transcript] = None
+    error: Optional[APIException] = None
+    total: Optional[int] = None  # 取得対象の総件数（プレイリストの場合）
+
 
 class YouTubeService:
     """動画情報取得クラス"""
@@ -27,6 +70,55 @@ class YouTubeService:
             )
         self.youtube = build("youtube", "v3", developerKey=YOUTUBE_API_KEY)
 
+        # httplib2はスレッドセーフではないため、ワーカースレッドごとに接続を保持する
+        self._executor = ThreadPoolExecutor(
+            max_workers=YOUTUBE_MAX_WORKERS, thread_name_prefix="youtube-api"
+        )
+        self._local = threading.local()
+        self.quota = QuotaLedger()
+        self.metadata_cache = MetadataCache()
+        self.transcript_cache = TranscriptCache()
+        self._listing_cache = LRUCache(max_entries=1024)  # 動画ごとの字幕一覧
+
+        # 同じ動画への同時リクエストは1回の取得にまとめる
+        self._metadata_flight = SingleFlight("youtube.metadata")
+        self._transcript_flight = SingleFlight("youtube.transcript")
+
+    def _get_http(self) -> httplib2.Http:
+        """ワーカースレッド専用のHTTP接続を取得（Keep-Aliveで再利用）"""
+        http = getattr(self._local, "http", None)
+        if http is None:
+            http = httplib2.Http(timeout=YOUTUBE_HTTP_TIMEOUT)
+            self._local.http = http
+        return http
+
+    async def _execute(
+        self, request, method: str, priority: Priority = "interactive"
+    ) -> Any:
+        """クォータを確保し、APIリクエストをワーカースレッドで実行する
+        Args:
+            request: googleapiclientのリクエスト
+            method (str): APIメソッド名（クォータ計算用）
+            priority (str): interactive（通常のリクエスト）または bulk（一括処理）
+        """
+        await self.quota.acquire(method, priority)
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._executor, lambda: request.execute(http=self._get_http())
+            )
+        except HttpError as e:
+            if e.resp.status == 403 and b"quotaExceeded" in (e.content or b""):
+                self.quota.mark_exhausted()
+                logger.error("YouTube Data API reported quotaExceeded.")
+                raise APIException(
+                    status_code=429,
+                    message="YouTube Data API daily quota has been exhausted.",
+                    error_code="E003",
+                )
+            raise
+
     def _extract_video_id(self, url: str) -> Optional[str]:
         """URLから動画IDを抽出する"""
         patterns = [
@@ -40,13 +132,16 @@ class YouTubeService:
                 return m.group(1)
         return None
 
-    async def fetch_video_data(self, url: str) -> tuple[schemas.VideoMetadata, str]:
+    async def fetch_video_data(
+        self, url: str
+    ) -> tuple[schemas.VideoMetadata, schemas.Transcript]:
         """動画のメタデータと字幕を取得する
+        メタデータと字幕は同時に取得を開始し、共通の期限（COLLECT_TIMEOUT）内で待機する。
         Args:
             url (str): URL
          Returns:
             schemas.VideoMetadata: メタデータ
-            str: 字幕
+            schemas.Transcript: 字幕（タイムスタンプ付きセグメントを含む）
         """
         video_id = self._extract_video_id(url)
         if not video_id:
@@ -57,41 +152,116 @@ class YouTubeService:
                 error_code="E001",
             )
 
-        video_metadata = None
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + COLLECT_TIMEOUT
+        metadata_task = asyncio.create_task(self._fetch_metadata(video_id))
+        transcript_task = asyncio.create_task(self._fetch_transcript(video_id))
+
         try:
-            # メタデータ取得
-            response = (
-                self.youtube.videos()
-                .list(part="snippet,contentDetails,statistics", id=video_id)
-                .execute()
+            video_metadata = await self._await_until(metadata_task, deadline)
+            transcript = await self._await_until(transcript_task, deadline)
+        except asyncio.TimeoutError:
+            logger.error(f"Timed out while fetching video data: {video_id}")
+            raise APIException(
+                status_code=504,
+                message=f"Fetching video data timed out after {COLLECT_TIMEOUT} seconds.",
+                error_code="E008",
             )
-            if not response["items"]:
-                logger.error(f"Video not found: {video_id}")
-                raise APIException(
-                    status_code=404,
-                    message="Video not found.",
-                    error_code="E009",
+        finally:
+            # メタデータ取得失敗時などに、実行中の字幕取得を取り消す
+            for task in (metadata_task, transcript_task):
+                if not task.done():
+                    task.cancel()
+
+        return video_metadata, transcript
+
+    @staticmethod
+    async def _await_until(task: asyncio.Task, deadline: float) -> Any:
+        """共通の期限までタスクの完了を待機する"""
+        timeout = max(deadline - asyncio.get_running_loop().time(), 0)
+        return await asyncio.wait_for(task, timeout=timeout)
+
+    async def _fetch_metadata(self, video_id: str) -> schemas.VideoMetadata:
+        """動画のメタデータを取得する（同時リクエストは1回にまとめる）"""
+        metadata_map = await self._metadata_flight.do(
+            video_id, lambda: self.fetch_metadata_batch([video_id])
+        )
+        if video_id not in metadata_map:
+            logger.error(f"Video not found: {video_id}")
+            raise APIException(
+                status_code=404,
+                message="Video not found.",
+                error_code="E009",
+            )
+        return metadata_map[video_id]
+
+    async def fetch_metadata_batch(
+        self, video_ids: list[str], priority: Priority = "interactive"
+    ) -> dict[str, schemas.VideoMetadata]:
+        """複数動画のメタデータを取得する
+        キャッシュにないものだけを1回のvideos.listで取得し、再生回数のみ期限切れのものは
+        statisticsだけを再取得する（再取得に失敗した場合はキャッシュの値を返す）。
+        Args:
+            video_ids (list[str]): 動画ID（最大50件）
+            priority (str): interactive（通常のリクエスト）または bulk（一括処理）
+        Returns:
+            dict[str, schemas.VideoMetadata]: 動画IDごとのメタデータ（存在しない動画は含まない）
+        """
+        if len(video_ids) > YOUTUBE_MAX_IDS_PER_REQUEST:
+            raise ValueError(
+                f"videos.list accepts at most {YOUTUBE_MAX_IDS_PER_REQUEST} ids per request."
+            )
+
+        metadata_map, stale, missing = await self.metadata_cache.lookup(video_ids)
+
+        if missing:
+            items = await self._list_videos(
+                missing, "snippet,contentDetails,statistics", priority
+            )
+            for item in items:
+                try:
+                    video_metadata = self._parse_video_item(item["id"], item)
+                except Exception as e:
+                    logger.error(f"Failed to parse video info: {e}")
+                    raise APIException(
+                        status_code=500,
+                        message=f"An unexpected error occurred while fetching video info: {e}",
+                        error_code="E008",
+                    )
+                await self.metadata_cache.put(video_metadata)
+                metadata_map[video_metadata.video_id] = video_metadata
+                logger.info(f"Successfully fetched video info: {video_metadata.title}")
+
+        if stale:
+            try:
+                items = await self._list_videos(list(stale), "statistics", priority)
+            except APIException as e:
+                # 再生回数の更新に失敗した場合は、最後に取得した再生回数のまま返す
+                metrics.increment("youtube.metadata_cache.refresh_failed")
+                logger.warning(
+                    f"Failed to refresh statistics for {len(stale)} videos, "
+                    f"using cached values: {e.message}"
                 )
+                metadata_map.update(stale)
+                return metadata_map
+            for item in items:
+                view_count = int(item.get("statistics", {}).get("viewCount", 0))
+                refreshed = await self.metadata_cache.refresh(item["id"], view_count)
+                metadata_map[item["id"]] = refreshed or stale[item["id"]]
+
+        return metadata_map
 
-            item = response["items"][0]
-            snippet = item["snippet"]
-            content_details = item["contentDetails"]
-            statistics = item.get("statistics", {})
-
-            video_metadata = schemas.VideoMetadata(
-                video_id=video_id,
-                title=snippet["title"],
-                channel_name=snippet["channelTitle"],
-                published_at=datetime.fromisoformat(
-                    snippet["publishedAt"].replace("Z", "+00:00")
-                ).date(),
-                duration=content_details["duration"],
-                duration_seconds=parse_duration(content_details["duration"]),
-                view_count=int(statistics.get("viewCount", 0)),
-                url=f"https://www.youtube.com/watch?v={video_id}",
-                thumbnail_url=snippet["thumbnails"]["high"]["url"],
-            )
-            logger.info(f"Successfully fetched video info: {video_metadata.title}")
+    async def _list_videos(
+        self, video_ids: list[str], part: str, priority: Priority
+    ) -> list[dict]:
+        """videos.listを呼び出し、レスポンス項目を返す"""
+        try:
+            response = await self._execute(
+                self.youtube.videos().list(part=part, id=",".join(video_ids)),
+                "videos.list",
+                priority,
+            )
+            return response["items"]
 
         except APIException:
             raise
@@ -111,13 +281,224 @@ class YouTubeService:
                 error_code="E008",
             )
 
-        transcript_text = ""
+    def _parse_video_item(self, video_id: str, item: dict) -> schemas.VideoMetadata:
+        """videos.listのレスポンス項目をメタデータに変換する"""
+        snippet = item["snippet"]
+        content_details = item["contentDetails"]
+        statistics = item.get("statistics", {})
+
+        return schemas.VideoMetadata(
+            video_id=video_id,
+            title=snippet["title"],
+            channel_name=snippet["channelTitle"],
+            published_at=datetime.fromisoformat(
+                snippet["publishedAt"].replace("Z", "+00:00")
+            ).date(),
+            duration=content_details["duration"],
+            duration_seconds=parse_duration(content_details["duration"]),
+            view_count=int(statistics.get("viewCount", 0)),
+            url=f"https://www.youtube.com/watch?v={video_id}",
+            thumbnail_url=snippet["thumbnails"]["high"]["url"],
+        )
+
+    async def iter_video_data(self, urls: list[str]) -> AsyncIterator[VideoFetchResult]:
+        """複数URLの動画データを取得し、完了したものから順に返す
+        メタデータは最大50件ずつまとめて取得し、字幕はTRANSCRIPT_CONCURRENCY件まで並行で取得する。
+        失敗はURLごとの結果として返し、バッチ全体は中断しない。
+        Args:
+            urls (list[str]): URL一覧
+        Yields:
+            VideoFetchResult: URLごとの取得結果
+        """
+        targets = []
+        for index, url in enumerate(urls):
+            video_id = self._extract_video_id(url)
+            if not video_id:
+                logger.warning(f"Invalid YouTube URL in batch: {url}")
+                yield VideoFetchResult(
+                    index=index,
+                    url=url,
+                    error=APIException(
+                        status_code=400,
+                        message="Invalid YouTube URL.",
+                        error_code="E001",
+                    ),
+                )
+                continue
+            targets.append((index, url, video_id))
+
+        for start in range(0, len(targets), YOUTUBE_MAX_IDS_PER_REQUEST):
+            chunk = targets[start : start + YOUTUBE_MAX_IDS_PER_REQUEST]
+            async for result in self._iter_chunk(chunk, "bulk"):
+                yield result
+
+    async def resolve_uploads_playlist(self, channel_id: str) -> str:
+        """チャンネルのアップロード動画プレイリストIDを取得する
+        Args:
+            channel_id (str): チャンネルID
+        Returns:
+            str: プレイリストID
+        """
+        try:
+            response = await self._execute(
+                self.youtube.channels().list(part="contentDetails", id=channel_id),
+                "channels.list",
+            )
+        except HttpError as e:
+            logger.error(f"HTTP error {e.resp.status} occurred: {e.content}")
+            raise APIException(
+                status_code=e.resp.status,
+                message=f"Failed to fetch channel info from YouTube: {e.content}",
+                error_code="E008",
+            )
+
+        if not response.get("items"):
+            logger.error(f"Channel not found: {channel_id}")
+            raise APIException(
+                status_code=404,
+                message="Channel not found.",
+                error_code="E009",
+            )
+        return response["items"][0]["contentDetails"]["relatedPlaylists"]["uploads"]
+
+    async def _fetch_playlist_page(
+        self, playlist_id: str, page_token: Optional[str]
+    ) -> tuple[list[str], Optional[str], Optional[int]]:
+        """プレイリストの1ページ分（最大50件）の動画IDを取得する"""
+        try:
+            response = await self._execute(
+                self.youtube.playlistItems().list(
+                    part="contentDetails",
+                    playlistId=playlist_id,
+                    maxResults=YOUTUBE_MAX_IDS_PER_REQUEST,
+                    pageToken=page_token,
+                ),
+                "playlistItems.list",
+                "bulk",
+            )
+        except HttpError as e:
+            logger.error(f"HTTP error {e.resp.status} occurred: {e.content}")
+            raise APIException(
+                status_code=e.resp.status,
+                message=f"Failed to fetch playlist items from YouTube: {e.content}",
+                error_code="E008",
+            )
+
+        video_ids = [item["contentDetails"]["videoId"] for item in response["items"]]
+        total = response.get("pageInfo", {}).get("totalResults")
+        return video_ids, response.get("nextPageToken"), total
+
+    async def iter_playlist_video_data(
+        self, playlist_id: str
+    ) -> AsyncIterator[VideoFetchResult]:
+        """プレイリストの全動画をページ単位で取得し、完了したものから順に返す
+        保持するのは処理中のページと先読み中の次ページのみで、件数が多くてもメモリ使用量は一定。
+        Args:
+            playlist_id (str): プレイリストID
+        Yields:
+            VideoFetchResult: 動画ごとの取得結果
+        """
+        index = 0
+        next_page = asyncio.create_task(self._fetch_playlist_page(playlist_id, None))
+        try:
+            while next_page is not None:
+                video_ids, page_token, total = await next_page
+                # 現在のページを処理している間に次のページを先読みする
+                next_page = (
+                    asyncio.create_task(
+                        self._fetch_playlist_page(playlist_id, page_token)
+                    )
+                    if page_token
+                    else None
+                )
+
+                chunk = [
+                    (index + offset, f"https://www.youtube.com/watch?v={video_id}", video_id)
+                    for offset, video_id in enumerate(video_ids)
+                ]
+                index += len(chunk)
+                async for result in self._iter_chunk(chunk, "bulk"):
+                    result.total = total
+                    yield result
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    async def _iter_chunk(
+        self, chunk: list[tuple[int, str, str]], priority: Priority
+    ) -> AsyncIterator[VideoFetchResult]:
+        """最大50件分のメタデータを一括取得し、字幕を並行取得する"""
+        video_ids = list(dict.fromkeys(video_id for _, _, video_id in chunk))
         try:
-            # 字幕取得
-            fetched = YouTubeTranscriptApi().fetch(video_id, languages=["ja", "en"])
-            transcript_text = " ".join([snippet.text for snippet in fetched])
+            metadata_map = await self.fetch_metadata_batch(video_ids, priority)
+        except APIException as e:
+            for index, url, video_id in chunk:
+                yield VideoFetchResult(index=index, url=url, video_id=video_id, error=e)
+            return
 
-            logger.info(f"Successfully fetched transcript for video ID: {video_id}")
+        semaphore = asyncio.Semaphore(TRANSCRIPT_CONCURRENCY)
+
+        async def worker(index: int, url: str, video_id: str) -> VideoFetchResult:
+            result = VideoFetchResult(index=index, url=url, video_id=video_id)
+            result.metadata = metadata_map.get(video_id)
+            if result.metadata is None:
+                logger.error(f"Video not found: {video_id}")
+                result.error = APIException(
+                    status_code=404,
+                    message="Video not found.",
+                    error_code="E009",
+                )
+                return result
+            try:
+                async with semaphore:
+                    result.transcript = await asyncio.wait_for(
+                        self._fetch_transcript(video_id), timeout=COLLECT_TIMEOUT
+                    )
+            except asyncio.TimeoutError:
+                result.error = APIException(
+                    status_code=504,
+                    message=f"Fetching transcript timed out after {COLLECT_TIMEOUT} seconds.",
+                    error_code="E008",
+                )
+            except APIException as e:
+                result.error = e
+            return result
+
+        tasks = [asyncio.create_task(worker(*target)) for target in chunk]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # 呼び出し側が途中で反復をやめた場合（クライアント切断など）は残りを取り消す
+            for task in tasks:
+                task.cancel()
+
+    async def _fetch_transcript(self, video_id: str) -> schemas.Transcript:
+        """字幕を取得する（同時リクエストは1回にまとめる）"""
+        return await self._transcript_flight.do(
+            video_id, lambda: self._load_transcript(video_id)
+        )
+
+    async def _load_transcript(self, video_id: str) -> schemas.Transcript:
+        """字幕を取得する（キャッシュにない場合は最適な字幕を選んでダウンロード）"""
+        cached = await self.transcript_cache.get(video_id, TRANSCRIPT_LANGUAGES)
+        if cached is not None:
+            logger.info(f"Transcript cache hit for video ID: {video_id}")
+            return cached[1]
+
+        loop = asyncio.get_running_loop()
+        try:
+            transcript_list = await self._list_transcripts(video_id)
+            track = self._select_track(transcript_list)
+            fetched = await loop.run_in_executor(self._executor, track.fetch)
+            transcript = build_transcript(
+                fetched, language=track.language_code, is_generated=track.is_generated
+            )
+
+            logger.info(
+                f"Successfully fetched transcript for video ID: {video_id} "
+                f"(language: {track.language_code}, generated: {track.is_generated})"
+            )
 
         except Exception as e:
             logger.warning(f"Failed to fetch transcript for video ID {video_id}: {e}")
@@ -127,4 +508,25 @@ class YouTubeService:
                 error_code="E002",
             )
 
-        return video_metadata, transcript_text
+        await self.transcript_cache.put(video_id, transcript)
+        return transcript
+
+    async def _list_transcripts(self, video_id: str) -> TranscriptList:
+        """動画で利用可能な字幕の一覧を取得する（動画ごとにキャッシュ）"""
+        cached = self._listing_cache.get(video_id)
+        if cached is not None and time.time() - cached[1] <= TRANSCRIPT_LISTING_TTL:
+            return cached[0]
+
+        loop = asyncio.get_running_loop()
+        transcript_list = await loop.run_in_executor(
+            self._executor, lambda: YouTubeTranscriptApi().list(video_id)
+        )
+        self._listing_cache.set(video_id, (transcript_list, time.time()))
+        return transcript_list
+
+    def _select_track(self, transcript_list: TranscriptList) -> TranscriptTrack:
+        """一覧から最適な字幕を選ぶ（手動作成を自動生成より、言語は優先順に従って優先）"""
+        try:
+            return transcript_list.find_manually_created_transcript(TRANSCRIPT_LANGUAGES)
+        except NoTranscriptFound:
+            return transcript_list.find_generated_transcript(TRANSCRIPT_LANGUAGES)
@@ -0,0 +1,112 @@
+"""
+長時間動画の分析ベンチマーク（一括分析と分割分析の比較）
+
+Gemini API を入力・出力トークン数に比例したレイテンシを持つスタブに差し替え、
+指定した長さの字幕を一括分析した場合と分割分析した場合の所要時間を計測する。
+
+実行例:
+    python benchmarks/bench_analysis_chunking.py --hours 1 2 3 --input-rate 20000 --output-rate 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+os.environ.setdefault("YOUTUBE_API_KEY", "benchmark")
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ.setdefault("ANALYSIS_CACHE_ENABLED", "false")
+os.environ.setdefault(
+    "USAGE_LEDGER_PATH", os.path.join(tempfile.mkdtemp(), "usage.jsonl")
+)
+
+from app.services import analysis_service  # noqa: E402
+from app.services.analysis_service import AnalysisService  # noqa: E402
+from app.services.transcript_chunker import estimate_tokens  # noqa: E402
+
+# 1分あたりの字幕（日本語で約300文字）
+CHARS_PER_MINUTE = 300
+ANALYSIS_RESULT = json.dumps(
+    {
+        "summary": "ベンチマーク用の要約" * 50,
+        "suggested_titles": "ベンチマーク",
+        "categories": ["教育"],
+        "emotions": "考察",
+    },
+    ensure_ascii=False,
+)
+CHUNK_SUMMARY = "・ベンチマーク用のチャンク要約" * 20
+
+
+def _make_transcript(hours: float, seed: int = 0) -> str:
+    """字幕圧縮の重複除去で短くならないよう、内容の異なる文を並べた字幕を作成する"""
+    rng = random.Random(seed)
+    sentences = []
+    chars = 0
+    while chars < hours * 60 * CHARS_PER_MINUTE:
+        sentence = "".join(chr(0x4E00 + rng.randrange(20000)) for _ in range(30)) + "。"
+        sentences.append(sentence)
+        chars += len(sentence)
+    return "".join(sentences)
+
+
+def _stub_model(service: AnalysisService, input_rate: float, output_rate: float):
+    """入力・出力トークン数に比例して待機するスタブ
+    一括分析用・チャンク要約用の両方のモデルを差し替え、GeminiClient の同時実行数制御は残す。
+    """
+
+    async def generate(prompt, generation_config):
+        final = generation_config is not service.map_generation_config
+        text = ANALYSIS_RESULT if final else CHUNK_SUMMARY
+        await asyncio.sleep(
+            estimate_tokens(prompt) / input_rate + estimate_tokens(text) / output_rate
+        )
+        response = MagicMock()
+        response.text = text
+        response.usage_metadata = None
+        return response
+
+    for tier in service.tiers:
+        tier.model = MagicMock()
+        tier.model.generate_content_async = generate
+        tier.map_model = MagicMock()
+        tier.map_model.generate_content_async = generate
+
+
+async def _run(transcript: str, chunked: bool, input_rate: float, output_rate: float):
+    threshold = 1 if chunked else sys.maxsize
+    with patch.object(analysis_service, "ANALYSIS_CHUNK_THRESHOLD", threshold), patch(
+        "app.services.analysis_service.genai"
+    ):
+        service = AnalysisService()
+        _stub_model(service, input_rate, output_rate)
+        start = time.perf_counter()
+        await service.analyze_transcript(transcript)
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hours", type=float, nargs="+", default=[0.5, 1, 2, 3])
+    parser.add_argument("--input-rate", type=float, default=20000, help="入力トークン/秒")
+    parser.add_argument("--output-rate", type=float, default=200, help="出力トークン/秒")
+    args = parser.parse_args()
+
+    print(f"{'hours':>6} {'tokens':>8} {'single[s]':>10} {'chunked[s]':>11}")
+    for hours in args.hours:
+        transcript = _make_transcript(hours)
+        single = asyncio.run(_run(transcript, False, args.input_rate, args.output_rate))
+        chunked = asyncio.run(_run(transcript, True, args.input_rate, args.output_rate))
+        print(
+            f"{hours:>6} {estimate_tokens(transcript):>8} {single:>10.2f} {chunked:>11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+分析のスループットベンチマーク（Gemini API の代替サーバーを使用）
+
+代替サーバー（gemini_standin.py）を起動して AnalysisService の接続先とし、
+同時実行数を段階的に増やしながら analyze_transcript を実行する。
+同時実行数ごとのスループット、Gemini呼び出しの待機時間、所要時間のp50/p95/p99、
+再試行・レート制限の回数を計測する。実際の Gemini API は呼び出さない。
+
+実行例:
+    python benchmarks/bench_analysis_throughput.py --concurrency 1 4 16 64 --latency lognormal:0.8,0.4
+    python benchmarks/bench_analysis_throughput.py --error-rate 0.1 --max-concurrency 8
+    GRPC_DEFAULT_SSL_ROOTS_FILE_PATH=standin.pem python benchmarks/bench_analysis_throughput.py --endpoint localhost:50051
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+os.environ.setdefault("YOUTUBE_API_KEY", "benchmark")
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ.setdefault("ANALYSIS_CACHE_ENABLED", "false")
+os.environ.setdefault("TAG_CLASSIFIER_ENABLED", "false")
+os.environ.setdefault(
+    "USAGE_LEDGER_PATH", os.path.join(tempfile.mkdtemp(), "usage.jsonl")
+)
+
+from gemini_standin import Distribution, GeminiStandIn  # noqa: E402
+
+from app.core.config import GEMINI_API_KEY  # noqa: E402
+from app.core.metrics import metrics  # noqa: E402
+from app.services.analysis_service import AnalysisService  # noqa: E402
+from app.services.gemini_client import configure_gemini  # noqa: E402
+
+
+def _make_transcript(chars: int, seed: int) -> str:
+    """圧縮で短くならないよう、重複のない字幕を作成する"""
+    return "".join(chr(0x4E00 + (seed * 7919 + i * 31) % 20000) for i in range(chars))
+
+
+def _percentiles(values: list[float]) -> tuple[float, float, float]:
+    if len(values) < 2:
+        return (values[0],) * 3 if values else (0.0, 0.0, 0.0)
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return cuts[49], cuts[94], cuts[98]
+
+
+async def _run_level(service: AnalysisService, concurrency: int, requests: int, chars: int):
+    """同時実行数 concurrency で requests 件の分析を実行する"""
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for index in range(requests):
+        queue.put_nowait(index)
+    latencies: list[float] = []
+    failures = 0
+
+    async def worker():
+        nonlocal failures
+        while not queue.empty():
+            index = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                await service.analyze_transcript(_make_transcript(chars, index))
+            except Exception:
+                failures += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    metrics.reset()
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    snapshot = metrics.snapshot()
+    queue_wait = snapshot["observations"].get("gemini.queue_wait_seconds", {})
+    p50, p95, p99 = _percentiles(latencies)
+    print(
+        f"{concurrency:>5} {len(latencies) / elapsed:>8.2f} "
+        f"{queue_wait.get('avg', 0.0):>9.3f} {queue_wait.get('max', 0.0):>9.3f} "
+        f"{p50:>7.2f} {p95:>7.2f} {p99:>7.2f} "
+        f"{int(snapshot['counters'].get('gemini.retries', 0)):>7} {failures:>6}"
+    )
+
+
+async def _main(args) -> None:
+    standin = None
+    endpoint = args.endpoint
+    if not endpoint:
+        standin = GeminiStandIn(
+            latency=Distribution.parse(args.latency),
+            output_rate=args.output_rate,
+            error_rate=args.error_rate,
+            max_concurrency=args.max_concurrency,
+            retry_after=args.retry_after,
+            seed=0,
+        )
+        endpoint = await standin.start()
+
+    try:
+        service = AnalysisService()
+        configure_gemini(GEMINI_API_KEY, endpoint)
+        print(f"endpoint: {endpoint}, transcript: {args.chars} chars")
+        print(
+            f"{'conc':>5} {'req/s':>8} {'wait_avg':>9} {'wait_max':>9} "
+            f"{'p50[s]':>7} {'p95[s]':>7} {'p99[s]':>7} {'retries':>7} {'failed':>6}"
+        )
+        for concurrency in args.concurrency:
+            requests = max(args.requests, concurrency * args.rounds)
+            await _run_level(service, concurrency, requests, args.chars)
+        if standin is not None:
+            print(f"stand-in: {standin.requests} requests, {standin.rejected} rejected (429)")
+    finally:
+        if standin is not None:
+            await standin.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--requests", type=int, default=20, help="同時実行数ごとの最小リクエスト数")
+    parser.add_argument("--rounds", type=int, default=3, help="ワーカーあたりのリクエスト数")
+    parser.add_argument("--chars", type=int, default=3000, help="字幕の文字数")
+    parser.add_argument("--endpoint", help="起動済みの代替サーバー（省略時はプロセス内で起動）")
+    parser.add_argument("--latency", default="lognormal:0.5,0.3")
+    parser.add_argument("--output-rate", type=float, default=2000, help="出力トークン/秒")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-concurrency", type=int, default=0)
+    parser.add_argument("--retry-after", type=float, default=0.2)
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
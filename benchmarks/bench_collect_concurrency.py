@@ -0,0 +1,121 @@
+"""
+/collect の同時実行ベンチマーク
+
+YouTube Data API と字幕APIを一定のレイテンシを持つスタブに差し替え、
+N件の fetch_video_data を同時に実行したときの所要時間を計測する。
+distinct はN件の異なる動画を取得し、ワーカースレッドの接続プールで並行に処理されていれば
+N件でもおよそ1往復分で完了する。coalesced は同じ動画をN件同時に取得し、
+実行中の取得が1回にまとめられること（videos.list の呼び出し回数）を確認する。
+
+実行例:
+    python benchmarks/bench_collect_concurrency.py --concurrency 1 4 8 --latency 0.3
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+os.environ.setdefault("YOUTUBE_API_KEY", "benchmark")
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ.setdefault("TRANSCRIPT_CACHE_ENABLED", "false")
+os.environ.setdefault(
+    "YOUTUBE_QUOTA_PATH", os.path.join(tempfile.mkdtemp(), "youtube_quota.json")
+)
+
+from youtube_transcript_api import FetchedTranscript, FetchedTranscriptSnippet  # noqa: E402
+
+from app.services.youtube_service import YouTubeService  # noqa: E402
+
+
+def _video_id(index: int) -> str:
+    return f"bench{index:06d}"
+
+
+def _video_item(video_id: str) -> dict:
+    return {
+        "snippet": {
+            "title": f"Benchmark Video {video_id}",
+            "channelTitle": "Benchmark Channel",
+            "publishedAt": "2023-01-01T00:00:00Z",
+            "thumbnails": {"high": {"url": "http://example.com/thumb.jpg"}},
+        },
+        "contentDetails": {"duration": "PT5M30S"},
+        "id": video_id,
+        "statistics": {"viewCount": "12345"},
+    }
+
+
+class _SlowVideosList:
+    """videos.list のスタブ（1往復ごとに latency 秒待機し、呼び出し回数を数える）"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, part: str, id: str):
+        request = MagicMock()
+
+        def execute(*args, **kwargs):
+            with self._lock:
+                self.calls += 1
+            time.sleep(self.latency)
+            return {"items": [_video_item(video_id) for video_id in id.split(",")]}
+
+        request.execute.side_effect = execute
+        return request
+
+
+async def _run(concurrency: int, latency: float, coalesced: bool) -> tuple[float, int]:
+    with patch("app.services.youtube_service.build") as mock_build, patch(
+        "app.services.youtube_service.YouTubeTranscriptApi"
+    ) as mock_transcript_api:
+        videos_list = _SlowVideosList(latency)
+        mock_build.return_value.videos.return_value.list.side_effect = videos_list
+        transcript_list = mock_transcript_api.return_value.list.return_value
+        track = transcript_list.find_manually_created_transcript.return_value
+        track.language_code = "ja"
+        track.is_generated = False
+        track.fetch.return_value = FetchedTranscript(
+            snippets=[FetchedTranscriptSnippet(text="benchmark", start=0, duration=1)],
+            video_id=_video_id(0),
+            language="Japanese",
+            language_code="ja",
+            is_generated=False,
+        )
+
+        service = YouTubeService()
+        urls = [
+            f"https://www.youtube.com/watch?v={_video_id(0 if coalesced else index)}"
+            for index in range(concurrency)
+        ]
+        start = time.perf_counter()
+        await asyncio.gather(*[service.fetch_video_data(url) for url in urls])
+        return time.perf_counter() - start, videos_list.calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--latency", type=float, default=0.3, help="1往復の秒数")
+    args = parser.parse_args()
+
+    # distinct は同時接続数（YOUTUBE_MAX_WORKERS）を超えると往復数が増える
+    print(f"{'case':>10} {'N':>4} {'elapsed[s]':>11} {'round trips':>12} {'api calls':>10}")
+    for case in ("distinct", "coalesced"):
+        for n in args.concurrency:
+            elapsed, calls = asyncio.run(_run(n, args.latency, case == "coalesced"))
+            print(
+                f"{case:>10} {n:>4} {elapsed:>11.3f} "
+                f"{elapsed / args.latency:>12.2f} {calls:>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
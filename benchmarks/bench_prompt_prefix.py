@@ -0,0 +1,120 @@
+"""
+分析プロンプトの比較ベンチマーク（指示をプロンプトに含める方式とシステム指示方式）
+
+既定では、リクエストごとに送信するプロンプトのトークン数（概算）を比較する。
+--live を指定すると実際に Gemini API を呼び出し、usage_metadata のトークン数と
+所要時間を比較する（GEMINI_API_KEY が必要）。
+
+実行例:
+    python benchmarks/bench_prompt_prefix.py --chars 2000 20000
+    GEMINI_API_KEY=... python benchmarks/bench_prompt_prefix.py --live --repeat 3
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+os.environ.setdefault("YOUTUBE_API_KEY", "benchmark")
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+import google.generativeai as genai  # noqa: E402
+from google.generativeai.types import GenerationConfig  # noqa: E402
+
+from app.core.config import MODEL  # noqa: E402
+from app.models import schemas  # noqa: E402
+from app.services.analysis_service import SYSTEM_INSTRUCTION  # noqa: E402
+from app.services.transcript_chunker import estimate_tokens  # noqa: E402
+
+# システム指示に移す前のプロンプト
+LEGACY_PROMPT = """
+以下のYouTube動画の字幕テキストを分析し、内容を要約してJSON形式で回答してください：
+
+制約：
+- 要約は400-1000文字、Markdown形式
+- タイトルは30文字以内
+- 分類タグは最大3つ
+- 感情タグは1つのみ
+
+分類タグ選択肢: ["音楽", "動物", "スポーツ", "旅行", "ゲーム", "コメディ", "エンターテインメント", "教育", "科学", "映画", "アニメ", "クラシック", "ドキュメンタリー", "ドラマ", "ショートムービー", "その他"]
+感情タグ選択肢: ["感動", "愉快", "驚愕", "啓発", "考察", "癒着", "その他"]
+
+字幕テキスト:
+{transcript}
+
+回答は必ずJSON形式で、以下のキーを持つオブジェクトとしてください:
+{{
+"summary": "Markdown形式の要約",
+"suggested_titles": "提案タイトル",
+"categories": ["タグ1", "タグ2"],
+"emotions": "感情タグ"
+}}
+"""
+
+
+def _make_transcript(chars: int) -> str:
+    snippet = "これはベンチマーク用の字幕です"
+    return " ".join([snippet] * (chars // len(snippet)))
+
+
+async def _call(model, prompt: str, generation_config) -> tuple[float, object]:
+    start = time.perf_counter()
+    response = await model.generate_content_async(
+        prompt, generation_config=generation_config
+    )
+    return time.perf_counter() - start, response.usage_metadata
+
+
+async def _live(transcript: str, repeat: int) -> None:
+    genai.configure(api_key=os.environ["GEMINI_API_KEY"])
+    variants = {
+        "legacy": (
+            genai.GenerativeModel(MODEL),
+            LEGACY_PROMPT.format(transcript=transcript),
+            GenerationConfig(temperature=0.8, response_mime_type="application/json"),
+        ),
+        "prefix": (
+            genai.GenerativeModel(MODEL, system_instruction=SYSTEM_INSTRUCTION),
+            f"字幕テキスト:\n{transcript}",
+            GenerationConfig(
+                temperature=0.8,
+                response_mime_type="application/json",
+                response_schema=schemas.AnalysisResult,
+            ),
+        ),
+    }
+    print(f"{'variant':>8} {'prompt':>8} {'cached':>8} {'output':>8} {'elapsed[s]':>11}")
+    for name, (model, prompt, generation_config) in variants.items():
+        for _ in range(repeat):
+            elapsed, usage = await _call(model, prompt, generation_config)
+            print(
+                f"{name:>8} {usage.prompt_token_count:>8} "
+                f"{usage.cached_content_token_count:>8} "
+                f"{usage.candidates_token_count:>8} {elapsed:>11.2f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chars", type=int, nargs="+", default=[2000, 20000])
+    parser.add_argument("--live", action="store_true", help="Gemini APIを呼び出して計測する")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.live:
+        for chars in args.chars:
+            asyncio.run(_live(_make_transcript(chars), args.repeat))
+        return
+
+    print(f"{'chars':>7} {'legacy':>8} {'prefix':>8} {'static':>8}")
+    for chars in args.chars:
+        transcript = _make_transcript(chars)
+        legacy = estimate_tokens(LEGACY_PROMPT.format(transcript=transcript))
+        prefix = estimate_tokens(f"字幕テキスト:\n{transcript}")
+        print(f"{chars:>7} {legacy:>8} {prefix:>8} {estimate_tokens(SYSTEM_INSTRUCTION):>8}")
+
+
+if __name__ == "__main__":
+    main()
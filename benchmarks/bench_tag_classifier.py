@@ -0,0 +1,120 @@
+"""
+タグ推定のベンチマーク（推定精度とスループット）
+
+登録済みセッション（--data-dir）または合成したコーパスを学習用と評価用に分割し、
+感情タグ・カテゴリの正解率、信頼度が閾値以上となった割合とその正解率、
+1秒あたりに推定できる字幕数を計測する。
+
+実行例:
+    python benchmarks/bench_tag_classifier.py --documents 600 --chars 3000
+    python benchmarks/bench_tag_classifier.py --data-dir backend/app/data
+"""
+
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+os.environ.setdefault("YOUTUBE_API_KEY", "benchmark")
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from app.models import schemas  # noqa: E402
+from app.services.analysis_service import CATEGORY_TAGS, EMOTION_TAGS  # noqa: E402
+from app.services.tag_classifier import TagClassifier  # noqa: E402
+
+Sample = tuple[str, list[str], str]
+
+COMMON_WORDS = "今日は みなさん それでは ちょっと 本当に ですね という感じで やっていきます".split()
+
+
+def _synthetic_corpus(documents: int, chars: int, noise: float, seed: int) -> list[Sample]:
+    """タグごとに固有の語彙を持つ合成コーパスを作成する（語彙の一部は共通語に置き換える）"""
+    rng = random.Random(seed)
+    vocabulary = {
+        tag: [f"{tag}{rng.randrange(10000):04d}" for _ in range(30)]
+        for tag in CATEGORY_TAGS + EMOTION_TAGS
+    }
+    samples = []
+    for _ in range(documents):
+        categories = rng.sample(CATEGORY_TAGS, rng.choice([1, 1, 2]))
+        emotion = rng.choice(EMOTION_TAGS)
+        words = [word for tag in categories + [emotion] for word in vocabulary[tag]]
+        text = []
+        while sum(len(word) + 1 for word in text) < chars:
+            text.append(rng.choice(COMMON_WORDS) if rng.random() < noise else rng.choice(words))
+        samples.append((" ".join(text), categories, emotion))
+    return samples
+
+
+def _load_sessions(data_dir: str) -> list[Sample]:
+    samples = []
+    for path in glob.glob(os.path.join(data_dir, "*.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            session_info = schemas.SessionInfo.model_validate_json(f.read())
+        if session_info.status == "registered" and session_info.modifications:
+            modifications = session_info.modifications
+            samples.append(
+                (session_info.transcript, modifications.categories, modifications.emotions)
+            )
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--data-dir", help="登録済みセッションのディレクトリ（省略時は合成コーパス）")
+    parser.add_argument("--documents", type=int, default=600)
+    parser.add_argument("--chars", type=int, default=3000, help="合成する字幕の文字数")
+    parser.add_argument("--noise", type=float, default=0.7, help="共通語の割合")
+    parser.add_argument("--test-ratio", type=float, default=0.2)
+    parser.add_argument("--min-confidence", type=float, default=0.6)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.data_dir:
+        samples = _load_sessions(args.data_dir)
+    else:
+        samples = _synthetic_corpus(args.documents, args.chars, args.noise, args.seed)
+    random.Random(args.seed).shuffle(samples)
+    split = int(len(samples) * (1 - args.test_ratio))
+    train, test = samples[:split], samples[split:]
+    if not train or not test:
+        sys.exit(f"Not enough registered sessions ({len(samples)}).")
+
+    classifier = TagClassifier(min_samples=1, min_confidence=args.min_confidence)
+    start = time.perf_counter()
+    for text, categories, emotion in train:
+        classifier.add(text, categories, emotion)
+    train_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    predictions = [classifier.classify(text) for text, _, _ in test]
+    elapsed = time.perf_counter() - start
+
+    emotion_hits = sum(p.emotions == emotion for p, (_, _, emotion) in zip(predictions, test))
+    category_hits = sum(
+        p.categories[0] in categories for p, (_, categories, _) in zip(predictions, test)
+    )
+    confident = [
+        (p, sample) for p, sample in zip(predictions, test) if p.confident
+    ]
+    confident_hits = sum(
+        p.emotions == emotion and p.categories[0] in categories
+        for p, (_, categories, emotion) in confident
+    )
+    average_chars = sum(len(text) for text, _, _ in test) / len(test)
+
+    print(f"train / test          : {len(train)} / {len(test)} (avg {average_chars:.0f} chars)")
+    print(f"train time            : {train_elapsed:.3f}s")
+    print(f"emotion accuracy      : {emotion_hits / len(test):.3f}")
+    print(f"category top-1 hit    : {category_hits / len(test):.3f}")
+    print(f"confident coverage    : {len(confident) / len(test):.3f}")
+    if confident:
+        print(f"confident accuracy    : {confident_hits / len(confident):.3f}")
+    print(f"throughput            : {len(test) / elapsed:.1f} transcripts/s")
+
+
+if __name__ == "__main__":
+    main()
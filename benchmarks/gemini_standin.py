@@ -0,0 +1,320 @@
+"""
+Gemini API の代替サーバー（負荷試験用）
+
+generateContent / streamGenerateContent を実装したgRPCサーバー。レスポンススキーマに
+合わせた定型のJSON（またはチャンク要約用の定型テキスト）を、指定したレイテンシ分布で返す。
+一定の確率、または同時実行数の上限を超えた場合に429（RESOURCE_EXHAUSTED）を返す。
+
+Gemini API のクライアントはTLSでのみ接続するため、起動時に自己署名証明書を作成して
+TLSで待ち受ける。バックエンドからは GEMINI_API_ENDPOINT に接続先を、
+GRPC_DEFAULT_SSL_ROOTS_FILE_PATH に証明書（--cert-file）を指定して利用する。
+
+実行例:
+    python benchmarks/gemini_standin.py --port 50051 --latency lognormal:0.8,0.4 --error-rate 0.05
+    GEMINI_API_ENDPOINT=localhost:50051 GRPC_DEFAULT_SSL_ROOTS_FILE_PATH=standin.pem uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import ipaddress
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+os.environ.setdefault("YOUTUBE_API_KEY", "benchmark")
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+import grpc  # noqa: E402
+from cryptography import x509  # noqa: E402
+from cryptography.hazmat.primitives import hashes, serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import ec  # noqa: E402
+from cryptography.x509.oid import NameOID  # noqa: E402
+from google.ai import generativelanguage as glm  # noqa: E402
+
+from app.services.transcript_chunker import estimate_tokens  # noqa: E402
+
+SERVICE = "google.ai.generativelanguage.v1beta.GenerativeService"
+
+# レスポンススキーマの項目ごとの定型出力
+CANNED_FIELDS = {
+    "summary": "## 概要\n" + "これは代替サーバーが返す定型の要約です。" * 30,
+    "suggested_titles": "代替サーバーの定型タイトル",
+    "categories": ["教育", "科学"],
+    "emotions": "啓発",
+}
+# スキーマ指定のないリクエスト（チャンク要約）への定型出力
+CANNED_TEXT = "・代替サーバーが返す定型のチャンク要約です。\n" * 10
+# ストリーミング時の1チャンクあたりの文字数
+STREAM_CHUNK_CHARS = 64
+
+
+@dataclass
+class Distribution:
+    """レイテンシ分布（秒）
+    fixed:x / uniform:a,b / lognormal:中央値,sigma の形式で指定する。
+    """
+
+    kind: str
+    params: tuple[float, ...]
+
+    @classmethod
+    def parse(cls, value: str) -> "Distribution":
+        kind, _, params = value.partition(":")
+        parsed = tuple(float(param) for param in params.split(",") if param)
+        expected = {"fixed": 1, "uniform": 2, "lognormal": 2}
+        if expected.get(kind) != len(parsed):
+            raise ValueError(f"Invalid latency distribution: {value}")
+        return cls(kind, parsed)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        median, sigma = self.params
+        return median * math.exp(sigma * rng.gauss(0, 1))
+
+
+def _self_signed_cert(host: str) -> tuple[bytes, bytes]:
+    """localhost と host を対象とする自己署名証明書と秘密鍵（PEM）を作成する"""
+    key = ec.generate_private_key(ec.SECP256R1())
+    names: list[x509.GeneralName] = [
+        x509.DNSName("localhost"),
+        x509.IPAddress(ipaddress.ip_address("127.0.0.1")),
+    ]
+    try:
+        names.append(x509.IPAddress(ipaddress.ip_address(host)))
+    except ValueError:
+        names.append(x509.DNSName(host))
+    subject = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "gemini-standin")])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(subject)
+        .issuer_name(subject)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(minutes=1))
+        .not_valid_after(now + timedelta(days=7))
+        .add_extension(x509.SubjectAlternativeName(names), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    key_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    return key_pem, cert.public_bytes(serialization.Encoding.PEM)
+
+
+class GeminiStandIn:
+    """Gemini API の代替サーバー"""
+
+    def __init__(
+        self,
+        latency: Distribution = Distribution("fixed", (0.5,)),
+        output_rate: float = 200,
+        error_rate: float = 0.0,
+        max_concurrency: int = 0,
+        retry_after: float = 1.0,
+        fields: Optional[dict] = None,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            latency (Distribution): 最初のトークンを返すまでの時間の分布
+            output_rate (float): 出力トークン/秒
+            error_rate (float): 429を返す確率
+            max_concurrency (int): 同時に処理するリクエスト数の上限（超過分は429、0で無制限）
+            retry_after (float): 429のメッセージで指定する再試行までの秒数
+            fields (dict): レスポンススキーマの項目ごとの定型出力
+        """
+        self.latency = latency
+        self.output_rate = output_rate
+        self.error_rate = error_rate
+        self.max_concurrency = max_concurrency
+        self.retry_after = retry_after
+        self.fields = {**CANNED_FIELDS, **(fields or {})}
+        self._rng = random.Random(seed)
+        self._server: Optional[grpc.aio.Server] = None
+        self.cert_file: Optional[str] = None
+        self.active = 0
+        self.requests = 0
+        self.rejected = 0
+
+    def _handler(self) -> grpc.GenericRpcHandler:
+        return grpc.method_handlers_generic_handler(
+            SERVICE,
+            {
+                "GenerateContent": grpc.unary_unary_rpc_method_handler(
+                    self._generate_content,
+                    request_deserializer=glm.GenerateContentRequest.deserialize,
+                    response_serializer=glm.GenerateContentResponse.serialize,
+                ),
+                "StreamGenerateContent": grpc.unary_stream_rpc_method_handler(
+                    self._stream_generate_content,
+                    request_deserializer=glm.GenerateContentRequest.deserialize,
+                    response_serializer=glm.GenerateContentResponse.serialize,
+                ),
+            },
+        )
+
+    async def start(
+        self, port: int = 0, host: str = "127.0.0.1", cert_file: Optional[str] = None
+    ) -> str:
+        """サーバーをTLSで起動し、接続先（host:port）を返す
+        自己署名証明書を cert_file（省略時は一時ファイル）に書き出し、このプロセスの
+        gRPCクライアントが信頼するよう GRPC_DEFAULT_SSL_ROOTS_FILE_PATH に設定する。
+        """
+        key_pem, cert_pem = _self_signed_cert(host)
+        if cert_file is None:
+            cert_file = os.path.join(tempfile.mkdtemp(), "standin.pem")
+        with open(cert_file, "wb") as f:
+            f.write(cert_pem)
+        self.cert_file = cert_file
+        os.environ["GRPC_DEFAULT_SSL_ROOTS_FILE_PATH"] = cert_file
+
+        self._server = grpc.aio.server()
+        self._server.add_generic_rpc_handlers((self._handler(),))
+        credentials = grpc.ssl_server_credentials([(key_pem, cert_pem)])
+        port = self._server.add_secure_port(f"{host}:{port}", credentials)
+        await self._server.start()
+        return f"{host}:{port}"
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            await self._server.stop(grace=None)
+
+    async def wait(self) -> None:
+        await self._server.wait_for_termination()
+
+    def _output(self, request: glm.GenerateContentRequest) -> str:
+        """レスポンススキーマの項目に合わせた定型出力を作成する"""
+        schema = request.generation_config.response_schema
+        if not schema.properties:
+            return CANNED_TEXT
+        return json.dumps(
+            {name: self.fields.get(name, "") for name in schema.properties},
+            ensure_ascii=False,
+        )
+
+    @staticmethod
+    def _prompt_tokens(request: glm.GenerateContentRequest) -> int:
+        contents = list(request.contents)
+        if request.system_instruction.parts:
+            contents.append(request.system_instruction)
+        return sum(
+            estimate_tokens(part.text) for content in contents for part in content.parts
+        )
+
+    async def _admit(self, context: grpc.aio.ServicerContext) -> None:
+        """レート制限を模擬する（上限超過・一定確率で429を返す）"""
+        self.requests += 1
+        if (self.max_concurrency and self.active >= self.max_concurrency) or (
+            self._rng.random() < self.error_rate
+        ):
+            self.rejected += 1
+            await context.abort(
+                grpc.StatusCode.RESOURCE_EXHAUSTED,
+                "Resource has been exhausted (e.g. check quota). "
+                f"Please retry in {self.retry_after}s.",
+            )
+
+    @staticmethod
+    def _response(text: str, usage: Optional[tuple[int, int]] = None) -> glm.GenerateContentResponse:
+        response = glm.GenerateContentResponse(
+            candidates=[
+                glm.Candidate(
+                    content=glm.Content(parts=[glm.Part(text=text)], role="model"),
+                    finish_reason=glm.Candidate.FinishReason.STOP,
+                )
+            ]
+        )
+        if usage is not None:
+            prompt_tokens, output_tokens = usage
+            response.usage_metadata = glm.GenerateContentResponse.UsageMetadata(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=output_tokens,
+                total_token_count=prompt_tokens + output_tokens,
+            )
+        return response
+
+    async def _generate_content(self, request, context):
+        await self._admit(context)
+        self.active += 1
+        try:
+            text = self._output(request)
+            output_tokens = estimate_tokens(text)
+            await asyncio.sleep(
+                self.latency.sample(self._rng) + output_tokens / self.output_rate
+            )
+            return self._response(text, (self._prompt_tokens(request), output_tokens))
+        finally:
+            self.active -= 1
+
+    async def _stream_generate_content(self, request, context):
+        await self._admit(context)
+        self.active += 1
+        try:
+            text = self._output(request)
+            chunks = [
+                text[i : i + STREAM_CHUNK_CHARS]
+                for i in range(0, len(text), STREAM_CHUNK_CHARS)
+            ]
+            await asyncio.sleep(self.latency.sample(self._rng))
+            for index, chunk in enumerate(chunks):
+                if index:
+                    await asyncio.sleep(estimate_tokens(chunk) / self.output_rate)
+                last = index == len(chunks) - 1
+                yield self._response(
+                    chunk,
+                    (self._prompt_tokens(request), estimate_tokens(text)) if last else None,
+                )
+        finally:
+            self.active -= 1
+
+
+async def _serve(args) -> None:
+    fields = None
+    if args.response_file:
+        with open(args.response_file, "r", encoding="utf-8") as f:
+            fields = json.load(f)
+    standin = GeminiStandIn(
+        latency=Distribution.parse(args.latency),
+        output_rate=args.output_rate,
+        error_rate=args.error_rate,
+        max_concurrency=args.max_concurrency,
+        retry_after=args.retry_after,
+        fields=fields,
+        seed=args.seed,
+    )
+    endpoint = await standin.start(args.port, args.host, args.cert_file)
+    print(f"Gemini stand-in listening on {endpoint} (certificate: {standin.cert_file})")
+    await standin.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=50051)
+    parser.add_argument("--latency", default="lognormal:0.8,0.4", help="最初のトークンまでの時間の分布")
+    parser.add_argument("--output-rate", type=float, default=200, help="出力トークン/秒")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="429を返す確率")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="超過分に429を返す同時実行数")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--response-file", help="項目ごとの定型出力（JSON）")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--cert-file", default="standin.pem", help="自己署名証明書の書き出し先")
+    asyncio.run(_serve(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import os
+import time
+
+from app.core.cache import DiskStore, LRUCache
+
+
+def test_lru_cache_eviction():
+    """
+    上限を超えた場合、最も使われていないエントリから削除されること
+    """
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    # "a" を参照して最近使用したものにする
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_disk_store_put_and_get(tmp_path):
+    """
+    書き込んだ内容を読み出せること（圧縮あり）
+    """
+    store = DiskStore(str(tmp_path), max_bytes=1024 * 1024, compress=True)
+    store.put("video:ja", "字幕データ".encode("utf-8") * 100)
+
+    assert store.get("video:ja") == "字幕データ".encode("utf-8") * 100
+    assert store.get("video:en") is None
+
+    # 圧縮して保存されていること
+    assert 0 < store.size() < len("字幕データ".encode("utf-8") * 100)
+
+    # 一時ファイルが残っていないこと
+    leftovers = [
+        name for _, _, files in os.walk(tmp_path) for name in files if name.endswith(".tmp")
+    ]
+    assert leftovers == []
+
+
+def test_disk_store_eviction(tmp_path):
+    """
+    合計サイズが上限を超えた場合、最終アクセスが古いエントリから削除されること
+    """
+    store = DiskStore(str(tmp_path), max_bytes=250)
+    store.put("a", b"x" * 100)
+    store.put("b", b"x" * 100)
+
+    # "a" の最終アクセス日時を新しくする
+    past = time.time() - 60
+    os.utime(store._get_path("b"), (past, past))
+    store.get("a")
+
+    store.put("c", b"x" * 100)
+
+    assert store.get("b") is None
+    assert store.get("a") is not None
+    assert store.get("c") is not None
+    assert store.size() <= 250
+
+
+def test_disk_store_survives_new_instance(tmp_path):
+    """
+    別インスタンス（再起動後）からも読み出せること
+    """
+    DiskStore(str(tmp_path), max_bytes=1024).put("key", b"value")
+
+    store = DiskStore(str(tmp_path), max_bytes=1024)
+    assert store.get("key") == b"value"
+    assert store.size() == len(b"value")
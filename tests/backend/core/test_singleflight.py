@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_do_coalesces_concurrent_calls():
+    """
+    同一キーの同時呼び出しは1回の実行にまとめられること
+    """
+    flight = SingleFlight("test.flight")
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    results = await asyncio.gather(*[flight.do("key", work) for _ in range(3)])
+
+    assert results == ["result"] * 3
+    assert len(calls) == 1
+    assert len(flight) == 0
+
+    # 完了後は再度実行される
+    await flight.do("key", work)
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_do_propagates_exception():
+    """
+    例外は全ての呼び出し元に伝播すること
+    """
+    flight = SingleFlight("test.flight")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("failed")
+
+    results = await asyncio.gather(
+        *[flight.do("key", fail) for _ in range(2)], return_exceptions=True
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_do_survives_caller_cancellation():
+    """
+    呼び出し元の1つが取り消されても、他の呼び出し元は結果を受け取れること
+    """
+    flight = SingleFlight("test.flight")
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "result"
+
+    first = asyncio.create_task(flight.do("key", work))
+    second = asyncio.create_task(flight.do("key", work))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == "result"
+
+
+@pytest.mark.asyncio
+async def test_do_cancels_when_all_callers_cancelled():
+    """
+    全ての呼び出し元が取り消された場合は、共有している処理も取り消されること
+    """
+    flight = SingleFlight("test.flight")
+    finished = []
+
+    async def work():
+        await asyncio.sleep(0.05)
+        finished.append(1)
+
+    caller = asyncio.create_task(flight.do("key", work))
+    await asyncio.sleep(0.01)
+    caller.cancel()
+    await asyncio.sleep(0.08)
+
+    assert finished == []
+    assert len(flight) == 0
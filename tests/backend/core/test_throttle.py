@@ -0,0 +1,67 @@
+import asyncio
+import pytest
+
+from app.core.throttle import TokenBucket
+
+
+def test_try_acquire_respects_capacity():
+    """
+    容量分のトークンを消費した後は取得できないこと
+    """
+    bucket = TokenBucket(rate=0.001, capacity=3)
+
+    assert bucket.try_acquire(2)
+    assert bucket.try_acquire(1)
+    assert not bucket.try_acquire(1)
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_for_refill():
+    """
+    トークン不足時は補充されるまで待機すること
+    """
+    bucket = TokenBucket(rate=20, capacity=1)
+    assert bucket.try_acquire(1)
+
+    waited = await bucket.acquire(1)
+
+    assert 0.03 <= waited < 0.5
+
+
+@pytest.mark.asyncio
+async def test_acquire_is_fifo():
+    """
+    取得待ちは到着順に処理されること
+    """
+    bucket = TokenBucket(rate=50, capacity=1)
+    assert bucket.try_acquire(1)
+    order = []
+
+    async def worker(index):
+        await bucket.acquire(1)
+        order.append(index)
+
+    tasks = [asyncio.create_task(worker(index)) for index in range(3)]
+    await asyncio.sleep(0)
+    assert bucket.waiting == 3
+    # 待機中の取得がある間は割り込めない
+    assert not bucket.try_acquire(1)
+
+    await asyncio.gather(*tasks)
+
+    assert order == [0, 1, 2]
+    assert bucket.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_pause_delays_acquire():
+    """
+    停止中はトークンが残っていても取得できないこと
+    """
+    bucket = TokenBucket(rate=100, capacity=5)
+    bucket.pause(0.1)
+
+    assert not bucket.try_acquire(1)
+    waited = await bucket.acquire(1)
+
+    assert 0.08 <= waited < 0.5
@@ -1,3 +1,4 @@
+import json
 import pytest
 from datetime import datetime, date, timedelta
 from pydantic import HttpUrl
@@ -7,6 +8,9 @@ from unittest.mock import AsyncMock, MagicMock
 from app.main import app
 from app.models import schemas
 from app.api.v1 import deps
+from app.services.analysis_jobs import AnalysisJobs
+from app.services.analysis_service import AnalysisStreamEvent
+from app.core.exceptions import APIException
 
 client = TestClient(app)
 
@@ -49,7 +53,9 @@ def mock_services():
     """
     # SessionService
     mock_session_service = MagicMock()
-    mock_session_service.load_session = AsyncMock(return_value=dummy_session_info)
+    mock_session_service.load_session = AsyncMock(
+        side_effect=lambda session_id: dummy_session_info.model_copy(deep=True)
+    )
     mock_session_service.save_session = AsyncMock(return_value=None)
 
     # AnalysisService
@@ -58,13 +64,19 @@ def mock_services():
         return_value=dummy_analysis_result
     )
 
+    # AnalysisJobs（実行中の分析なし）
+    mock_analysis_jobs = MagicMock()
+    mock_analysis_jobs.get.return_value = None
+
     # 依存関係のオーバーライド設定
     app.dependency_overrides[deps.get_session_service] = lambda: mock_session_service
     app.dependency_overrides[deps.get_analysis_service] = lambda: mock_analysis_service
+    app.dependency_overrides[deps.get_analysis_jobs] = lambda: mock_analysis_jobs
 
     yield {
         "session": mock_session_service,
         "analysis": mock_analysis_service,
+        "analysis_jobs": mock_analysis_jobs,
     }
 
     app.dependency_overrides.clear()
@@ -100,7 +112,7 @@ async def test_analyze_video_data(mock_services):
 
     mock_session.load_session.assert_called_once_with("dummy-session-id")
     mock_analysis.analyze_transcript.assert_called_once_with(
-        dummy_session_info.transcript
+        dummy_session_info.transcript, bypass_cache=False, tags=None
     )
     mock_session.save_session.assert_called_once()
     saved_session_info = mock_session.save_session.call_args[0][0]
@@ -108,3 +120,282 @@ async def test_analyze_video_data(mock_services):
 
     # analysis_resultの内容検証
     assert saved_session_info.analysis_result == dummy_analysis_result
+
+
+@pytest.mark.asyncio
+async def test_analyze_video_data_attaches_to_running_analysis(mock_services):
+    """
+    先行分析が実行中の場合は、その結果を返し新たに分析しないこと
+    """
+    analyzed_session_info = dummy_session_info.model_copy(
+        update={"status": "analyzed", "analysis_result": dummy_analysis_result}
+    )
+
+    async def running_analysis():
+        return analyzed_session_info
+
+    mock_services["analysis_jobs"].get.return_value = running_analysis()
+
+    response = client.post("/api/v1/analyze", json={"session_id": "dummy-session-id"})
+
+    assert response.status_code == 200
+    assert response.json()["data"]["summary"] == dummy_analysis_result.summary
+    mock_services["analysis_jobs"].get.assert_called_once_with("dummy-session-id")
+    mock_services["analysis"].analyze_transcript.assert_not_called()
+    mock_services["session"].save_session.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_analyze_video_data_running_analysis_failed(mock_services):
+    """
+    先行分析が失敗した場合は、改めて分析すること
+    """
+
+    async def running_analysis():
+        raise APIException(status_code=429, message="Rate limited", error_code="E004")
+
+    mock_services["analysis_jobs"].get.return_value = running_analysis()
+
+    response = client.post("/api/v1/analyze", json={"session_id": "dummy-session-id"})
+
+    assert response.status_code == 200
+    mock_services["analysis"].analyze_transcript.assert_called_once()
+    mock_services["session"].save_session.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_analyze_video_data_running_analysis_unexpected_error(mock_services):
+    """
+    先行分析が想定外のエラーで失敗した場合も、改めて分析すること
+    """
+
+    async def running_analysis():
+        raise RuntimeError("unexpected")
+
+    mock_services["analysis_jobs"].get.return_value = running_analysis()
+
+    response = client.post("/api/v1/analyze", json={"session_id": "dummy-session-id"})
+
+    assert response.status_code == 200
+    mock_services["analysis"].analyze_transcript.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_analyze_video_data_already_analyzed(mock_services):
+    """
+    分析済みのセッションは、保存済みの結果を返し再分析しないこと
+    """
+    mock_services["session"].load_session = AsyncMock(
+        return_value=dummy_session_info.model_copy(
+            update={"status": "analyzed", "analysis_result": dummy_analysis_result}
+        )
+    )
+
+    response = client.post("/api/v1/analyze", json={"session_id": "dummy-session-id"})
+
+    assert response.status_code == 200
+    assert response.json()["data"]["summary"] == dummy_analysis_result.summary
+    mock_services["analysis"].analyze_transcript.assert_not_called()
+    mock_services["session"].save_session.assert_not_called()
+
+
+def _parse_sse(body: str) -> list[tuple[str, dict]]:
+    """Server-Sent Eventsのレスポンスを (イベント名, データ) に分解する"""
+    events = []
+    for message in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in message.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_analyze_video_data_stream(mock_services):
+    """
+    analyze/stream エンドポイントの正常系テスト
+    """
+    mock_analysis = mock_services["analysis"]
+
+    async def stream_analysis(transcript, bypass_cache, tags=None):
+        yield AnalysisStreamEvent(summary_delta="テスト用の")
+        yield AnalysisStreamEvent(summary_delta="要約データ")
+        yield AnalysisStreamEvent(result=dummy_analysis_result)
+
+    mock_analysis.stream_analysis = stream_analysis
+
+    response = client.post(
+        "/api/v1/analyze/stream", json={"session_id": "dummy-session-id"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = _parse_sse(response.text)
+    assert [name for name, _ in events] == ["start", "summary", "summary", "result"]
+    assert events[0][1] == {"session_id": "dummy-session-id"}
+    assert "".join(data["delta"] for name, data in events if name == "summary") == (
+        dummy_analysis_result.summary
+    )
+    assert events[-1][1]["suggested_titles"] == dummy_analysis_result.suggested_titles
+
+    # ストリーム完了後に分析結果がセッションに保存される
+    mock_session = mock_services["session"]
+    mock_session.save_session.assert_called_once()
+    saved_session_info = mock_session.save_session.call_args[0][0]
+    assert saved_session_info.analysis_result == dummy_analysis_result
+
+
+@pytest.mark.asyncio
+async def test_analyze_video_data_stream_error(mock_services):
+    """
+    分析に失敗した場合は error イベントを送信し、セッションは保存しないこと
+    """
+    mock_analysis = mock_services["analysis"]
+
+    async def stream_analysis(transcript, bypass_cache, tags=None):
+        yield AnalysisStreamEvent(summary_delta="テスト")
+        raise APIException(status_code=502, message="Analysis failed", error_code="E008")
+
+    mock_analysis.stream_analysis = stream_analysis
+
+    response = client.post(
+        "/api/v1/analyze/stream", json={"session_id": "dummy-session-id"}
+    )
+
+    events = _parse_sse(response.text)
+    assert [name for name, _ in events] == ["start", "summary", "error"]
+    assert events[-1][1] == {"error_code": "E008", "message": "Analysis failed"}
+    mock_services["session"].save_session.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_analyze_video_data_stream_too_large(mock_services):
+    """
+    処理できない長さの字幕は、ストリーム開始前に413エラーを返すこと
+    """
+    mock_services["analysis"].preflight.side_effect = APIException(
+        status_code=413, message="Transcript is too long to analyze.", error_code="E011"
+    )
+
+    response = client.post(
+        "/api/v1/analyze/stream", json={"session_id": "dummy-session-id"}
+    )
+
+    assert response.status_code == 413
+    assert response.json()["error_code"] == "E011"
+
+
+@pytest.mark.asyncio
+async def test_regenerate_field(mock_services):
+    """
+    analyze/regenerate エンドポイントの正常系テスト
+    """
+    analyzed_session_info = dummy_session_info.model_copy(
+        update={"status": "analyzed", "analysis_result": dummy_analysis_result}
+    )
+    regenerated = dummy_analysis_result.model_copy(update={"emotions": "感動"})
+    mock_services["session"].load_session = AsyncMock(return_value=analyzed_session_info)
+    mock_services["analysis"].regenerate_field = AsyncMock(return_value=regenerated)
+
+    response = client.post(
+        "/api/v1/analyze/regenerate",
+        json={"session_id": "dummy-session-id", "field": "emotions"},
+    )
+
+    assert response.status_code == 200
+    response_data = response.json()["data"]
+    assert response_data["emotions"] == "感動"
+    assert response_data["summary"] == dummy_analysis_result.summary
+
+    mock_services["analysis"].regenerate_field.assert_called_once_with(
+        dummy_analysis_result, "emotions"
+    )
+    mock_services["analysis"].analyze_transcript.assert_not_called()
+    saved_session_info = mock_services["session"].save_session.call_args[0][0]
+    assert saved_session_info.analysis_result == regenerated
+    assert saved_session_info.status == "analyzed"
+
+
+@pytest.mark.asyncio
+async def test_regenerate_field_not_analyzed(mock_services):
+    """
+    未分析のセッションは409エラーを返すこと
+    """
+    mock_services["session"].load_session = AsyncMock(
+        return_value=dummy_session_info.model_copy(update={"analysis_result": None})
+    )
+
+    response = client.post(
+        "/api/v1/analyze/regenerate",
+        json={"session_id": "dummy-session-id", "field": "suggested_titles"},
+    )
+
+    assert response.status_code == 409
+    assert response.json()["error_code"] == "E012"
+    mock_services["session"].save_session.assert_not_called()
+
+
+def test_regenerate_field_validation():
+    """
+    再生成できない項目が指定された場合
+    """
+    response = client.post(
+        "/api/v1/analyze/regenerate",
+        json={"session_id": "dummy-session-id", "field": "summary"},
+    )
+
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_analyze_video_data_batch(mock_services):
+    """
+    analyze/batch エンドポイントの正常系・異常系テスト
+    """
+    mock_session = mock_services["session"]
+
+    async def load_session(session_id):
+        if session_id == "missing-session-id":
+            raise APIException(
+                status_code=404,
+                message=f"Session ID '{session_id}' not found.",
+                error_code="E007",
+            )
+        return dummy_session_info.model_copy(
+            update={"session_id": session_id, "analysis_result": None}
+        )
+
+    mock_session.load_session = AsyncMock(side_effect=load_session)
+    app.dependency_overrides[deps.get_analysis_jobs] = lambda: AnalysisJobs(
+        mock_services["analysis"], mock_session
+    )
+
+    response = client.post(
+        "/api/v1/analyze/batch",
+        json={"session_ids": ["session-1", "missing-session-id", "session-2", "session-1"]},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    items = {
+        item["session_id"]: item
+        for item in map(json.loads, response.text.strip().split("\n"))
+    }
+    assert set(items) == {"session-1", "session-2", "missing-session-id"}
+    assert items["session-1"]["status"] == "success"
+    assert items["session-1"]["data"]["summary"] == dummy_analysis_result.summary
+    assert items["missing-session-id"]["status"] == "error"
+    assert items["missing-session-id"]["error_code"] == "E007"
+
+    # 重複したセッションIDは1回だけ分析される
+    assert mock_services["analysis"].analyze_transcript.call_count == 2
+    assert mock_session.save_session.call_count == 2
+
+
+def test_analyze_video_data_batch_validation():
+    """
+    セッションIDが指定されていない場合
+    """
+    response = client.post("/api/v1/analyze/batch", json={"session_ids": []})
+
+    assert response.status_code == 422
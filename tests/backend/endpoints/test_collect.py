@@ -1,3 +1,4 @@
+import json
 import pytest
 from datetime import date
 from pydantic import HttpUrl
@@ -7,6 +8,8 @@ from unittest.mock import AsyncMock, MagicMock
 from app.main import app
 from app.models import schemas
 from app.api.v1 import deps
+from app.core.exceptions import APIException
+from app.services.youtube_service import VideoFetchResult
 
 
 client = TestClient(app)
@@ -24,7 +27,11 @@ dummy_video_metadata = schemas.VideoMetadata(
     thumbnail_url=HttpUrl("https://img.youtube.com/vi/dummy_id/maxresdefault.jpg"),
 )
 
-dummy_transcript_text = "これはテスト用の字幕データです。"
+dummy_transcript = schemas.Transcript(text="これはテスト用の字幕データです。", language="en")
+
+dummy_tag_prediction = schemas.TagPrediction(
+    categories=["教育"], emotions="啓発", confidence=0.8, confident=True
+)
 
 
 @pytest.fixture
@@ -35,7 +42,7 @@ def mock_services():
     # YouTubeService
     mock_youtube_service = MagicMock()
     mock_youtube_service.fetch_video_data = AsyncMock(
-        return_value=(dummy_video_metadata, dummy_transcript_text)
+        return_value=(dummy_video_metadata, dummy_transcript)
     )
 
     def override_get_youtube_service():
@@ -48,13 +55,25 @@ def mock_services():
     def override_get_session_service():
         return mock_session_service
 
+    # AnalysisJobs
+    mock_analysis_jobs = MagicMock()
+    mock_analysis_jobs.speculate.return_value = True
+
+    # TagClassifier
+    mock_tag_classifier = MagicMock()
+    mock_tag_classifier.predict = AsyncMock(return_value=dummy_tag_prediction)
+
     # 依存関係のオーバーライド設定
     app.dependency_overrides[deps.get_youtube_service] = override_get_youtube_service
     app.dependency_overrides[deps.get_session_service] = override_get_session_service
+    app.dependency_overrides[deps.get_analysis_jobs] = lambda: mock_analysis_jobs
+    app.dependency_overrides[deps.get_tag_classifier] = lambda: mock_tag_classifier
 
     yield {
         "youtube": mock_youtube_service,
         "session": mock_session_service,
+        "analysis_jobs": mock_analysis_jobs,
+        "tag_classifier": mock_tag_classifier,
     }
 
     app.dependency_overrides.clear()
@@ -85,5 +104,143 @@ def test_collect_video_data(mock_services):
     saved_session_info = mock_session_service.save_session.call_args[0][0]
     assert isinstance(saved_session_info, schemas.SessionInfo)
     assert saved_session_info.video_data == dummy_video_metadata
-    assert saved_session_info.transcript == dummy_transcript_text
+    assert saved_session_info.transcript == dummy_transcript.text
+    assert saved_session_info.transcript_language == "en"
     assert saved_session_info.status == "collected"
+
+    # 推定したタグがセッションとレスポンスに含まれること
+    mock_services["tag_classifier"].predict.assert_called_once_with(dummy_transcript.text)
+    assert saved_session_info.tag_prediction == dummy_tag_prediction
+    assert response.json()["data"]["tag_prediction"] == dummy_tag_prediction.model_dump()
+
+
+def test_collect_video_data_batch(mock_services):
+    """
+    collect/batch エンドポイントの正常系・一部失敗テスト
+    """
+    urls = [
+        "https://www.youtube.com/watch?v=dummy_id",
+        "https://www.youtube.com/watch?v=missing_id",
+    ]
+
+    async def iter_video_data(urls):
+        yield VideoFetchResult(
+            index=1,
+            url=urls[1],
+            video_id="missing_id",
+            error=APIException(
+                status_code=404, message="Video not found.", error_code="E009"
+            ),
+        )
+        yield VideoFetchResult(
+            index=0,
+            url=urls[0],
+            video_id="dummy_id",
+            metadata=dummy_video_metadata,
+            transcript=dummy_transcript,
+        )
+
+    mock_youtube_service = mock_services["youtube"]
+    mock_youtube_service.iter_video_data = iter_video_data
+
+    # リクエストを送信
+    response = client.post("/api/v1/collect/batch", json={"urls": urls})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    # 完了順に1行ずつ結果が返ること
+    items = [json.loads(line) for line in response.text.splitlines()]
+    assert len(items) == 2
+
+    assert items[0]["index"] == 1
+    assert items[0]["status"] == "error"
+    assert items[0]["error_code"] == "E009"
+
+    assert items[1]["index"] == 0
+    assert items[1]["status"] == "success"
+    assert items[1]["data"]["video_id"] == dummy_video_metadata.video_id
+
+    # 成功した動画のみセッションが作成されること
+    mock_session_service = mock_services["session"]
+    mock_session_service.save_session.assert_called_once()
+    saved_session_info = mock_session_service.save_session.call_args[0][0]
+    assert saved_session_info.session_id == items[1]["session_id"]
+    assert saved_session_info.transcript == dummy_transcript.text
+
+
+def test_collect_video_data_batch_empty(mock_services):
+    """
+    URLが空の場合はバリデーションエラー
+    """
+    response = client.post("/api/v1/collect/batch", json={"urls": []})
+    assert response.status_code == 422
+
+
+def test_collect_channel_videos(mock_services):
+    """
+    channel_id 指定時にアップロード動画を一括収集し、進捗をストリーミングすること
+    """
+
+    async def iter_playlist_video_data(playlist_id):
+        assert playlist_id == "UUdummy"
+        for index in range(2):
+            yield VideoFetchResult(
+                index=index,
+                url=f"https://www.youtube.com/watch?v=dummy_id{index}",
+                video_id="dummy_id",
+                metadata=dummy_video_metadata,
+                transcript=dummy_transcript,
+                total=2,
+            )
+
+    mock_youtube_service = mock_services["youtube"]
+    mock_youtube_service.resolve_uploads_playlist = AsyncMock(return_value="UUdummy")
+    mock_youtube_service.iter_playlist_video_data = iter_playlist_video_data
+
+    # リクエストを送信
+    response = client.post("/api/v1/collect", json={"channel_id": "UCdummy"})
+    assert response.status_code == 200
+
+    items = [json.loads(line) for line in response.text.splitlines()]
+    assert [item["processed"] for item in items] == [1, 2]
+    assert all(item["total"] == 2 for item in items)
+    assert all(item["status"] == "success" for item in items)
+
+    mock_youtube_service.resolve_uploads_playlist.assert_called_once_with("UCdummy")
+    mock_youtube_service.fetch_video_data.assert_not_called()
+    assert mock_services["session"].save_session.call_count == 2
+
+
+def test_collect_requires_target(mock_services):
+    """
+    url / channel_id / playlist_id のいずれも指定されない場合はバリデーションエラー
+    """
+    response = client.post("/api/v1/collect", json={})
+    assert response.status_code == 422
+
+
+def test_collect_video_data_speculative_analysis(mock_services):
+    """
+    speculative_analysis 指定時は、保存したセッションの分析を先行して開始すること
+    """
+    response = client.post(
+        "/api/v1/collect",
+        json={"url": "https://www.youtube.com/watch?v=dummy_id", "speculative_analysis": True},
+    )
+
+    assert response.status_code == 200
+    mock_services["analysis_jobs"].speculate.assert_called_once_with(
+        response.json()["session_id"]
+    )
+
+
+def test_collect_video_data_without_speculative_analysis(mock_services):
+    """
+    speculative_analysis 未指定時は分析を開始しないこと
+    """
+    response = client.post(
+        "/api/v1/collect", json={"url": "https://www.youtube.com/watch?v=dummy_id"}
+    )
+
+    assert response.status_code == 200
+    mock_services["analysis_jobs"].speculate.assert_not_called()
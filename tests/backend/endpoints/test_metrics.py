@@ -0,0 +1,26 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core.metrics import metrics
+
+client = TestClient(app)
+
+
+def test_get_metrics():
+    """
+    metrics エンドポイントの正常系テスト
+    """
+    metrics.increment("test.counter", 2)
+    metrics.observe("test.latency", 0.5)
+    metrics.register_gauge("test.gauge", lambda: 42)
+
+    response = client.get("/api/v1/metrics")
+
+    assert response.status_code == 200
+    response_json = response.json()
+    assert response_json["status"] == "success"
+
+    data = response_json["data"]
+    assert data["counters"]["test.counter"] >= 2
+    assert data["observations"]["test.latency"]["max"] >= 0.5
+    assert data["gauges"]["test.gauge"] == 42
@@ -0,0 +1,32 @@
+from unittest.mock import MagicMock
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.api.v1 import deps
+from app.services.youtube_quota import QuotaLedger
+
+client = TestClient(app)
+
+
+def test_get_quota(tmp_path):
+    """
+    quota エンドポイントの正常系テスト
+    """
+    mock_youtube_service = MagicMock()
+    mock_youtube_service.quota = QuotaLedger(
+        daily_budget=1000, reserve=100, burst=200, path=str(tmp_path / "quota.json")
+    )
+    app.dependency_overrides[deps.get_youtube_service] = lambda: mock_youtube_service
+
+    try:
+        response = client.get("/api/v1/quota")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    response_json = response.json()
+    assert response_json["status"] == "success"
+    assert response_json["data"]["daily_budget"] == 1000
+    assert response_json["data"]["remaining"] == 1000
+    assert response_json["data"]["reserve"] == 100
@@ -1,3 +1,6 @@
+import asyncio
+import json
+
 import pytest
 from datetime import datetime, date, timedelta
 from pydantic import HttpUrl
@@ -7,6 +10,9 @@ from unittest.mock import AsyncMock, MagicMock
 from app.main import app
 from app.models import schemas
 from app.api.v1 import deps
+from app.core.exceptions import APIException
+from app.services.register_jobs import RegisterJobs
+from app.api.v1.endpoints.register import _to_batch_item, register_to_notion
 
 client = TestClient(app)
 
@@ -60,7 +66,7 @@ def mock_services():
     # SessionService
     mock_session_service = MagicMock()
     mock_session_service.load_session = AsyncMock(
-        return_value=dummy_session_info_analyzed
+        side_effect=lambda session_id: dummy_session_info_analyzed.model_copy(deep=True)
     )
     mock_session_service.save_session = AsyncMock(return_value=None)
 
@@ -74,13 +80,23 @@ def mock_services():
     def override_get_notion_service():
         return mock_notion_service
 
+    # TagClassifier
+    mock_tag_classifier = MagicMock()
+    mock_tag_classifier.learn = AsyncMock(return_value=None)
+
     # 依存関係のオーバーライド設定
     app.dependency_overrides[deps.get_session_service] = override_get_session_service
     app.dependency_overrides[deps.get_notion_service] = override_get_notion_service
+    app.dependency_overrides[deps.get_tag_classifier] = lambda: mock_tag_classifier
+    register_jobs = RegisterJobs(
+        mock_notion_service, mock_session_service, mock_tag_classifier
+    )
+    app.dependency_overrides[deps.get_register_jobs] = lambda: register_jobs
 
     yield {
         "session": mock_session_service,
         "notion": mock_notion_service,
+        "tag_classifier": mock_tag_classifier,
     }
 
     app.dependency_overrides.clear()
@@ -114,11 +130,144 @@ def test_register_video_data(mock_services):
     mock_session.load_session.assert_called_once_with("dummy-session-id-for-register")
 
     # register_pageの呼び出し検証
-    mock_notion.register_page.assert_called_once()
-
-    # save_sessionの呼び出し検証
-    mock_session.save_session.assert_called_once()
+    mock_notion.register_page.assert_called_once_with(
+        dummy_modification_result,
+        dummy_session_info_analyzed.video_data,
+        "dummy-session-id-for-register",
+    )
 
-    # save_sessionで保存されたセッション情報の検証
+    # save_sessionで最後に保存されたセッション情報の検証
     saved_session_info = mock_session.save_session.call_args[0][0]
     assert saved_session_info.status == "registered"
+    assert saved_session_info.modifications == dummy_modification_result
+    assert saved_session_info.notion_url == str(dummy_notion_page_url)
+
+    # 登録内容がタグの推定に学習されること
+    mock_services["tag_classifier"].learn.assert_called_once_with(
+        dummy_session_info_analyzed.transcript, dummy_modification_result, None
+    )
+
+
+def test_register_video_data_already_registered(mock_services):
+    """
+    登録済みのセッションは、ページを再作成せず登録済みのURLを返すこと
+    """
+    mock_services["session"].load_session = AsyncMock(
+        return_value=dummy_session_info_analyzed.model_copy(
+            update={
+                "status": "registered",
+                "modifications": dummy_modification_result,
+                "notion_url": "https://www.notion.so/existing-page",
+            }
+        )
+    )
+
+    response = client.post(
+        "/api/v1/register",
+        json={
+            "session_id": "dummy-session-id-for-register",
+            "modifications": dummy_modification_result.model_dump(),
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json()["data"]["notion_url"] == "https://www.notion.so/existing-page"
+    mock_services["notion"].register_page.assert_not_called()
+    mock_services["session"].save_session.assert_not_called()
+
+
+def test_register_video_data_batch(mock_services):
+    """
+    register/batch エンドポイントの正常系・異常系テスト
+    """
+    mock_session = mock_services["session"]
+
+    async def load_session(session_id):
+        if session_id == "missing-session-id":
+            raise APIException(
+                status_code=404,
+                message=f"Session ID '{session_id}' not found.",
+                error_code="E007",
+            )
+        return dummy_session_info_analyzed.model_copy(update={"session_id": session_id})
+
+    mock_session.load_session = AsyncMock(side_effect=load_session)
+    modifications = dummy_modification_result.model_dump()
+
+    response = client.post(
+        "/api/v1/register/batch",
+        json={
+            "items": [
+                {"session_id": session_id, "modifications": modifications}
+                for session_id in ["session-1", "missing-session-id", "session-2", "session-1"]
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    items = {
+        item["session_id"]: item
+        for item in map(json.loads, response.text.strip().split("\n"))
+    }
+    assert set(items) == {"session-1", "session-2", "missing-session-id"}
+    assert items["session-1"]["status"] == "success"
+    assert items["session-1"]["notion_url"] == str(dummy_notion_page_url)
+    assert items["missing-session-id"]["status"] == "error"
+    assert items["missing-session-id"]["error_code"] == "E007"
+
+    # 重複したセッションIDは1回だけ登録される
+    assert mock_services["notion"].register_page.call_count == 2
+
+
+def test_register_video_data_batch_validation(mock_services):
+    """
+    登録内容が指定されていない場合
+    """
+    response = client.post("/api/v1/register/batch", json={"items": []})
+
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_batch_item_cancelled_task():
+    """
+    キャンセルされた登録ジョブはエラー項目に変換されること
+    """
+    task = asyncio.create_task(asyncio.sleep(10))
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    item = _to_batch_item("session-1", task)
+
+    assert item.status == "error"
+    assert item.error_code == "E999"
+
+
+@pytest.mark.asyncio
+async def test_register_disconnect_keeps_job(mock_services):
+    """
+    リクエストがキャンセルされても、共有している登録ジョブは継続すること
+    """
+    async def register_page(modifications, video_data, session_id=None):
+        await asyncio.sleep(0.05)
+        return dummy_notion_page_url
+
+    mock_services["notion"].register_page = AsyncMock(side_effect=register_page)
+    register_jobs = RegisterJobs(
+        mock_services["notion"], mock_services["session"], mock_services["tag_classifier"]
+    )
+    request = schemas.RegisterRequest(
+        session_id=dummy_session_info_analyzed.session_id,
+        modifications=dummy_modification_result,
+    )
+
+    request_task = asyncio.create_task(register_to_notion(request, register_jobs))
+    await asyncio.sleep(0.01)
+    job = register_jobs.submit(request.session_id, request.modifications)
+    request_task.cancel()
+
+    session_info = await job
+    assert session_info.notion_url == str(dummy_notion_page_url)
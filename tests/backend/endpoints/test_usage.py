@@ -0,0 +1,38 @@
+from unittest.mock import MagicMock
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.api.v1 import deps
+from app.services.usage_ledger import UsageLedger
+
+client = TestClient(app)
+
+
+def test_get_usage(tmp_path):
+    """
+    usage エンドポイントの正常系テスト
+    """
+    ledger_path = tmp_path / "usage.jsonl"
+    ledger_path.write_text(
+        '{"timestamp": "2000-01-01T00:00:00Z", "model": "gemini-test", '
+        '"operation": "analyze", "latency_seconds": 0.1, "cost_usd": 1.0}\n',
+        encoding="utf-8",
+    )
+    mock_analysis_service = MagicMock()
+    mock_analysis_service.usage = UsageLedger(path=str(ledger_path), soft_budget=5.0)
+    app.dependency_overrides[deps.get_analysis_service] = lambda: mock_analysis_service
+
+    try:
+        response = client.get("/api/v1/usage", params={"days": 3})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    response_json = response.json()
+    assert response_json["status"] == "success"
+    assert response_json["data"]["today_cost_usd"] == 0
+    assert response_json["data"]["soft_budget_usd"] == 5.0
+    assert response_json["data"]["hard_budget_usd"] is None
+    # 期間外の記録は集計しない
+    assert response_json["data"]["rollups"] == []
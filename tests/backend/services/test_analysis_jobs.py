@@ -0,0 +1,239 @@
+import asyncio
+from datetime import datetime, date, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pydantic import HttpUrl
+
+from app.models import schemas
+from app.services.analysis_jobs import AnalysisJobs
+from app.services.usage_ledger import UsageLedger
+from app.core.exceptions import APIException
+
+dummy_analysis_result = schemas.AnalysisResult(
+    summary="テスト用の要約データ",
+    suggested_titles="テスト用のタイトル",
+    categories=["教育"],
+    emotions="考察",
+)
+
+
+def _session(session_id: str, analysis_result=None) -> schemas.SessionInfo:
+    return schemas.SessionInfo(
+        session_id=session_id,
+        timestamp=datetime.now(),
+        expires_at=datetime.now() + timedelta(hours=1),
+        video_data=schemas.VideoMetadata(
+            video_id="dummy_id",
+            title="Dummy Video Title",
+            channel_name="Dummy Channel",
+            published_at=date(2023, 1, 1),
+            duration="PT10M",
+            duration_seconds=600,
+            view_count=1000,
+            url=HttpUrl("https://www.youtube.com/watch?v=dummy_id"),
+            thumbnail_url=HttpUrl("https://img.youtube.com/vi/dummy_id/maxresdefault.jpg"),
+        ),
+        transcript=f"{session_id}の字幕データ",
+        transcript_language="ja",
+        status="analyzed" if analysis_result else "collected",
+        created_by="test_system",
+        analysis_result=analysis_result,
+    )
+
+
+@pytest.fixture
+def services():
+    """
+    セッション・分析サービスのモック
+    """
+    sessions = {}
+    session_service = MagicMock()
+    session_service.load_session = AsyncMock(
+        side_effect=lambda session_id: sessions[session_id].model_copy()
+    )
+
+    async def save_session(session_info):
+        sessions[session_info.session_id] = session_info
+
+    session_service.save_session = AsyncMock(side_effect=save_session)
+
+    analysis_service = MagicMock()
+
+    async def analyze_transcript(
+        transcript, bypass_cache=False, priority="interactive", tags=None
+    ):
+        await asyncio.sleep(0.02)
+        return dummy_analysis_result
+
+    analysis_service.analyze_transcript = AsyncMock(side_effect=analyze_transcript)
+    return sessions, session_service, analysis_service
+
+
+@pytest.mark.asyncio
+async def test_submit_analyzes_and_saves(services):
+    """
+    分析結果がセッションに保存されること
+    """
+    sessions, session_service, analysis_service = services
+    sessions["s1"] = _session("s1")
+    jobs = AnalysisJobs(analysis_service, session_service)
+
+    session_info = await jobs.submit("s1")
+
+    assert session_info.status == "analyzed"
+    assert session_info.analysis_result == dummy_analysis_result
+    assert sessions["s1"].analysis_result == dummy_analysis_result
+    assert len(jobs) == 0
+
+
+@pytest.mark.asyncio
+async def test_submit_records_usage(services, tmp_path):
+    """
+    一括処理の優先度で分析し、利用量をセッションに保存すること
+    """
+    sessions, session_service, analysis_service = services
+    sessions["s1"] = _session("s1")
+    ledger = UsageLedger(path=str(tmp_path / "usage.jsonl"))
+
+    async def analyze_transcript(
+        transcript, bypass_cache=False, priority="interactive", tags=None
+    ):
+        await ledger.record("gemini-test", "analyze", None, 0.1)
+        return dummy_analysis_result
+
+    analysis_service.analyze_transcript = AsyncMock(side_effect=analyze_transcript)
+    jobs = AnalysisJobs(analysis_service, session_service)
+
+    await jobs.submit("s1")
+
+    assert analysis_service.analyze_transcript.call_args.kwargs["priority"] == "bulk"
+    assert [record.model for record in sessions["s1"].usage] == ["gemini-test"]
+
+
+@pytest.mark.asyncio
+async def test_submit_attaches_to_running_job(services):
+    """
+    実行中のセッションを再度指定した場合は同じタスクを返すこと
+    """
+    sessions, session_service, analysis_service = services
+    sessions["s1"] = _session("s1")
+    jobs = AnalysisJobs(analysis_service, session_service)
+
+    first = jobs.submit("s1")
+    second = jobs.submit("s1")
+
+    assert first is second
+    await first
+    analysis_service.analyze_transcript.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_submit_skips_analyzed_session(services):
+    """
+    分析済みのセッションは再分析せず、bypass_cache指定時のみ再分析すること
+    """
+    sessions, session_service, analysis_service = services
+    sessions["s1"] = _session("s1", analysis_result=dummy_analysis_result)
+    jobs = AnalysisJobs(analysis_service, session_service)
+
+    await jobs.submit("s1")
+    analysis_service.analyze_transcript.assert_not_called()
+
+    await jobs.submit("s1", bypass_cache=True)
+    analysis_service.analyze_transcript.assert_called_once_with(
+        "s1の字幕データ", bypass_cache=True, priority="bulk", tags=None
+    )
+
+
+@pytest.mark.asyncio
+async def test_submit_limits_workers(services):
+    """
+    同時に分析するセッション数が上限を超えないこと
+    """
+    sessions, session_service, analysis_service = services
+    active = 0
+    peak = 0
+
+    async def analyze_transcript(
+        transcript, bypass_cache=False, priority="interactive", tags=None
+    ):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+        return dummy_analysis_result
+
+    analysis_service.analyze_transcript.side_effect = analyze_transcript
+    for i in range(6):
+        sessions[f"s{i}"] = _session(f"s{i}")
+    jobs = AnalysisJobs(analysis_service, session_service, max_workers=2)
+
+    await asyncio.gather(*[jobs.submit(f"s{i}") for i in range(6)])
+
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_submit_continues_after_waiter_cancelled(services):
+    """
+    待機側がキャンセルされても分析は継続し、結果が保存されること
+    """
+    sessions, session_service, analysis_service = services
+    sessions["s1"] = _session("s1")
+    jobs = AnalysisJobs(analysis_service, session_service)
+
+    task = jobs.submit("s1")
+    waiter = asyncio.create_task(asyncio.wait({task}))
+    await asyncio.sleep(0)
+    waiter.cancel()
+
+    await asyncio.sleep(0.05)
+    assert task.done() and not task.cancelled()
+    assert sessions["s1"].analysis_result == dummy_analysis_result
+
+
+@pytest.mark.asyncio
+async def test_submit_failure(services):
+    """
+    分析に失敗した場合はタスクの例外として返し、実行中の一覧から削除すること
+    """
+    sessions, session_service, analysis_service = services
+    sessions["s1"] = _session("s1")
+    analysis_service.analyze_transcript.side_effect = APIException(
+        status_code=502, message="Analysis failed", error_code="E008"
+    )
+    jobs = AnalysisJobs(analysis_service, session_service)
+
+    with pytest.raises(APIException):
+        await jobs.submit("s1")
+
+    assert len(jobs) == 0
+    assert sessions["s1"].analysis_result is None
+
+
+@pytest.mark.asyncio
+async def test_speculate_respects_cap(services):
+    """
+    先行分析の実行数が上限に達している場合は開始しないこと
+    """
+    sessions, session_service, analysis_service = services
+    for i in range(3):
+        sessions[f"s{i}"] = _session(f"s{i}")
+    jobs = AnalysisJobs(analysis_service, session_service, max_speculative=2)
+
+    assert jobs.speculate("s0")
+    assert jobs.speculate("s1")
+    # 実行中のセッションは上限に関わらず受け付ける
+    assert jobs.speculate("s0")
+    assert not jobs.speculate("s2")
+    assert jobs.get("s2") is None
+
+    await asyncio.gather(jobs.get("s0"), jobs.get("s1"))
+    await asyncio.sleep(0)
+
+    # 完了後は再び開始できる
+    assert jobs.speculate("s2")
+    session_info = await jobs.get("s2")
+    assert session_info.analysis_result == dummy_analysis_result
@@ -1,12 +1,17 @@
 import pytest
 import json
 from unittest.mock import patch, MagicMock, AsyncMock
+from google.api_core.exceptions import ResourceExhausted
 
-from app.services.analysis_service import AnalysisService
-from app.models.schemas import AnalysisResult
+from app.services.analysis_service import AnalysisService, SYSTEM_INSTRUCTION
+from app.services.usage_ledger import usage_scope
+from app.models.schemas import AnalysisResult, TagPrediction
 from app.core.exceptions import APIException
+from app.core.metrics import metrics
 
 DUMMY_TRANSCRIPT = "テスト用のダミー字幕データ"
+# 圧縮で短くならない2000文字の字幕
+LONG_TRANSCRIPT = "".join(chr(0x4E00 + i) for i in range(2000))
 DUMMY_ANALYSIS_RESULT = json.dumps(
     {
         "summary": "これはテスト用の要約です。",
@@ -18,11 +23,15 @@ DUMMY_ANALYSIS_RESULT = json.dumps(
 
 
 @pytest.fixture
-def setup_gemini_env(monkeypatch):
+def setup_gemini_env(monkeypatch, tmp_path):
     """
-    ダミーのAPIキーを設定
+    ダミーのAPIキーを設定し、キャッシュ・利用量台帳の保存先をテスト用にパッチする
     """
     monkeypatch.setattr("app.services.analysis_service.GEMINI_API_KEY", "dummy_api_key")
+    monkeypatch.setattr("app.services.analysis_cache.CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(
+        "app.services.usage_ledger.USAGE_LEDGER_PATH", str(tmp_path / "usage.jsonl")
+    )
 
 
 @pytest.fixture
@@ -59,6 +68,389 @@ async def test_analyze_transcript_success(mock_gemini_model, setup_gemini_env):
     mock_gemini_model.generate_content_async.assert_called_once()
 
 
+@pytest.mark.asyncio
+async def test_analyze_transcript_chunked(mock_gemini_model, setup_gemini_env, monkeypatch):
+    """
+    長い字幕はチャンクごとに要約してから統合されること
+    """
+    monkeypatch.setattr("app.services.analysis_service.ANALYSIS_CHUNK_THRESHOLD", 100)
+    monkeypatch.setattr("app.services.analysis_service.ANALYSIS_CHUNK_TOKENS", 50)
+    transcript = " ".join(f"字幕{i:03d}" for i in range(50))
+
+    service = AnalysisService()
+
+    async def generate(prompt, generation_config):
+        response = MagicMock()
+        if generation_config is service.map_generation_config:
+            response.text = "チャンク要約"
+        else:
+            response.text = DUMMY_ANALYSIS_RESULT
+        return response
+
+    mock_gemini_model.generate_content_async.side_effect = generate
+
+    result = await service.analyze_transcript(transcript)
+
+    assert result.summary == json.loads(DUMMY_ANALYSIS_RESULT)["summary"]
+    calls = mock_gemini_model.generate_content_async.call_args_list
+    assert len(calls) == 6
+    # 最後の呼び出しはチャンク要約を統合するJSON形式の分析
+    reduce_prompt = calls[-1].args[0]
+    assert "[5/5]" in reduce_prompt
+    assert "字幕000" not in reduce_prompt
+    assert calls[-1].kwargs["generation_config"] is not service.map_generation_config
+
+
+@pytest.mark.asyncio
+async def test_analyze_transcript_uses_cache(mock_gemini_model, setup_gemini_env):
+    """
+    同じ字幕の再分析はキャッシュから返され、bypass_cache指定時は再度分析されること
+    """
+    service = AnalysisService()
+
+    first = await service.analyze_transcript(DUMMY_TRANSCRIPT)
+    second = await service.analyze_transcript(DUMMY_TRANSCRIPT)
+
+    assert second == first
+    mock_gemini_model.generate_content_async.assert_called_once()
+
+    # 別のインスタンスからもディスク上のキャッシュを参照できる
+    await AnalysisService().analyze_transcript(DUMMY_TRANSCRIPT)
+    mock_gemini_model.generate_content_async.assert_called_once()
+
+    await service.analyze_transcript(DUMMY_TRANSCRIPT, bypass_cache=True)
+    assert mock_gemini_model.generate_content_async.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_analyze_transcript_cache_key(mock_gemini_model, setup_gemini_env, monkeypatch):
+    """
+    モデルやプロンプトのバージョンが変わった場合はキャッシュを使わないこと
+    """
+    service = AnalysisService()
+    await service.analyze_transcript(DUMMY_TRANSCRIPT)
+
+    monkeypatch.setattr("app.services.analysis_service.PROMPT_VERSION", "test")
+    await service.analyze_transcript(DUMMY_TRANSCRIPT)
+    assert mock_gemini_model.generate_content_async.call_count == 2
+
+    service.tiers[0].name = "test-model"
+    await service.analyze_transcript(DUMMY_TRANSCRIPT)
+    assert mock_gemini_model.generate_content_async.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_analyze_transcript_cache_expired(mock_gemini_model, setup_gemini_env):
+    """
+    有効期限切れのキャッシュは使わないこと
+    """
+    service = AnalysisService()
+    service.cache.ttl = -1
+
+    await service.analyze_transcript(DUMMY_TRANSCRIPT)
+    await service.analyze_transcript(DUMMY_TRANSCRIPT)
+
+    assert mock_gemini_model.generate_content_async.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_analysis(mock_gemini_model, setup_gemini_env):
+    """
+    stream_analysis は要約を生成途中から返し、最後に分析結果を返すこと
+    """
+
+    async def stream_chunks():
+        for i in range(0, len(DUMMY_ANALYSIS_RESULT), 7):
+            chunk = MagicMock()
+            chunk.text = DUMMY_ANALYSIS_RESULT[i : i + 7]
+            yield chunk
+
+    mock_gemini_model.generate_content_async.return_value = stream_chunks()
+
+    service = AnalysisService()
+
+    events = [event async for event in service.stream_analysis(DUMMY_TRANSCRIPT)]
+
+    expected = json.loads(DUMMY_ANALYSIS_RESULT)
+    deltas = [event.summary_delta for event in events if event.summary_delta]
+    assert len(deltas) > 1
+    assert "".join(deltas) == expected["summary"]
+    assert events[-1].result == AnalysisResult.model_validate(expected)
+    assert mock_gemini_model.generate_content_async.call_args.kwargs["stream"] is True
+
+    # 完了した結果はキャッシュされ、同じ字幕の分析に使われる
+    await service.analyze_transcript(DUMMY_TRANSCRIPT)
+    mock_gemini_model.generate_content_async.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_analyze_transcript_routes_by_length(setup_gemini_env, monkeypatch):
+    """
+    入力トークン数に応じて、処理できる最も小さいモデルが使われること
+    """
+    monkeypatch.setattr(
+        "app.services.analysis_service.MODEL_TIERS",
+        [("light-model", 1000, 0.8), ("long-model", 5000, 0.5)],
+    )
+    models = {}
+
+    def create_model(name, system_instruction=None):
+        mock_instance = AsyncMock()
+        mock_response = MagicMock()
+        mock_response.text = DUMMY_ANALYSIS_RESULT
+        mock_instance.generate_content_async.return_value = mock_response
+        if system_instruction is not None:
+            models[name] = mock_instance
+        return mock_instance
+
+    with patch(
+        "app.services.analysis_service.genai.GenerativeModel", side_effect=create_model
+    ):
+        service = AnalysisService()
+
+    await service.analyze_transcript(DUMMY_TRANSCRIPT)
+    models["light-model"].generate_content_async.assert_called_once()
+    models["long-model"].generate_content_async.assert_not_called()
+
+    await service.analyze_transcript(LONG_TRANSCRIPT)
+    models["long-model"].generate_content_async.assert_called_once()
+    config = models["long-model"].generate_content_async.call_args.kwargs[
+        "generation_config"
+    ]
+    assert config.temperature == 0.5
+
+
+@pytest.mark.asyncio
+async def test_analyze_transcript_chunks_beyond_largest_tier(
+    mock_gemini_model, setup_gemini_env, monkeypatch
+):
+    """
+    分割分析のしきい値が未設定の場合は、最大のモデルの上限を超える字幕のみ分割されること
+    """
+    monkeypatch.setattr("app.services.analysis_service.ANALYSIS_CHUNK_THRESHOLD", 0)
+    monkeypatch.setattr("app.services.analysis_service.ANALYSIS_CHUNK_TOKENS", 1000)
+    monkeypatch.setattr(
+        "app.services.analysis_service.MODEL_TIERS", [("test-model", 1000, 0.8)]
+    )
+    service = AnalysisService()
+    limit = service._prompt_overhead() + 2500
+    service.tiers[-1].max_input_tokens = limit
+
+    await service.analyze_transcript(LONG_TRANSCRIPT)
+    mock_gemini_model.generate_content_async.assert_called_once()
+
+    service.tiers[-1].max_input_tokens = limit - 1000
+    await service.analyze_transcript(LONG_TRANSCRIPT, bypass_cache=True)
+    # 2チャンクの要約と統合
+    assert mock_gemini_model.generate_content_async.call_count == 1 + 3
+
+
+@pytest.mark.asyncio
+async def test_analyze_transcript_too_large(mock_gemini_model, setup_gemini_env, monkeypatch):
+    """
+    どのモデルでも処理できない長さの字幕は、APIを呼ばずに拒否されること
+    """
+    monkeypatch.setattr(
+        "app.services.analysis_service.MODEL_TIERS", [("test-model", 1000, 0.8)]
+    )
+    service = AnalysisService()
+
+    with pytest.raises(APIException) as exc_info:
+        await service.analyze_transcript(LONG_TRANSCRIPT)
+
+    assert exc_info.value.status_code == 413
+    assert exc_info.value.error_code == "E011"
+    mock_gemini_model.generate_content_async.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_analyze_transcript_compresses_prompt(mock_gemini_model, setup_gemini_env):
+    """
+    フィラーや重複を取り除いた字幕がプロンプトに使われること
+    """
+    service = AnalysisService()
+
+    await service.analyze_transcript("[音楽] えーと テスト用の えー 字幕です 字幕です 字幕です")
+
+    prompt = mock_gemini_model.generate_content_async.call_args.args[0]
+    assert "テスト用の 字幕です" in prompt
+    assert "えーと" not in prompt
+    assert "[音楽]" not in prompt
+
+
+@pytest.mark.asyncio
+async def test_analyze_transcript_static_prefix(mock_gemini_model, setup_gemini_env):
+    """
+    共通の指示はシステム指示、回答形式はレスポンススキーマで指定し、
+    リクエストごとのプロンプトには字幕のみを含めること
+    """
+    with patch("app.services.analysis_service.genai.GenerativeModel") as mock_model:
+        mock_model.return_value = mock_gemini_model
+        service = AnalysisService()
+
+    assert any(
+        call.kwargs.get("system_instruction") == SYSTEM_INSTRUCTION
+        for call in mock_model.call_args_list
+    )
+
+    await service.analyze_transcript(DUMMY_TRANSCRIPT)
+
+    call = mock_gemini_model.generate_content_async.call_args
+    assert call.args[0] == f"字幕テキスト:\n{DUMMY_TRANSCRIPT}"
+    assert call.kwargs["generation_config"].response_schema is AnalysisResult
+
+
+@pytest.mark.asyncio
+async def test_analyze_transcript_with_predicted_tags(mock_gemini_model, setup_gemini_env):
+    """
+    信頼度の高いタグが推定済みの場合は、要約とタイトルのみを生成すること
+    """
+    mock_response = MagicMock()
+    mock_response.text = json.dumps({"summary": "要約", "suggested_titles": "タイトル"})
+    mock_gemini_model.generate_content_async.return_value = mock_response
+    tags = TagPrediction(categories=["科学"], emotions="啓発", confidence=0.9, confident=True)
+
+    service = AnalysisService()
+    result = await service.analyze_transcript(DUMMY_TRANSCRIPT, tags=tags)
+
+    assert result == AnalysisResult(
+        summary="要約", suggested_titles="タイトル", categories=["科学"], emotions="啓発"
+    )
+    schema = mock_gemini_model.generate_content_async.call_args.kwargs[
+        "generation_config"
+    ].response_schema
+    assert set(schema.model_fields) == {"summary", "suggested_titles"}
+
+    # 信頼度が低い場合はすべての項目を生成する（推定結果は別のキャッシュキーとなる）
+    mock_response.text = DUMMY_ANALYSIS_RESULT
+    uncertain = tags.model_copy(update={"confident": False})
+    result = await service.analyze_transcript(DUMMY_TRANSCRIPT, tags=uncertain)
+
+    assert result.emotions == json.loads(DUMMY_ANALYSIS_RESULT)["emotions"]
+    assert mock_gemini_model.generate_content_async.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_analyze_transcript_records_usage(mock_gemini_model, setup_gemini_env):
+    """
+    レスポンスのトークン数がモデルの階層ごとに記録されること
+    """
+    mock_response = MagicMock()
+    mock_response.text = DUMMY_ANALYSIS_RESULT
+    mock_response.usage_metadata = MagicMock(
+        prompt_token_count=120, cached_content_token_count=100, candidates_token_count=300
+    )
+    mock_gemini_model.generate_content_async.return_value = mock_response
+    service = AnalysisService()
+    prefix = f"analysis.tier.{service.tiers[0].name}"
+    metrics.reset()
+
+    await service.analyze_transcript(DUMMY_TRANSCRIPT)
+
+    observations = metrics.snapshot()["observations"]
+    assert observations[f"{prefix}.prompt_tokens"]["sum"] == 120
+    assert observations[f"{prefix}.cached_tokens"]["sum"] == 100
+    assert observations[f"{prefix}.output_tokens"]["sum"] == 300
+    assert observations[f"{prefix}.latency_seconds"]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_analyze_transcript_records_usage_ledger(mock_gemini_model, setup_gemini_env):
+    """
+    利用量が台帳とスコープに記録されること
+    """
+    mock_response = MagicMock()
+    mock_response.text = DUMMY_ANALYSIS_RESULT
+    mock_response.usage_metadata = MagicMock(
+        prompt_token_count=1000, cached_content_token_count=0, candidates_token_count=500
+    )
+    mock_gemini_model.generate_content_async.return_value = mock_response
+    service = AnalysisService()
+    service.usage.prices = {service.tiers[0].name: (1.0, 2.0)}
+
+    with usage_scope() as usage:
+        await service.analyze_transcript(DUMMY_TRANSCRIPT)
+
+    assert len(usage) == 1
+    assert usage[0].model == service.tiers[0].name
+    assert usage[0].operation == "analyze"
+    assert usage[0].prompt_tokens == 1000
+    assert usage[0].output_tokens == 500
+    assert usage[0].cost_usd == pytest.approx(0.002)
+    rollups = await service.usage.rollup()
+    assert [(r.model, r.requests) for r in rollups] == [(service.tiers[0].name, 1)]
+
+
+@pytest.mark.asyncio
+async def test_analyze_transcript_budget_exceeded(mock_gemini_model, setup_gemini_env):
+    """
+    ソフト予算の超過で一括分析のみ、ハード予算の超過ですべての分析を拒否すること
+    """
+    service = AnalysisService()
+    service.usage.soft_budget = 1.0
+    service.usage.hard_budget = 2.0
+    service.usage._today_cost = 1.5
+
+    with pytest.raises(APIException) as exc_info:
+        await service.analyze_transcript(DUMMY_TRANSCRIPT, priority="bulk")
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.error_code == "E013"
+    mock_gemini_model.generate_content_async.assert_not_called()
+
+    await service.analyze_transcript(DUMMY_TRANSCRIPT)
+    mock_gemini_model.generate_content_async.assert_called_once()
+
+    service.usage._today_cost = 2.0
+    with pytest.raises(APIException) as exc_info:
+        await service.analyze_transcript(DUMMY_TRANSCRIPT, bypass_cache=True)
+    assert exc_info.value.error_code == "E013"
+
+
+@pytest.mark.asyncio
+async def test_regenerate_field(mock_gemini_model, setup_gemini_env):
+    """
+    要約のみを送信し、指定した項目だけを置き換えること
+    """
+    mock_response = MagicMock()
+    mock_response.text = json.dumps({"suggested_titles": "新しいタイトル"})
+    mock_gemini_model.generate_content_async.return_value = mock_response
+    existing = AnalysisResult.model_validate_json(DUMMY_ANALYSIS_RESULT)
+
+    service = AnalysisService()
+    result = await service.regenerate_field(existing, "suggested_titles")
+
+    assert result.suggested_titles == "新しいタイトル"
+    assert result.summary == existing.summary
+    assert result.categories == existing.categories
+    assert result.emotions == existing.emotions
+
+    args, kwargs = mock_gemini_model.generate_content_async.call_args
+    assert existing.summary in args[0]
+    assert "テストタイトル" in args[0]
+    assert kwargs["generation_config"].response_schema.model_fields.keys() == {
+        "suggested_titles"
+    }
+
+
+@pytest.mark.asyncio
+async def test_regenerate_field_invalid_json(mock_gemini_model, setup_gemini_env):
+    """
+    再生成の応答が不正な場合は E008 とすること
+    """
+    mock_response = MagicMock()
+    mock_response.text = json.dumps({"summary": "対象外の項目"})
+    mock_gemini_model.generate_content_async.return_value = mock_response
+    existing = AnalysisResult.model_validate_json(DUMMY_ANALYSIS_RESULT)
+
+    service = AnalysisService()
+
+    with pytest.raises(APIException) as exc_info:
+        await service.regenerate_field(existing, "categories")
+
+    assert exc_info.value.status_code == 502
+    assert exc_info.value.error_code == "E008"
+
+
 def test_initialization_no_api_key(monkeypatch):
     """
     APIキーが設定されていない場合
@@ -91,6 +483,29 @@ async def test_analyze_transcript_api_error(mock_gemini_model, setup_gemini_env)
     assert error_message in exc_info.value.message
 
 
+@pytest.mark.asyncio
+async def test_analyze_transcript_rate_limited(mock_gemini_model, setup_gemini_env):
+    """
+    Gemini APIのレート制限が続く場合は、再試行の後に E004 とすること
+    """
+    mock_gemini_model.generate_content_async.side_effect = ResourceExhausted(
+        "Quota exceeded"
+    )
+
+    service = AnalysisService()
+    service.client.backoff_base = 0.001
+
+    with pytest.raises(APIException) as exc_info:
+        await service.analyze_transcript(DUMMY_TRANSCRIPT)
+
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.error_code == "E004"
+    assert (
+        mock_gemini_model.generate_content_async.call_count
+        == service.client.max_retries + 1
+    )
+
+
 @pytest.mark.asyncio
 async def test_analyze_transcript_invalid_json(mock_gemini_model, setup_gemini_env):
     """
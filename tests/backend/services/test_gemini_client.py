@@ -0,0 +1,176 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from app.services.gemini_client import GeminiClient, configure_gemini
+from app.core.exceptions import APIException
+from app.core.metrics import metrics
+
+
+def test_configure_gemini_with_endpoint():
+    """
+    接続先を指定した場合は、非同期のgRPCでその接続先に送信するよう設定すること
+    """
+    with patch("app.services.gemini_client.genai.configure") as configure:
+        configure_gemini("test-key", "127.0.0.1:50051")
+
+    configure.assert_called_once_with(
+        api_key="test-key",
+        transport="grpc_asyncio",
+        client_options={"api_endpoint": "127.0.0.1:50051"},
+    )
+
+
+def test_configure_gemini_default_endpoint():
+    """
+    接続先を指定しない場合は、APIキーのみを設定すること
+    """
+    with patch("app.services.gemini_client.genai.configure") as configure:
+        configure_gemini("test-key", "")
+
+    configure.assert_called_once_with(api_key="test-key")
+
+
+@pytest.mark.asyncio
+async def test_generate_limits_concurrency():
+    """
+    同時実行数が上限を超えないこと
+    """
+    client = GeminiClient(max_concurrency=2, max_queue=10)
+    active = 0
+    peak = 0
+
+    async def generate_content_async(prompt, generation_config):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+        return prompt
+
+    model = MagicMock()
+    model.generate_content_async = generate_content_async
+
+    results = await asyncio.gather(
+        *[client.generate(model, f"prompt{i}", None) for i in range(6)]
+    )
+
+    assert results == [f"prompt{i}" for i in range(6)]
+    assert peak == 2
+    assert client.in_flight == 0
+    assert client.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_generate_rejects_when_queue_is_full():
+    """
+    待機数が上限を超えた場合はAPIを呼ばずに拒否すること
+    """
+    client = GeminiClient(max_concurrency=1, max_queue=1)
+    release = asyncio.Event()
+
+    async def generate_content_async(prompt, generation_config):
+        await release.wait()
+        return prompt
+
+    model = MagicMock()
+    model.generate_content_async = generate_content_async
+
+    running = asyncio.create_task(client.generate(model, "running", None))
+    waiting = asyncio.create_task(client.generate(model, "waiting", None))
+    await asyncio.sleep(0)
+
+    with pytest.raises(APIException) as exc_info:
+        await client.generate(model, "rejected", None)
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.error_code == "E004"
+
+    release.set()
+    assert await asyncio.gather(running, waiting) == ["running", "waiting"]
+
+
+@pytest.mark.asyncio
+async def test_generate_retries_with_retry_after():
+    """
+    レート制限時は指定された待機時間以上待って再試行すること
+    """
+    client = GeminiClient(max_retries=3, backoff_base=0.1, backoff_max=60)
+    model = MagicMock()
+    model.generate_content_async = AsyncMock(
+        side_effect=[
+            google_exceptions.ResourceExhausted("Quota exceeded. Please retry in 12.5s."),
+            google_exceptions.ServiceUnavailable("Unavailable"),
+            "response",
+        ]
+    )
+    retries = metrics.get_counter("gemini.retries")
+
+    with patch("app.services.gemini_client.asyncio.sleep", new=AsyncMock()) as mock_sleep:
+        result = await client.generate(model, "prompt", None)
+
+    assert result == "response"
+    delays = [call.args[0] for call in mock_sleep.call_args_list]
+    assert delays[0] == 12.5
+    assert 0 <= delays[1] <= 0.2
+    assert metrics.get_counter("gemini.retries") == retries + 2
+
+
+@pytest.mark.asyncio
+async def test_generate_rate_limited_after_retries():
+    """
+    再試行してもレート制限が続く場合は E004 とすること
+    """
+    client = GeminiClient(max_retries=2, backoff_base=0.001)
+    model = MagicMock()
+    model.generate_content_async = AsyncMock(
+        side_effect=google_exceptions.ResourceExhausted("Quota exceeded")
+    )
+
+    with pytest.raises(APIException) as exc_info:
+        await client.generate(model, "prompt", None)
+
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.error_code == "E004"
+    assert model.generate_content_async.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_generate_does_not_retry_other_errors():
+    """
+    再試行で回復しないエラーはそのまま送出すること
+    """
+    client = GeminiClient(max_retries=3)
+    model = MagicMock()
+    model.generate_content_async = AsyncMock(
+        side_effect=google_exceptions.InvalidArgument("Bad request")
+    )
+
+    with pytest.raises(google_exceptions.InvalidArgument):
+        await client.generate(model, "prompt", None)
+
+    model.generate_content_async.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_stream_retries_before_first_chunk():
+    """
+    ストリーミングはレスポンス受信前のエラーのみ再試行すること
+    """
+    client = GeminiClient(max_retries=3, backoff_base=0.001)
+
+    async def chunks():
+        yield "a"
+        yield "b"
+
+    model = MagicMock()
+    model.generate_content_async = AsyncMock(
+        side_effect=[google_exceptions.ServiceUnavailable("Unavailable"), chunks()]
+    )
+
+    result = [chunk async for chunk in client.stream(model, "prompt", None)]
+
+    assert result == ["a", "b"]
+    assert model.generate_content_async.call_count == 2
+    assert model.generate_content_async.call_args.kwargs["stream"] is True
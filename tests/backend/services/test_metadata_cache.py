@@ -0,0 +1,107 @@
+import pytest
+import time
+from datetime import date
+from pydantic import HttpUrl
+
+from app.services.metadata_cache import MetadataCache
+from app.models.schemas import VideoMetadata
+from app.core.metrics import metrics
+
+
+@pytest.fixture
+def dummy_video_metadata():
+    """
+    ダミーの動画メタデータ
+    """
+    return VideoMetadata(
+        video_id="dummy_video_id",
+        title="テスト用タイトル",
+        channel_name="テストチャンネル",
+        published_at=date(2023, 1, 1),
+        duration="PT10M30S",
+        duration_seconds=630,
+        view_count=1000,
+        url=HttpUrl("https://www.youtube.com/watch?v=dummy_video_id"),
+    )
+
+
+@pytest.fixture
+def setup_patched_cache_dir(tmp_path, monkeypatch):
+    """
+    CACHE_DIR のパスをテスト用にパッチする
+    """
+    monkeypatch.setattr("app.services.metadata_cache.CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_lookup_hit_and_miss(dummy_video_metadata):
+    """
+    保存済みのものはヒット、未保存のものはミスとなること
+    """
+    cache = MetadataCache(max_entries=10, ttl=60, volatile_ttl=60, persist=False)
+    hits = metrics.get_counter("youtube.metadata_cache.hit")
+    misses = metrics.get_counter("youtube.metadata_cache.miss")
+
+    await cache.put(dummy_video_metadata)
+    fresh, stale, missing = await cache.lookup(["dummy_video_id", "other_id"])
+
+    assert fresh == {"dummy_video_id": dummy_video_metadata}
+    assert stale == {}
+    assert missing == ["other_id"]
+    assert metrics.get_counter("youtube.metadata_cache.hit") == hits + 1
+    assert metrics.get_counter("youtube.metadata_cache.miss") == misses + 1
+
+
+@pytest.mark.asyncio
+async def test_lookup_volatile_expired(dummy_video_metadata, monkeypatch):
+    """
+    再生回数の有効期限のみ切れた場合は stale となり、refresh で更新されること
+    """
+    cache = MetadataCache(max_entries=10, ttl=3600, volatile_ttl=10, persist=False)
+    await cache.put(dummy_video_metadata)
+
+    now = time.time()
+    monkeypatch.setattr("app.services.metadata_cache.time.time", lambda: now + 60)
+
+    fresh, stale, missing = await cache.lookup(["dummy_video_id"])
+    assert fresh == {}
+    assert list(stale) == ["dummy_video_id"]
+    assert missing == []
+
+    refreshed = await cache.refresh("dummy_video_id", 2000)
+    assert refreshed.view_count == 2000
+    assert refreshed.title == dummy_video_metadata.title
+
+    fresh, stale, missing = await cache.lookup(["dummy_video_id"])
+    assert fresh["dummy_video_id"].view_count == 2000
+
+
+@pytest.mark.asyncio
+async def test_lookup_stable_expired(dummy_video_metadata, monkeypatch):
+    """
+    全体の有効期限が切れた場合はミスとなること
+    """
+    cache = MetadataCache(max_entries=10, ttl=10, volatile_ttl=10, persist=False)
+    await cache.put(dummy_video_metadata)
+
+    now = time.time()
+    monkeypatch.setattr("app.services.metadata_cache.time.time", lambda: now + 60)
+
+    _, _, missing = await cache.lookup(["dummy_video_id"])
+    assert missing == ["dummy_video_id"]
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restart(dummy_video_metadata, setup_patched_cache_dir):
+    """
+    ディスクに保存したエントリが別インスタンスから読み出せること
+    """
+    cache = MetadataCache(max_entries=10, ttl=60, volatile_ttl=60, persist=True)
+    await cache.put(dummy_video_metadata)
+
+    restarted = MetadataCache(max_entries=10, ttl=60, volatile_ttl=60, persist=True)
+    fresh, _, missing = await restarted.lookup(["dummy_video_id"])
+
+    assert fresh == {"dummy_video_id": dummy_video_metadata}
+    assert missing == []
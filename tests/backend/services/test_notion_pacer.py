@@ -0,0 +1,111 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+
+from app.services.notion_pacer import NotionPacer
+from app.core.exceptions import APIException
+from app.core.metrics import metrics
+
+
+class RateLimitedError(Exception):
+    """Notionクライアントのレート制限エラー（APIResponseError相当）"""
+
+    def __init__(self, retry_after=None):
+        super().__init__("Rate limited")
+        self.status = 429
+        self.headers = httpx.Headers(
+            {"Retry-After": str(retry_after)} if retry_after is not None else {}
+        )
+
+
+@pytest.mark.asyncio
+async def test_call_paces_requests():
+    """
+    バースト分を超えた呼び出しはレートに合わせて待機すること
+    """
+    pacer = NotionPacer(rate=20, burst=2)
+    func = AsyncMock(return_value={"url": "https://www.notion.so/page"})
+
+    start = time.monotonic()
+    results = await asyncio.gather(*[pacer.call(func, title=f"t{i}") for i in range(6)])
+    elapsed = time.monotonic() - start
+
+    assert results == [{"url": "https://www.notion.so/page"}] * 6
+    assert func.await_count == 6
+    # 6件中、バースト2件を除く4件は 1/20 秒間隔で送信される
+    assert 0.15 <= elapsed < 1.0
+    assert pacer.queued == 0
+    assert pacer.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_call_retries_with_retry_after():
+    """
+    レート制限を受けた場合は Retry-After の間待機してから再試行すること
+    """
+    metrics.reset()
+    pacer = NotionPacer(rate=100, burst=5, backoff_base=0.001)
+    func = AsyncMock(side_effect=[RateLimitedError(retry_after=0.1), {"url": "ok"}])
+
+    start = time.monotonic()
+    result = await pacer.call(func, title="t")
+    elapsed = time.monotonic() - start
+
+    assert result == {"url": "ok"}
+    assert func.await_count == 2
+    assert elapsed >= 0.08
+    assert metrics.snapshot()["counters"]["notion.retries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_call_rate_limited_after_retries():
+    """
+    再試行回数を超えてレート制限を受けた場合は429（E004）を返すこと
+    """
+    pacer = NotionPacer(rate=100, burst=5, max_retries=2, backoff_base=0.001)
+    func = AsyncMock(side_effect=RateLimitedError())
+
+    with pytest.raises(APIException) as exc_info:
+        await pacer.call(func, title="t")
+
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.error_code == "E004"
+    assert func.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_call_does_not_retry_other_errors():
+    """
+    レート制限以外のエラーは再試行せずに送出すること
+    """
+    pacer = NotionPacer(rate=100, burst=5)
+    func = AsyncMock(side_effect=ValueError("validation error"))
+
+    with pytest.raises(ValueError):
+        await pacer.call(func, title="t")
+
+    assert func.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_call_rejects_when_queue_is_full():
+    """
+    待機数が上限を超えた場合はAPIを呼ばずに拒否すること
+    """
+    pacer = NotionPacer(rate=10, burst=1, max_queue=1)
+    func = AsyncMock(return_value={})
+
+    await pacer.call(func)
+    waiting = asyncio.create_task(pacer.call(func))
+    await asyncio.sleep(0)
+
+    with pytest.raises(APIException) as exc_info:
+        await pacer.call(func)
+
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.error_code == "E004"
+    await waiting
+    assert func.await_count == 2
@@ -182,3 +182,96 @@ async def test_register_page_failure(
         "An error occurred while communicating with the notion service"
         in exc_info.value.message
     )
+
+
+@pytest.mark.asyncio
+async def test_register_page_rate_limited(
+    dummy_video_metadata,
+    mock_notion_client,
+    setup_notion_env,
+    dummy_register_modifications,
+):
+    """
+    レート制限の再試行を超えた場合は E008 ではなく429（E004）を返すこと
+    """
+    rate_limited = Exception("Rate limited")
+    rate_limited.status = 429
+    rate_limited.headers = {}
+    mock_notion_client.pages.create.side_effect = rate_limited
+
+    service = NotionService()
+    service.pacer.max_retries = 0
+
+    with pytest.raises(APIException) as exc_info:
+        await service.register_page(dummy_register_modifications, dummy_video_metadata)
+
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.error_code == "E004"
+
+
+@pytest.mark.asyncio
+async def test_register_page_with_session_property(
+    dummy_video_metadata,
+    mock_notion_client,
+    setup_notion_env,
+    dummy_register_modifications,
+    monkeypatch,
+):
+    """
+    セッションIDのプロパティが設定されている場合は、ページにセッションIDを記録すること
+    """
+    monkeypatch.setattr("app.services.notion_service.NOTION_SESSION_PROPERTY", "セッションID")
+    service = NotionService()
+
+    await service.register_page(
+        dummy_register_modifications, dummy_video_metadata, "dummy_session_id"
+    )
+
+    properties = mock_notion_client.pages.create.call_args.kwargs["properties"]
+    assert properties["セッションID"]["rich_text"][0]["text"]["content"] == "dummy_session_id"
+
+
+@pytest.mark.asyncio
+async def test_find_page(mock_notion_client, setup_notion_env, monkeypatch):
+    """
+    セッションIDでデータベースを検索し、一致するページのURLを返すこと
+    """
+    monkeypatch.setattr("app.services.notion_service.NOTION_SESSION_PROPERTY", "セッションID")
+    mock_notion_client.request.side_effect = [
+        {"results": [{"url": "https://www.notion.so/existing_page"}]},
+        {"results": []},
+    ]
+    service = NotionService()
+
+    video_url = "https://www.youtube.com/watch?v=dummy_video_id"
+    assert await service.find_page("dummy_session_id", video_url) == (
+        "https://www.notion.so/existing_page"
+    )
+    assert await service.find_page("other_session_id", video_url) is None
+
+    call_args = mock_notion_client.request.call_args
+    assert call_args.kwargs["path"] == "databases/dummy_database_id/query"
+    assert call_args.kwargs["body"]["filter"] == {
+        "property": "セッションID",
+        "rich_text": {"equals": "other_session_id"},
+    }
+
+
+@pytest.mark.asyncio
+async def test_find_page_without_session_property(mock_notion_client, setup_notion_env):
+    """
+    セッションIDのプロパティが未設定の場合は動画URLで検索すること
+    """
+    mock_notion_client.request.return_value = {
+        "results": [{"url": "https://www.notion.so/existing_page"}]
+    }
+    service = NotionService()
+    video_url = "https://www.youtube.com/watch?v=dummy_video_id"
+
+    assert await service.find_page("dummy_session_id", video_url) == (
+        "https://www.notion.so/existing_page"
+    )
+    assert mock_notion_client.request.call_args.kwargs["body"]["filter"] == {
+        "property": "動画URL",
+        "url": {"equals": video_url},
+    }
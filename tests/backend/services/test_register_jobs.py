@@ -0,0 +1,232 @@
+import asyncio
+from datetime import datetime, date, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pydantic import HttpUrl
+
+from app.models import schemas
+from app.services.register_jobs import RegisterJobs
+from app.core.exceptions import APIException
+
+dummy_modifications = schemas.RegisterModifications(
+    title="修正後のタイトル",
+    summary="修正後の要約データ",
+    categories=["教育"],
+    emotions="考察",
+)
+
+
+def _session(session_id: str, **update) -> schemas.SessionInfo:
+    session_info = schemas.SessionInfo(
+        session_id=session_id,
+        timestamp=datetime.now(),
+        expires_at=datetime.now() + timedelta(hours=1),
+        video_data=schemas.VideoMetadata(
+            video_id=session_id,
+            title="Dummy Video Title",
+            channel_name="Dummy Channel",
+            published_at=date(2023, 1, 1),
+            duration="PT10M",
+            duration_seconds=600,
+            view_count=1000,
+            url=HttpUrl(f"https://www.youtube.com/watch?v={session_id}"),
+        ),
+        transcript=f"{session_id}の字幕データ",
+        transcript_language="ja",
+        status="analyzed",
+        created_by="test_system",
+    )
+    return session_info.model_copy(update=update)
+
+
+@pytest.fixture
+def services():
+    """
+    セッション・Notionサービス・タグ推定のモック
+    """
+    sessions = {}
+    session_service = MagicMock()
+    session_service.load_session = AsyncMock(
+        side_effect=lambda session_id: sessions[session_id].model_copy()
+    )
+
+    async def save_session(session_info):
+        sessions[session_info.session_id] = session_info.model_copy()
+
+    session_service.save_session = AsyncMock(side_effect=save_session)
+
+    notion_service = MagicMock()
+
+    async def register_page(modifications, video_data, session_id=None):
+        await asyncio.sleep(0.02)
+        return f"https://www.notion.so/{video_data.video_id}"
+
+    notion_service.register_page = AsyncMock(side_effect=register_page)
+    notion_service.find_page = AsyncMock(return_value=None)
+
+    tag_classifier = MagicMock()
+    tag_classifier.learn = AsyncMock(return_value=None)
+    jobs = RegisterJobs(notion_service, session_service, tag_classifier)
+    return sessions, jobs
+
+
+@pytest.mark.asyncio
+async def test_submit_registers_and_saves(services):
+    """
+    登録したページのURLがセッションに保存されること
+    """
+    sessions, jobs = services
+    sessions["s1"] = _session("s1")
+
+    session_info = await jobs.submit("s1", dummy_modifications)
+
+    assert session_info.notion_url == "https://www.notion.so/s1"
+    jobs.notion_service.register_page.assert_called_once_with(
+        dummy_modifications, sessions["s1"].video_data, "s1"
+    )
+    assert sessions["s1"].status == "registered"
+    assert sessions["s1"].notion_url == "https://www.notion.so/s1"
+    assert sessions["s1"].modifications == dummy_modifications
+    # 中断されていない場合はNotionを検索しない
+    jobs.notion_service.find_page.assert_not_called()
+    jobs.tag_classifier.learn.assert_called_once_with(
+        "s1の字幕データ", dummy_modifications, None
+    )
+    assert len(jobs) == 0
+
+
+@pytest.mark.asyncio
+async def test_submit_records_modifications_before_register(services):
+    """
+    Notionへの登録前に登録内容をセッションに記録すること
+    """
+    sessions, jobs = services
+    sessions["s1"] = _session("s1")
+    jobs.notion_service.register_page.side_effect = APIException(
+        status_code=502, message="Notion error", error_code="E008"
+    )
+
+    with pytest.raises(APIException):
+        await jobs.submit("s1", dummy_modifications)
+
+    assert sessions["s1"].status == "analyzed"
+    assert sessions["s1"].modifications == dummy_modifications
+    assert len(jobs) == 0
+
+
+@pytest.mark.asyncio
+async def test_submit_skips_registered_session(services):
+    """
+    登録済みのセッションは再登録しないこと
+    """
+    sessions, jobs = services
+    sessions["s1"] = _session(
+        "s1",
+        status="registered",
+        modifications=dummy_modifications,
+        notion_url="https://www.notion.so/existing",
+    )
+
+    session_info = await jobs.submit("s1", dummy_modifications)
+
+    assert session_info.notion_url == "https://www.notion.so/existing"
+    jobs.notion_service.register_page.assert_not_called()
+    jobs.notion_service.find_page.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_submit_recovers_interrupted_register(services):
+    """
+    中断された登録は、作成済みのページを検索して再作成しないこと
+    """
+    sessions, jobs = services
+    sessions["s1"] = _session("s1", modifications=dummy_modifications)
+    jobs.notion_service.find_page.return_value = "https://www.notion.so/created"
+
+    session_info = await jobs.submit("s1", dummy_modifications)
+
+    assert session_info.notion_url == "https://www.notion.so/created"
+    assert sessions["s1"].status == "registered"
+    jobs.notion_service.find_page.assert_called_once_with(
+        "s1", "https://www.youtube.com/watch?v=s1"
+    )
+    jobs.notion_service.register_page.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_submit_recovers_crash_after_create(services):
+    """
+    ページ作成後、URLの保存前に中断された登録は、再試行時に作成済みのページを使うこと
+    """
+    sessions, jobs = services
+    sessions["s1"] = _session("s1")
+    created = {}
+
+    async def register_page(modifications, video_data, session_id=None):
+        created[str(video_data.url)] = f"https://www.notion.so/{video_data.video_id}"
+        return created[str(video_data.url)]
+
+    async def find_page(session_id, video_url):
+        return created.get(video_url)
+
+    jobs.notion_service.register_page.side_effect = register_page
+    jobs.notion_service.find_page.side_effect = find_page
+    save_session = jobs.session_service.save_session.side_effect
+
+    async def save_session_failing_after_create(session_info):
+        if created:
+            raise OSError("disk full")
+        await save_session(session_info)
+
+    jobs.session_service.save_session.side_effect = save_session_failing_after_create
+    with pytest.raises(OSError):
+        await jobs.submit("s1", dummy_modifications)
+    assert sessions["s1"].notion_url is None
+
+    jobs.session_service.save_session.side_effect = save_session
+    session_info = await jobs.submit("s1", dummy_modifications)
+
+    assert session_info.notion_url == "https://www.notion.so/s1"
+    assert sessions["s1"].status == "registered"
+    assert jobs.notion_service.register_page.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_submit_saves_url_before_completion(services):
+    """
+    ページ作成直後にURLを保存し、完了前に中断されても再作成しないこと
+    """
+    sessions, jobs = services
+    sessions["s1"] = _session("s1")
+    jobs.tag_classifier.learn.side_effect = RuntimeError("interrupted")
+
+    with pytest.raises(RuntimeError):
+        await jobs.submit("s1", dummy_modifications)
+
+    assert sessions["s1"].notion_url == "https://www.notion.so/s1"
+    assert sessions["s1"].status == "analyzed"
+
+    jobs.tag_classifier.learn.side_effect = None
+    session_info = await jobs.submit("s1", dummy_modifications)
+
+    assert session_info.status == "registered"
+    assert session_info.notion_url == "https://www.notion.so/s1"
+    assert jobs.notion_service.register_page.call_count == 1
+    jobs.notion_service.find_page.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_submit_returns_running_task(services):
+    """
+    実行中のセッションは同じタスクを返し、重複して登録しないこと
+    """
+    sessions, jobs = services
+    sessions["s1"] = _session("s1")
+
+    first = jobs.submit("s1", dummy_modifications)
+    second = jobs.submit("s1", dummy_modifications)
+    await asyncio.gather(first, second)
+
+    assert first is second
+    assert jobs.notion_service.register_page.call_count == 1
@@ -1,3 +1,5 @@
+import os
+
 import pytest
 from datetime import datetime
 
@@ -138,3 +140,27 @@ async def test_save_session_failure(
     # ファイルが作成されていないことを検証
     file_path = test_data_dir / f"{TEST_SESSION_ID}.json"
     assert not file_path.exists()
+
+
+@pytest.mark.asyncio
+async def test_save_session_replaces_atomically(
+    session_service, valid_session_data, setup_patched_data_dir, monkeypatch
+):
+    """
+    書き込みに失敗した場合も、保存済みのセッションファイルが壊れないこと
+    """
+    await session_service.save_session(valid_session_data)
+
+    def fail_replace(src, dst):
+        raise OSError("disk full")
+
+    updated = valid_session_data.model_copy(update={"status": "analyzed"})
+    with monkeypatch.context() as m:
+        m.setattr("app.services.session_service.os.replace", fail_replace)
+        with pytest.raises(APIException) as exc_info:
+            await session_service.save_session(updated)
+
+    assert exc_info.value.error_code == "E007"
+    loaded = await session_service.load_session(TEST_SESSION_ID)
+    assert loaded.status == "collected"
+    assert os.listdir(setup_patched_data_dir) == [f"{TEST_SESSION_ID}.json"]
@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from app.services.summary_extractor import SummaryExtractor
+
+SUMMARY = '## 見出し\n"引用" \\ 😀 end'
+DOCUMENT = json.dumps({"summary": SUMMARY, "suggested_titles": "タイトル"})
+
+
+@pytest.mark.parametrize("step", [1, 2, 5, len(DOCUMENT)])
+def test_feed_extracts_summary(step):
+    """
+    チャンクの区切り位置に関わらず、summary の値が復号されて取り出されること
+    """
+    extractor = SummaryExtractor()
+
+    output = "".join(
+        extractor.feed(DOCUMENT[i : i + step]) for i in range(0, len(DOCUMENT), step)
+    )
+
+    assert output == SUMMARY
+    assert extractor.done
+
+
+def test_feed_waits_for_summary_key():
+    """
+    summary のキーが現れるまでは何も返さないこと
+    """
+    extractor = SummaryExtractor()
+
+    assert extractor.feed('{"suggested_titles": "タイトル", "sum') == ""
+    assert extractor.feed('mary": "要') == "要"
+    assert extractor.feed('約"}') == "約"
+    assert extractor.feed('ignored"') == ""
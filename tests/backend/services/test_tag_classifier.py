@@ -0,0 +1,144 @@
+from datetime import datetime, date, timedelta
+
+import pytest
+from pydantic import HttpUrl
+
+from app.models import schemas
+from app.services.tag_classifier import TagClassifier
+
+# タグごとに特徴的な語彙
+TOPICS = {
+    ("音楽", "感動"): "ギター ライブ 演奏 歌詞 メロディ バンド コンサート 新曲",
+    ("ゲーム", "愉快"): "ボス 攻略 レベル コントローラー 実況 プレイ ステージ 装備",
+    ("科学", "啓発"): "実験 分子 仮説 観測 研究 宇宙 データ 論文",
+}
+
+
+def _session(session_id: str, transcript: str) -> schemas.SessionInfo:
+    return schemas.SessionInfo(
+        session_id=session_id,
+        timestamp=datetime.now(),
+        expires_at=datetime.now() + timedelta(hours=1),
+        video_data=schemas.VideoMetadata(
+            video_id="dummy_id",
+            title="Dummy Video Title",
+            channel_name="Dummy Channel",
+            published_at=date(2023, 1, 1),
+            duration="PT10M",
+            duration_seconds=600,
+            view_count=1000,
+            url=HttpUrl("https://www.youtube.com/watch?v=dummy_id"),
+            thumbnail_url=HttpUrl("https://img.youtube.com/vi/dummy_id/maxresdefault.jpg"),
+        ),
+        transcript=transcript,
+        transcript_language="ja",
+        status="collected",
+        created_by="test_system",
+    )
+
+
+def _document(words: str, seed: int) -> str:
+    vocabulary = words.split()
+    return " ".join(vocabulary[(seed + i) % len(vocabulary)] for i in range(40))
+
+
+def _train(classifier: TagClassifier, per_topic: int = 5) -> None:
+    for (category, emotion), words in TOPICS.items():
+        for seed in range(per_topic):
+            classifier.add(_document(words, seed), [category], emotion)
+
+
+def test_classify_predicts_tags():
+    """
+    学習した語彙に近い字幕のタグを推定すること
+    """
+    classifier = TagClassifier(min_samples=10, min_confidence=0.6)
+    _train(classifier)
+
+    prediction = classifier.classify(_document(TOPICS[("ゲーム", "愉快")], 7))
+
+    assert prediction.categories[0] == "ゲーム"
+    assert prediction.emotions == "愉快"
+    assert prediction.confident
+    assert 0.6 <= prediction.confidence <= 1.0
+
+
+def test_classify_uncertain():
+    """
+    どの語彙にも近くない字幕は信頼度が低くなること
+    """
+    classifier = TagClassifier(min_samples=10, min_confidence=0.9)
+    _train(classifier)
+
+    mixed = " ".join(_document(words, 0)[:20] for words in TOPICS.values())
+    prediction = classifier.classify(mixed)
+
+    assert prediction is not None
+    assert not prediction.confident
+
+
+def test_classify_requires_min_samples():
+    """
+    学習データが不足している場合は推定しないこと
+    """
+    classifier = TagClassifier(min_samples=100)
+    _train(classifier)
+
+    assert classifier.classify(_document(TOPICS[("音楽", "感動")], 0)) is None
+
+
+@pytest.mark.asyncio
+async def test_predict_loads_registered_sessions(monkeypatch, tmp_path):
+    """
+    保存済みの登録済みセッションから学習し、登録のたびに追加学習すること
+    """
+    monkeypatch.setattr("app.services.tag_classifier.DATA_DIR", str(tmp_path))
+    for index, ((category, emotion), words) in enumerate(TOPICS.items()):
+        for seed in range(2):
+            session_info = _session(f"s{index}-{seed}", _document(words, seed))
+            session_info.status = "registered"
+            session_info.modifications = schemas.RegisterModifications(
+                title="タイトル", summary="要約", categories=[category], emotions=emotion
+            )
+            (tmp_path / f"{session_info.session_id}.json").write_text(
+                session_info.model_dump_json(), encoding="utf-8"
+            )
+    # 未登録のセッション・不正なファイルは学習しない
+    (tmp_path / "collected.json").write_text(
+        _session("collected", "字幕").model_dump_json(), encoding="utf-8"
+    )
+    (tmp_path / "broken.json").write_text("{", encoding="utf-8")
+
+    classifier = TagClassifier(min_samples=7)
+    assert await classifier.predict(_document(TOPICS[("科学", "啓発")], 3)) is None
+    assert classifier.documents == 6
+
+    await classifier.learn(
+        _document(TOPICS[("科学", "啓発")], 5),
+        schemas.RegisterModifications(
+            title="タイトル", summary="要約", categories=["科学"], emotions="啓発"
+        ),
+    )
+    prediction = await classifier.predict(_document(TOPICS[("科学", "啓発")], 3))
+
+    assert classifier.documents == 7
+    assert prediction.categories[0] == "科学"
+    assert prediction.emotions == "啓発"
+
+
+@pytest.mark.asyncio
+async def test_predict_disabled():
+    """
+    無効の場合は推定・学習しないこと
+    """
+    classifier = TagClassifier(enabled=False, min_samples=0)
+
+    await classifier.learn(
+        "字幕",
+        schemas.RegisterModifications(
+            title="タイトル", summary="要約", categories=["科学"], emotions="啓発"
+        ),
+    )
+
+    assert await classifier.predict("字幕") is None
+    assert classifier.documents == 0
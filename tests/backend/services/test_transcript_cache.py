@@ -0,0 +1,55 @@
+import pytest
+
+from app.services.transcript_cache import TranscriptCache
+from app.models.schemas import Transcript
+
+
+@pytest.fixture
+def setup_patched_cache_dir(tmp_path, monkeypatch):
+    """
+    CACHE_DIR のパスをテスト用にパッチする
+    """
+    monkeypatch.setattr("app.services.transcript_cache.CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_get_in_language_order(setup_patched_cache_dir):
+    """
+    優先順に言語を検索し、最初に見つかった字幕を返すこと
+    """
+    cache = TranscriptCache(enabled=True, max_bytes=1024 * 1024)
+    await cache.put("video_id", Transcript(text="english transcript", language="en"))
+
+    language, transcript = await cache.get("video_id", ["ja", "en"])
+    assert (language, transcript.text) == ("en", "english transcript")
+
+    await cache.put("video_id", Transcript(text="日本語の字幕", language="ja"))
+    language, transcript = await cache.get("video_id", ["ja", "en"])
+    assert (language, transcript.text) == ("ja", "日本語の字幕")
+    assert await cache.get("other_id", ["ja", "en"]) is None
+
+
+@pytest.mark.asyncio
+async def test_stored_compressed(setup_patched_cache_dir):
+    """
+    圧縮して保存されること
+    """
+    cache = TranscriptCache(enabled=True, max_bytes=1024 * 1024)
+    text = "繰り返しの多い字幕テキスト。" * 500
+    await cache.put("video_id", Transcript(text=text, language="ja"))
+
+    stored = sum(path.stat().st_size for path in setup_patched_cache_dir.rglob("*") if path.is_file())
+    assert 0 < stored < len(text.encode("utf-8")) / 10
+
+
+@pytest.mark.asyncio
+async def test_disabled(setup_patched_cache_dir):
+    """
+    無効化されている場合は保存も検索もしないこと
+    """
+    cache = TranscriptCache(enabled=False)
+    await cache.put("video_id", Transcript(text="字幕", language="ja"))
+
+    assert await cache.get("video_id", ["ja"]) is None
+    assert list(setup_patched_cache_dir.iterdir()) == []
@@ -0,0 +1,36 @@
+from app.services.transcript_chunker import estimate_tokens, split_transcript
+
+
+def test_estimate_tokens():
+    """
+    日本語は1文字1トークン、ASCIIは4文字1トークンとして概算すること
+    """
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("テスト") == 3
+    assert estimate_tokens("abcdefgh") == 2
+    assert estimate_tokens("テストabc") == 4
+
+
+def test_split_transcript_respects_budget():
+    """
+    上限以内のチャンクに分割され、結合すると元のテキストに戻ること
+    """
+    text = " ".join(f"字幕{i:03d}" for i in range(100))
+
+    chunks = split_transcript(text, max_tokens=50)
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 50 for chunk in chunks)
+    assert " ".join(chunks) == text
+
+
+def test_split_transcript_long_piece():
+    """
+    区切りのない長いテキストは文字数で分割されること
+    """
+    text = "あ" * 120
+
+    chunks = split_transcript(text, max_tokens=50)
+
+    assert [len(chunk) for chunk in chunks] == [50, 50, 20]
+    assert "".join(chunks) == text
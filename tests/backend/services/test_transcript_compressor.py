@@ -0,0 +1,82 @@
+import pytest
+
+from app.services.transcript_compressor import compress_transcript
+
+TOPICS = [
+    "機械学習のモデルは大量のデータから特徴を学習します",
+    "学習したモデルの精度はテストデータで評価します",
+    "評価指標には正解率や再現率などがあります",
+    "今日の昼食は駅前の店で食べた濃厚な味噌ラーメンでした",
+    "データの前処理はモデルの精度に大きく影響します",
+    "過学習を防ぐために検証データを使ってモデルを選びます",
+]
+
+
+def test_compress_removes_fillers_and_repetition():
+    """
+    注記・フィラー・連続する繰り返しが取り除かれること
+    """
+    text = "[音楽] えーと 今日は えー 機械学習について 話します 話します 話します um so we uh start"
+
+    result = compress_transcript(text, ratio=1.0)
+
+    assert result.text == "今日は 機械学習について 話します so we start"
+    assert result.compressed_tokens < result.original_tokens
+    assert result.elapsed >= 0
+
+
+def test_compress_deduplicates_segments():
+    """
+    完全一致・ほぼ一致するセグメントが取り除かれること
+    """
+    text = "今日は機械学習について話します。今日は機械学習について話します！データの前処理が重要です。今日は機械学習について話しますね。"
+
+    result = compress_transcript(text, ratio=1.0)
+
+    assert result.text == "今日は機械学習について話します。 データの前処理が重要です。"
+
+
+@pytest.mark.parametrize("ratio", [0.3, 0.6])
+def test_compress_selects_salient_segments(ratio):
+    """
+    ratio が1未満の場合、目標比率以内で重要なセグメントが元の順序で抽出されること
+    """
+    text = "。".join(TOPICS) + "。"
+
+    result = compress_transcript(text, ratio=ratio)
+
+    assert 0 < result.compressed_tokens <= result.original_tokens * ratio
+    segments = result.text.split(" ")
+    assert segments == sorted(segments, key=text.index)
+    # 他の文と関連しない話題は選ばれにくい
+    assert "今日の昼食は駅前の店で食べた濃厚な味噌ラーメンでした。" not in segments
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "賞金は10000000円です",
+        "1000000 views",
+        "電話番号は090-1111-2222です",
+        "1,000,000,000円と0.000001秒",
+        "新しい(iPhone 15)を(2023年)に買いました",
+    ],
+)
+def test_compress_keeps_numbers_and_remarks(text):
+    """
+    数値や注記以外の括弧書きは変更されないこと
+    """
+    result = compress_transcript(text, ratio=1.0)
+
+    assert result.text == text
+
+
+def test_compress_removes_known_annotations():
+    """
+    既知の効果音・注記は括弧の種類によらず取り除かれること
+    """
+    text = "（拍手） 始めます 【BGM】 (笑) [Music] 以上です"
+
+    result = compress_transcript(text, ratio=1.0)
+
+    assert result.text == "始めます 以上です"
@@ -0,0 +1,69 @@
+import sys
+from array import array
+from datetime import datetime
+
+from youtube_transcript_api import FetchedTranscriptSnippet
+
+from app.services.transcript_segments import build_transcript
+from app.models.schemas import SessionInfo, VideoMetadata
+
+SNIPPETS = [
+    FetchedTranscriptSnippet(text="こんにちは", start=0.0, duration=1.5),
+    FetchedTranscriptSnippet(text="今日は", start=1.5, duration=2.0),
+    FetchedTranscriptSnippet(text="いい天気です", start=3.5, duration=2.25),
+]
+
+
+def _column(data: bytes) -> list[int]:
+    """リトルエンディアンの32bit整数の配列を読み込む"""
+    values = array("I")
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tolist()
+
+
+def test_build_transcript():
+    """
+    本文はスペース区切りで連結され、各セグメントの位置と時刻が保持されること
+    """
+    transcript = build_transcript(SNIPPETS, language="ja")
+    assert transcript.text == "こんにちは 今日は いい天気です"
+
+    assert _column(transcript.segments.starts_ms) == [0, 1500, 3500]
+    assert _column(transcript.segments.durations_ms) == [1500, 2000, 2250]
+    assert _column(transcript.segments.offsets) == [0, 6, 10]
+
+    # 配列は1セグメントあたり4バイト
+    assert len(transcript.segments.starts_ms) == 12
+
+
+def test_segments_round_trip_in_session():
+    """
+    セッションに保存したセグメント情報を読み込み後も参照できること
+    """
+    transcript = build_transcript(SNIPPETS, language="ja")
+    session = SessionInfo(
+        session_id="segments",
+        timestamp=datetime.now(),
+        expires_at=datetime.now(),
+        video_data=VideoMetadata(
+            video_id="test_video_id",
+            title="Test Video",
+            channel_name="Test Channel",
+            published_at=datetime.now().date(),
+            duration="PT5M",
+            duration_seconds=300,
+            url="https://www.youtube.com/watch?v=test_video_id",
+        ),
+        transcript=transcript.text,
+        transcript_segments=transcript.segments,
+        transcript_language="ja",
+        status="collected",
+        created_by="test_user",
+    )
+
+    loaded = SessionInfo.model_validate_json(session.model_dump_json())
+    assert loaded.transcript_segments == transcript.segments
+    offset = _column(loaded.transcript_segments.offsets)[2]
+    assert loaded.transcript[offset:] == "いい天気です"
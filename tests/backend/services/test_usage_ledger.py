@@ -0,0 +1,156 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from unittest.mock import MagicMock
+
+from app.services.usage_ledger import UsageLedger, usage_scope
+from app.core.exceptions import APIException
+
+PRICES = {"gemini-lite": (0.1, 0.4), "gemini-full": (1.0, 4.0)}
+
+
+def _response(prompt_tokens: int, output_tokens: int, cached_tokens: int = 0):
+    response = MagicMock()
+    response.usage_metadata = MagicMock(
+        prompt_token_count=prompt_tokens,
+        cached_content_token_count=cached_tokens,
+        candidates_token_count=output_tokens,
+    )
+    return response
+
+
+@pytest.fixture
+def ledger_path(tmp_path):
+    return str(tmp_path / "usage.jsonl")
+
+
+@pytest.mark.asyncio
+async def test_record_appends_line(ledger_path):
+    """
+    トークン数と利用額が1行ずつ追記されること
+    """
+    ledger = UsageLedger(path=ledger_path, prices=PRICES, cached_price_ratio=0.25)
+
+    record = await ledger.record(
+        "gemini-full", "analyze", _response(1_000_000, 100_000, cached_tokens=400_000), 1.5
+    )
+    await ledger.record("gemini-lite", "map", _response(10_000, 1_000), 0.2)
+
+    # 未キャッシュ60万 × 1.0 + キャッシュ40万 × 0.25 + 出力10万 × 4.0
+    assert record.cost_usd == pytest.approx(0.6 + 0.1 + 0.4)
+    with open(ledger_path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert [line["model"] for line in lines] == ["gemini-full", "gemini-lite"]
+    assert lines[0]["cached_tokens"] == 400_000
+    assert ledger.today_cost == pytest.approx(1.1 + 0.001 + 0.0004)
+
+
+@pytest.mark.asyncio
+async def test_record_without_usage_metadata(ledger_path):
+    """
+    usage_metadata がない場合・単価が不明なモデルは0として記録すること
+    """
+    ledger = UsageLedger(path=ledger_path, prices=PRICES)
+
+    record = await ledger.record("unknown-model", "analyze", object(), 0.1)
+
+    assert record.prompt_tokens == 0
+    assert record.output_tokens == 0
+    assert record.cost_usd == 0
+
+
+@pytest.mark.asyncio
+async def test_usage_scope_collects_records(ledger_path):
+    """
+    スコープ内の記録のみが収集されること
+    """
+    ledger = UsageLedger(path=ledger_path, prices=PRICES)
+
+    await ledger.record("gemini-lite", "analyze", _response(10, 10), 0.1)
+    with usage_scope() as usage:
+        await ledger.record("gemini-full", "analyze", _response(10, 10), 0.1)
+
+    assert [record.model for record in usage] == ["gemini-full"]
+
+
+@pytest.mark.asyncio
+async def test_rollup_by_day_and_model(ledger_path):
+    """
+    日付・モデルごとに集計し、期間外・不正な行は除外すること
+    """
+    now = datetime.now(timezone.utc)
+    lines = [
+        {"timestamp": now, "model": "gemini-lite", "cost_usd": 0.5, "prompt_tokens": 100},
+        {"timestamp": now, "model": "gemini-lite", "cost_usd": 0.25, "prompt_tokens": 50},
+        {"timestamp": now, "model": "gemini-full", "cost_usd": 1.0, "output_tokens": 10},
+        {"timestamp": now - timedelta(days=1), "model": "gemini-lite", "cost_usd": 2.0},
+        {"timestamp": now - timedelta(days=30), "model": "gemini-lite", "cost_usd": 9.0},
+    ]
+    with open(ledger_path, "w", encoding="utf-8") as f:
+        for line in lines:
+            line.update(operation="analyze", latency_seconds=0.1)
+            f.write(json.dumps(line, default=str) + "\n")
+        f.write("invalid line\n")
+
+    ledger = UsageLedger(path=ledger_path, prices=PRICES)
+    rollups = await ledger.rollup(days=7)
+
+    assert ledger.today_cost == pytest.approx(1.75)
+    summary = {(r.day, r.model): r for r in rollups}
+    assert len(summary) == 3
+    today_lite = summary[(now.date(), "gemini-lite")]
+    assert today_lite.requests == 2
+    assert today_lite.prompt_tokens == 150
+    assert today_lite.cost_usd == pytest.approx(0.75)
+    assert summary[(now.date() - timedelta(days=1), "gemini-lite")].cost_usd == 2.0
+
+
+@pytest.mark.asyncio
+async def test_rollup_includes_new_records_without_rereading(ledger_path, monkeypatch):
+    """
+    起動後の記録は台帳ファイルを読み直さずに集計に反映されること
+    """
+    ledger = UsageLedger(path=ledger_path, prices=PRICES)
+    monkeypatch.setattr(
+        ledger, "_read", MagicMock(side_effect=AssertionError("ledger re-read"))
+    )
+
+    await ledger.record("gemini-lite", "analyze", _response(1_000_000, 0), 0.5)
+    await ledger.record("gemini-lite", "map", _response(1_000_000, 0), 0.25)
+    rollups = await ledger.rollup(days=1)
+
+    assert len(rollups) == 1
+    assert rollups[0].requests == 2
+    assert rollups[0].prompt_tokens == 2_000_000
+    assert rollups[0].latency_seconds == pytest.approx(0.75)
+    assert rollups[0].cost_usd == pytest.approx(0.2)
+
+
+def test_check_budgets(ledger_path):
+    """
+    ソフト予算は一括処理のみ、ハード予算はすべてのリクエストを拒否すること
+    """
+    ledger = UsageLedger(path=ledger_path, soft_budget=1.0, hard_budget=2.0)
+    ledger.check("bulk")
+
+    ledger._today_cost = 1.0
+    ledger.check("interactive")
+    with pytest.raises(APIException) as exc_info:
+        ledger.check("bulk")
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.error_code == "E013"
+
+    ledger._today_cost = 2.0
+    with pytest.raises(APIException):
+        ledger.check("interactive")
+
+
+def test_check_budget_disabled(ledger_path):
+    """
+    予算が0の場合は制限しないこと
+    """
+    ledger = UsageLedger(path=ledger_path, soft_budget=0, hard_budget=0)
+    ledger._today_cost = 1000.0
+
+    ledger.check("bulk")
@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from app.services.youtube_quota import QuotaLedger
+from app.core.exceptions import APIException
+
+
+@pytest.fixture
+def quota_path(tmp_path):
+    return str(tmp_path / "youtube_quota.json")
+
+
+@pytest.mark.asyncio
+async def test_acquire_records_cost_by_method(quota_path):
+    """
+    メソッドごとの消費量が記録されること
+    """
+    ledger = QuotaLedger(daily_budget=1000, reserve=100, burst=200, path=quota_path)
+
+    await ledger.acquire("videos.list")
+    await ledger.acquire("search.list")
+
+    status = ledger.snapshot()
+    assert status.used == 101
+    assert status.remaining == 899
+    assert status.used_by_method == {"videos.list": 1, "search.list": 100}
+    assert status.resets_at.hour == 0
+
+
+@pytest.mark.asyncio
+async def test_bulk_keeps_reserve_for_interactive(quota_path):
+    """
+    一括処理は予備分を残して拒否され、対話的リクエストは予備分を使えること
+    """
+    ledger = QuotaLedger(daily_budget=10, reserve=5, burst=10, path=quota_path)
+
+    for _ in range(5):
+        await ledger.acquire("videos.list", "bulk")
+
+    with pytest.raises(APIException) as exc_info:
+        await ledger.acquire("videos.list", "bulk")
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.error_code == "E003"
+
+    for _ in range(5):
+        await ledger.acquire("videos.list", "interactive")
+
+    with pytest.raises(APIException):
+        await ledger.acquire("videos.list", "interactive")
+
+
+@pytest.mark.asyncio
+async def test_mark_exhausted(quota_path):
+    """
+    YouTube側でクォータ超過と判定された後は全てのリクエストを拒否すること
+    """
+    ledger = QuotaLedger(daily_budget=1000, reserve=100, burst=200, path=quota_path)
+
+    ledger.mark_exhausted()
+
+    assert ledger.remaining == 0
+    with pytest.raises(APIException):
+        await ledger.acquire("videos.list")
+
+
+@pytest.mark.asyncio
+async def test_usage_survives_restart(quota_path):
+    """
+    本日の消費量は再起動後も引き継がれ、前日の記録は使われないこと
+    """
+    ledger = QuotaLedger(daily_budget=1000, reserve=100, burst=200, path=quota_path)
+    await ledger.acquire("search.list")
+    await ledger.acquire("videos.list")
+
+    restarted = QuotaLedger(daily_budget=1000, reserve=100, burst=200, path=quota_path)
+    status = restarted.snapshot()
+    assert status.used == 101
+    assert status.used_by_method == {"search.list": 100, "videos.list": 1}
+
+    with open(quota_path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    state["day"] = "2000-01-01"
+    with open(quota_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+
+    assert QuotaLedger(path=quota_path).snapshot().used == 0
+
+
+def test_mark_exhausted_survives_restart(quota_path):
+    """
+    クォータ超過の判定は再起動後も引き継がれること
+    """
+    QuotaLedger(daily_budget=1000, path=quota_path).mark_exhausted()
+
+    assert QuotaLedger(daily_budget=1000, path=quota_path).remaining == 0
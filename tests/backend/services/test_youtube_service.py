@@ -1,21 +1,36 @@
+import asyncio
+import time
+from array import array
+
 import pytest
 from unittest.mock import patch, MagicMock
 from googleapiclient.errors import HttpError
+from youtube_transcript_api import (
+    FetchedTranscript,
+    FetchedTranscriptSnippet,
+    NoTranscriptFound,
+)
 
 from app.services.youtube_service import YouTubeService
+from app.services.transcript_cache import TranscriptCache
 from app.models.schemas import VideoMetadata
 from app.core.exceptions import APIException
+from app.core.metrics import metrics
 
 VIDEO_ID = "dQw4w9WgXcQ"
 VALID_YOUTUBE_URL = "https://www.youtube.com/watch?v=" + VIDEO_ID
 
 
 @pytest.fixture
-def setup_youtube_env(monkeypatch):
+def setup_youtube_env(monkeypatch, tmp_path):
     """
-    ダミーのAPIキーを設定
+    ダミーのAPIキーを設定し、キャッシュ・クォータ消費量の保存先をテスト用にパッチする
     """
     monkeypatch.setattr("app.services.youtube_service.YOUTUBE_API_KEY", "dummy_api_key")
+    monkeypatch.setattr("app.services.transcript_cache.CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(
+        "app.services.youtube_quota.YOUTUBE_QUOTA_PATH", str(tmp_path / "youtube_quota.json")
+    )
 
 
 @pytest.fixture
@@ -45,12 +60,17 @@ def dummy_transcript_response():
     """
     字幕取得モックレスポンスデータ
     """
-    snippets = []
-    for text in ["テスト用字幕A", "テスト用字幕B", "テスト用字幕C"]:
-        mock_snippet = MagicMock()
-        mock_snippet.text = text
-        snippets.append(mock_snippet)
-    return snippets
+    snippets = [
+        FetchedTranscriptSnippet(text=text, start=index * 2.0, duration=2.0)
+        for index, text in enumerate(["テスト用字幕A", "テスト用字幕B", "テスト用字幕C"])
+    ]
+    return FetchedTranscript(
+        snippets=snippets,
+        video_id=VIDEO_ID,
+        language="Japanese",
+        language_code="ja",
+        is_generated=False,
+    )
 
 
 @pytest.fixture
@@ -65,10 +85,14 @@ def mock_youtube_dependencies(dummy_youtube_video_response, dummy_transcript_res
             dummy_youtube_video_response
         )
 
-        mock_transcript_api_instance = mock_transcript_api.return_value
-        mock_transcript_api_instance.fetch.return_value = dummy_transcript_response
+        # 手動作成の日本語字幕が選ばれる想定
+        transcript_list = mock_transcript_api.return_value.list.return_value
+        mock_track = transcript_list.find_manually_created_transcript.return_value
+        mock_track.language_code = "ja"
+        mock_track.is_generated = False
+        mock_track.fetch.return_value = dummy_transcript_response
 
-        yield mock_build, mock_transcript_api
+        yield mock_build, mock_track
 
 
 @pytest.mark.parametrize(
@@ -110,14 +134,14 @@ async def test_fetch_video_data_success(
     assert isinstance(video_metadata, VideoMetadata)
     assert video_metadata.title == "Test Video Title"
 
-    assert transcript == "テスト用字幕A テスト用字幕B テスト用字幕C"
+    assert transcript.text == "テスト用字幕A テスト用字幕B テスト用字幕C"
 
     # モックの呼び出し検証
-    mock_build, mock_transcript_api = mock_youtube_dependencies
+    mock_build, mock_track = mock_youtube_dependencies
     mock_build.return_value.videos().list().execute.assert_called_once()
-    mock_transcript_api.return_value.fetch.assert_called_once_with(
-        VIDEO_ID, languages=["ja", "en"]
-    )
+    mock_track.fetch.assert_called_once_with()
+    assert transcript.language == "ja"
+    assert transcript.is_generated is False
 
 
 @pytest.mark.asyncio
@@ -140,10 +164,10 @@ async def test_fetch_video_data_invalid_url(
     assert "Invalid YouTube URL." in exc_info.value.message
 
     # モックの呼び出し検証
-    mock_build, mock_transcript_api = mock_youtube_dependencies
+    mock_build, mock_track = mock_youtube_dependencies
     mock_build.assert_called_once_with("youtube", "v3", developerKey="dummy_api_key")
     mock_build.return_value.videos().list().execute.assert_not_called()
-    mock_transcript_api.return_value.fetch.assert_not_called()
+    mock_track.fetch.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -153,7 +177,7 @@ async def test_fetch_video_data_video_not_found(
     """
     指定された動画情報を見つけられなかった場合
     """
-    mock_build, mock_transcript_api = mock_youtube_dependencies
+    mock_build, mock_track = mock_youtube_dependencies
     mock_build.return_value.videos.return_value.list.return_value.execute.return_value = {
         "items": []
     }
@@ -172,7 +196,6 @@ async def test_fetch_video_data_video_not_found(
     mock_build.return_value.videos().list.assert_called_once_with(
         part="snippet,contentDetails,statistics", id=VIDEO_ID
     )
-    mock_transcript_api.return_value.fetch.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -182,7 +205,7 @@ async def test_fetch_video_data_http_error(
     """
     HttpErrorが発生した場合
     """
-    mock_build, mock_transcript_api = mock_youtube_dependencies
+    mock_build, mock_track = mock_youtube_dependencies
     mock_status_code = 403
     mock_content = b'{"error": {"message": "Forbidden"}}'
 
@@ -202,7 +225,33 @@ async def test_fetch_video_data_http_error(
         in exc_info.value.message
     )
 
-    mock_transcript_api.return_value.fetch.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_fetch_video_data_quota_exceeded(
+    setup_youtube_env, mock_youtube_dependencies
+):
+    """
+    YouTube側でクォータ超過となった場合、以降のリクエストはAPIを呼ばずに拒否されること
+    """
+    mock_build, mock_track = mock_youtube_dependencies
+    mock_content = b'{"error": {"errors": [{"reason": "quotaExceeded"}]}}'
+    mock_build.return_value.videos().list().execute.side_effect = HttpError(
+        MagicMock(status=403), mock_content
+    )
+
+    youtube_service = YouTubeService()
+
+    with pytest.raises(APIException) as exc_info:
+        await youtube_service.fetch_video_data(VALID_YOUTUBE_URL)
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.error_code == "E003"
+    assert youtube_service.quota.remaining == 0
+
+    mock_build.return_value.videos().list().execute.reset_mock()
+    with pytest.raises(APIException) as exc_info:
+        await youtube_service.fetch_video_data(VALID_YOUTUBE_URL)
+    assert exc_info.value.error_code == "E003"
+    mock_build.return_value.videos().list().execute.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -212,7 +261,7 @@ async def test_fetch_video_data_unexpected_error(
     """
     予期せぬエラーが発生した場合
     """
-    mock_build, mock_transcript_api = mock_youtube_dependencies
+    mock_build, mock_track = mock_youtube_dependencies
     error_message = "A generic unexpected error"
     mock_build.return_value.videos().list().execute.side_effect = Exception(
         error_message
@@ -227,8 +276,6 @@ async def test_fetch_video_data_unexpected_error(
     assert exc_info.value.error_code == "E008"
     assert error_message in exc_info.value.message
 
-    mock_transcript_api.return_value.fetch.assert_not_called()
-
 
 @pytest.mark.asyncio
 async def test_fetch_video_data_transcript_failure(
@@ -237,9 +284,9 @@ async def test_fetch_video_data_transcript_failure(
     """
     字幕取得に失敗する場合
     """
-    mock_build, mock_transcript_api = mock_youtube_dependencies
+    mock_build, mock_track = mock_youtube_dependencies
     error_message = "Transcript not available"
-    mock_transcript_api.return_value.fetch.side_effect = Exception(error_message)
+    mock_track.fetch.side_effect = Exception(error_message)
 
     youtube_service = YouTubeService()
 
@@ -252,4 +299,434 @@ async def test_fetch_video_data_transcript_failure(
 
     mock_build.assert_called_once()
     mock_build.return_value.videos().list().execute.assert_called_once()
-    mock_transcript_api.return_value.fetch.assert_called_once()
+    mock_track.fetch.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_fetch_video_data_does_not_block_event_loop(
+    setup_youtube_env, mock_youtube_dependencies, dummy_youtube_video_response
+):
+    """
+    メタデータ取得がイベントループをブロックせず、並行実行されること
+    """
+    mock_build, _ = mock_youtube_dependencies
+    item = dummy_youtube_video_response["items"][0]
+
+    def list_videos(**kwargs):
+        request = MagicMock()
+
+        def slow_execute(*args, **execute_kwargs):
+            time.sleep(0.2)
+            return {"items": [{**item, "id": kwargs["id"]}]}
+
+        request.execute.side_effect = slow_execute
+        return request
+
+    videos_list = mock_build.return_value.videos.return_value.list
+    videos_list.side_effect = list_videos
+
+    youtube_service = YouTubeService()
+    urls = [f"https://youtu.be/{i:011d}" for i in range(5)]
+
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *[youtube_service.fetch_video_data(url) for url in urls]
+    )
+    elapsed = time.perf_counter() - start
+
+    assert len(results) == 5
+    # 直列実行なら1秒かかるところ、ほぼ1往復分で完了する
+    assert elapsed < 0.6
+    assert videos_list.call_count == 5
+
+
+@pytest.mark.asyncio
+async def test_fetch_video_data_runs_concurrently(
+    setup_youtube_env, mock_youtube_dependencies, dummy_transcript_response
+):
+    """
+    メタデータと字幕が同時に取得され、遅い方の所要時間で完了すること
+    """
+    mock_build, mock_track = mock_youtube_dependencies
+    execute = mock_build.return_value.videos.return_value.list.return_value.execute
+    response = execute.return_value
+
+    def slow_execute(*args, **kwargs):
+        time.sleep(0.2)
+        return response
+
+    def slow_fetch(*args, **kwargs):
+        time.sleep(0.3)
+        return dummy_transcript_response
+
+    execute.side_effect = slow_execute
+    mock_track.fetch.side_effect = slow_fetch
+
+    youtube_service = YouTubeService()
+
+    start = time.perf_counter()
+    _, transcript = await youtube_service.fetch_video_data(VALID_YOUTUBE_URL)
+    elapsed = time.perf_counter() - start
+
+    assert transcript.text == "テスト用字幕A テスト用字幕B テスト用字幕C"
+    assert elapsed < 0.45
+
+
+@pytest.mark.asyncio
+async def test_fetch_video_data_metadata_failure_cancels_transcript(
+    setup_youtube_env, mock_youtube_dependencies, dummy_transcript_response
+):
+    """
+    メタデータ取得に失敗した場合、字幕取得の完了を待たずにエラーとなること
+    """
+    mock_build, mock_track = mock_youtube_dependencies
+    mock_build.return_value.videos.return_value.list.return_value.execute.return_value = {
+        "items": []
+    }
+
+    def slow_fetch(*args, **kwargs):
+        time.sleep(0.5)
+        return dummy_transcript_response
+
+    mock_track.fetch.side_effect = slow_fetch
+
+    youtube_service = YouTubeService()
+
+    start = time.perf_counter()
+    with pytest.raises(APIException) as exc_info:
+        await youtube_service.fetch_video_data(VALID_YOUTUBE_URL)
+    elapsed = time.perf_counter() - start
+
+    assert exc_info.value.error_code == "E009"
+    assert elapsed < 0.4
+
+
+@pytest.mark.asyncio
+async def test_fetch_video_data_timeout(
+    setup_youtube_env, mock_youtube_dependencies, dummy_transcript_response, monkeypatch
+):
+    """
+    共通の期限を超えた場合
+    """
+    monkeypatch.setattr("app.services.youtube_service.COLLECT_TIMEOUT", 0.1)
+    mock_build, mock_track = mock_youtube_dependencies
+
+    def slow_fetch(*args, **kwargs):
+        time.sleep(0.3)
+        return dummy_transcript_response
+
+    mock_track.fetch.side_effect = slow_fetch
+
+    youtube_service = YouTubeService()
+
+    with pytest.raises(APIException) as exc_info:
+        await youtube_service.fetch_video_data(VALID_YOUTUBE_URL)
+
+    assert exc_info.value.status_code == 504
+    assert exc_info.value.error_code == "E008"
+
+
+@pytest.mark.asyncio
+async def test_iter_video_data_batch(
+    setup_youtube_env, mock_youtube_dependencies, dummy_youtube_video_response
+):
+    """
+    iter_video_data が複数IDを1回のvideos.listで取得し、URLごとに結果を返すこと
+    """
+    mock_build, mock_track = mock_youtube_dependencies
+    missing_id = "AAAAAAAAAAA"
+    urls = [
+        VALID_YOUTUBE_URL,
+        "https://www.youtube.com/watch?v=" + missing_id,
+        "https://www.example.com/",
+    ]
+
+    youtube_service = YouTubeService()
+    results = [result async for result in youtube_service.iter_video_data(urls)]
+
+    assert len(results) == 3
+    by_index = {result.index: result for result in results}
+
+    # 正常に取得できた動画
+    assert by_index[0].error is None
+    assert by_index[0].metadata.title == "Test Video Title"
+    assert by_index[0].transcript.text == "テスト用字幕A テスト用字幕B テスト用字幕C"
+
+    # 存在しない動画
+    assert by_index[1].error.error_code == "E009"
+
+    # 不正なURL
+    assert by_index[2].error.error_code == "E001"
+
+    # メタデータはカンマ区切りのIDで1回だけ取得する
+    mock_build.return_value.videos().list.assert_called_once_with(
+        part="snippet,contentDetails,statistics", id=f"{VIDEO_ID},{missing_id}"
+    )
+    mock_track.fetch.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_iter_video_data_splits_requests(
+    setup_youtube_env, mock_youtube_dependencies
+):
+    """
+    50件を超えるIDは複数回のvideos.listに分割されること
+    """
+    mock_build, _ = mock_youtube_dependencies
+    mock_build.return_value.videos.return_value.list.return_value.execute.return_value = {
+        "items": []
+    }
+    urls = [f"https://youtu.be/{i:011d}" for i in range(120)]
+
+    youtube_service = YouTubeService()
+    results = [result async for result in youtube_service.iter_video_data(urls)]
+
+    assert len(results) == 120
+    assert all(result.error.error_code == "E009" for result in results)
+
+    id_args = [
+        call.kwargs["id"]
+        for call in mock_build.return_value.videos.return_value.list.call_args_list
+    ]
+    assert [len(ids.split(",")) for ids in id_args] == [50, 50, 20]
+
+
+@pytest.mark.asyncio
+async def test_iter_playlist_video_data_paging(
+    setup_youtube_env, mock_youtube_dependencies
+):
+    """
+    プレイリストをページトークンで順に取得し、ページごとにメタデータを一括取得すること
+    """
+    mock_build, mock_track = mock_youtube_dependencies
+    first_page = [f"{i:011d}" for i in range(50)]
+    second_page = [f"{i:011d}" for i in range(50, 60)]
+
+    def playlist_page(**kwargs):
+        request = MagicMock()
+        if kwargs["pageToken"] is None:
+            request.execute.return_value = {
+                "items": [{"contentDetails": {"videoId": v}} for v in first_page],
+                "nextPageToken": "page-2",
+                "pageInfo": {"totalResults": 60},
+            }
+        else:
+            request.execute.return_value = {
+                "items": [{"contentDetails": {"videoId": v}} for v in second_page],
+                "pageInfo": {"totalResults": 60},
+            }
+        return request
+
+    mock_build.return_value.playlistItems.return_value.list.side_effect = playlist_page
+    mock_build.return_value.videos.return_value.list.return_value.execute.return_value = {
+        "items": []
+    }
+
+    youtube_service = YouTubeService()
+    results = [
+        result
+        async for result in youtube_service.iter_playlist_video_data("UUplaylist")
+    ]
+
+    assert sorted(result.index for result in results) == list(range(60))
+    assert all(result.total == 60 for result in results)
+
+    page_tokens = [
+        call.kwargs["pageToken"]
+        for call in mock_build.return_value.playlistItems.return_value.list.call_args_list
+    ]
+    assert page_tokens == [None, "page-2"]
+
+    id_args = [
+        call.kwargs["id"]
+        for call in mock_build.return_value.videos.return_value.list.call_args_list
+    ]
+    assert id_args == [",".join(first_page), ",".join(second_page)]
+
+
+@pytest.mark.asyncio
+async def test_resolve_uploads_playlist(setup_youtube_env, mock_youtube_dependencies):
+    """
+    チャンネルIDからアップロード動画のプレイリストIDを取得すること
+    """
+    mock_build, _ = mock_youtube_dependencies
+    channels = mock_build.return_value.channels.return_value.list
+    channels.return_value.execute.return_value = {
+        "items": [{"contentDetails": {"relatedPlaylists": {"uploads": "UUdummy"}}}]
+    }
+
+    youtube_service = YouTubeService()
+    assert await youtube_service.resolve_uploads_playlist("UCdummy") == "UUdummy"
+    channels.assert_called_once_with(part="contentDetails", id="UCdummy")
+
+    # 存在しないチャンネル
+    channels.return_value.execute.return_value = {"items": []}
+    with pytest.raises(APIException) as exc_info:
+        await youtube_service.resolve_uploads_playlist("UCmissing")
+    assert exc_info.value.error_code == "E009"
+
+
+@pytest.mark.asyncio
+async def test_fetch_video_data_uses_metadata_cache(
+    setup_youtube_env, mock_youtube_dependencies, monkeypatch
+):
+    """
+    2回目以降はキャッシュを使い、再生回数の期限切れ時は statistics のみ再取得すること
+    """
+    mock_build, _ = mock_youtube_dependencies
+    videos_list = mock_build.return_value.videos.return_value.list
+
+    youtube_service = YouTubeService()
+    await youtube_service.fetch_video_data(VALID_YOUTUBE_URL)
+    await youtube_service.fetch_video_data(VALID_YOUTUBE_URL)
+
+    videos_list.assert_called_once_with(
+        part="snippet,contentDetails,statistics", id=VIDEO_ID
+    )
+
+    # 再生回数のみ期限切れにする
+    youtube_service.metadata_cache.volatile_ttl = -1
+    video_metadata, _ = await youtube_service.fetch_video_data(VALID_YOUTUBE_URL)
+
+    assert videos_list.call_count == 2
+    assert videos_list.call_args.kwargs == {"part": "statistics", "id": VIDEO_ID}
+    assert video_metadata.view_count == 12345
+    assert video_metadata.title == "Test Video Title"
+
+
+@pytest.mark.asyncio
+async def test_fetch_video_data_stale_refresh_failure(
+    setup_youtube_env, mock_youtube_dependencies
+):
+    """
+    再生回数の再取得に失敗した場合は、キャッシュのメタデータをそのまま返すこと
+    """
+    mock_build, _ = mock_youtube_dependencies
+    videos_list = mock_build.return_value.videos.return_value.list
+
+    youtube_service = YouTubeService()
+    await youtube_service.fetch_video_data(VALID_YOUTUBE_URL)
+
+    youtube_service.metadata_cache.volatile_ttl = -1
+    videos_list.return_value.execute.side_effect = HttpError(
+        MagicMock(status=500), b"backend error"
+    )
+    metrics.reset()
+    video_metadata, _ = await youtube_service.fetch_video_data(VALID_YOUTUBE_URL)
+
+    assert videos_list.call_args.kwargs == {"part": "statistics", "id": VIDEO_ID}
+    assert video_metadata.view_count == 12345
+    assert video_metadata.title == "Test Video Title"
+    assert metrics.snapshot()["counters"]["youtube.metadata_cache.refresh_failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fetch_video_data_uses_transcript_cache(
+    setup_youtube_env, mock_youtube_dependencies
+):
+    """
+    取得済みの字幕はディスクキャッシュから返し、再起動後もダウンロードしないこと
+    """
+    _, mock_track = mock_youtube_dependencies
+
+    youtube_service = YouTubeService()
+    _, transcript = await youtube_service.fetch_video_data(VALID_YOUTUBE_URL)
+
+    # 別インスタンス（再起動後）でもキャッシュが使われる
+    restarted_service = YouTubeService()
+    _, cached_transcript = await restarted_service.fetch_video_data(VALID_YOUTUBE_URL)
+
+    assert cached_transcript == transcript
+    mock_track.fetch.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_fetch_video_data_coalesces_duplicates(
+    setup_youtube_env, mock_youtube_dependencies, dummy_transcript_response
+):
+    """
+    同じ動画への同時リクエストは1回の取得にまとめられること
+    """
+    mock_build, mock_track = mock_youtube_dependencies
+    execute = mock_build.return_value.videos.return_value.list.return_value.execute
+    response = execute.return_value
+
+    def slow_execute(*args, **kwargs):
+        time.sleep(0.1)
+        return response
+
+    def slow_fetch(*args, **kwargs):
+        time.sleep(0.1)
+        return dummy_transcript_response
+
+    execute.side_effect = slow_execute
+    mock_track.fetch.side_effect = slow_fetch
+    coalesced = metrics.get_counter("youtube.metadata.coalesced")
+
+    youtube_service = YouTubeService()
+    results = await asyncio.gather(
+        *[youtube_service.fetch_video_data(VALID_YOUTUBE_URL) for _ in range(5)]
+    )
+
+    assert len(results) == 5
+    assert all(result == results[0] for result in results)
+    execute.assert_called_once()
+    mock_track.fetch.assert_called_once()
+    assert metrics.get_counter("youtube.metadata.coalesced") == coalesced + 4
+
+
+@pytest.mark.asyncio
+async def test_fetch_video_data_keeps_segments(
+    setup_youtube_env, mock_youtube_dependencies
+):
+    """
+    字幕のタイムスタンプがセグメント情報として保持され、キャッシュ経由でも失われないこと
+    """
+    youtube_service = YouTubeService()
+    _, transcript = await youtube_service.fetch_video_data(VALID_YOUTUBE_URL)
+
+    starts = array("I")
+    starts.frombytes(transcript.segments.starts_ms)
+    assert starts.tolist() == [0, 2000, 4000]
+
+    _, cached = await YouTubeService().fetch_video_data(VALID_YOUTUBE_URL)
+    assert cached.segments == transcript.segments
+
+
+@pytest.mark.asyncio
+async def test_fetch_transcript_language_negotiation(
+    setup_youtube_env, dummy_youtube_video_response, dummy_transcript_response
+):
+    """
+    手動作成の字幕がない場合は自動生成字幕を選び、選んだ言語を記録すること。
+    字幕一覧は動画ごとに1回だけ取得されること
+    """
+    with patch("app.services.youtube_service.build") as mock_build, patch(
+        "app.services.youtube_service.YouTubeTranscriptApi"
+    ) as mock_transcript_api:
+        mock_build.return_value.videos.return_value.list.return_value.execute.return_value = (
+            dummy_youtube_video_response
+        )
+        transcript_list = mock_transcript_api.return_value.list.return_value
+        transcript_list.find_manually_created_transcript.side_effect = NoTranscriptFound(
+            VIDEO_ID, ["ja", "en"], transcript_list
+        )
+        generated_track = transcript_list.find_generated_transcript.return_value
+        generated_track.language_code = "en"
+        generated_track.is_generated = True
+        generated_track.fetch.return_value = dummy_transcript_response
+
+        youtube_service = YouTubeService()
+        youtube_service.transcript_cache = TranscriptCache(enabled=False)
+
+        _, transcript = await youtube_service.fetch_video_data(VALID_YOUTUBE_URL)
+        await youtube_service.fetch_video_data(VALID_YOUTUBE_URL)
+
+    assert transcript.language == "en"
+    assert transcript.is_generated is True
+    transcript_list.find_manually_created_transcript.assert_called_with(["ja", "en"])
+    transcript_list.find_generated_transcript.assert_called_with(["ja", "en"])
+
+    # 一覧は1回のみ、字幕本体は毎回取得する
+    mock_transcript_api.return_value.list.assert_called_once_with(VIDEO_ID)
+    assert generated_track.fetch.call_count == 2